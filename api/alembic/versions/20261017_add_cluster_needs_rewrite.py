@@ -0,0 +1,23 @@
+"""Flag clusters whose written text is stale
+
+Revision ID: add_cluster_needs_rewrite
+Revises: add_cluster_state
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_cluster_needs_rewrite'
+down_revision = 'add_cluster_state'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('clusters', sa.Column('needs_rewrite', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('clusters', 'needs_rewrite')
@@ -0,0 +1,26 @@
+"""Add MinHash signatures to clusters for incremental clustering
+
+Revision ID: add_cluster_signatures
+Revises: canonicalize_raw_item_urls
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_cluster_signatures'
+down_revision = 'canonicalize_raw_item_urls'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing clusters keep a NULL signature and are simply not matched against
+    op.add_column('clusters', sa.Column('signature', sa.LargeBinary(), nullable=True))
+    op.create_index(op.f('ix_clusters_created_at'), 'clusters', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_clusters_created_at'), table_name='clusters')
+    op.drop_column('clusters', 'signature')
@@ -0,0 +1,31 @@
+"""Add active/archived state to clusters
+
+Revision ID: add_cluster_state
+Revises: add_cluster_signatures
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_cluster_state'
+down_revision = 'add_cluster_signatures'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Every existing cluster starts active; the first maintenance run retires old ones
+    op.add_column('clusters', sa.Column('state', sa.String(length=20), server_default='active', nullable=False))
+    op.add_column('clusters', sa.Column('archived_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'ix_clusters_active_score', 'clusters', ['score'], unique=False,
+        postgresql_where=sa.text("state = 'active'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_clusters_active_score', table_name='clusters')
+    op.drop_column('clusters', 'archived_at')
+    op.drop_column('clusters', 'state')
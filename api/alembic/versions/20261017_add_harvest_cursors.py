@@ -0,0 +1,34 @@
+"""Add harvest cursors for incremental ingestion
+
+Revision ID: add_harvest_cursors
+Revises: add_raw_item_normalized_url
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_harvest_cursors'
+down_revision = 'add_raw_item_normalized_url'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'harvest_cursors',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('key', sa.String(length=255), nullable=False),
+        sa.Column('last_published_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_harvest_cursors_id'), 'harvest_cursors', ['id'], unique=False)
+    op.create_index(op.f('ix_harvest_cursors_key'), 'harvest_cursors', ['key'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_harvest_cursors_key'), table_name='harvest_cursors')
+    op.drop_index(op.f('ix_harvest_cursors_id'), table_name='harvest_cursors')
+    op.drop_table('harvest_cursors')
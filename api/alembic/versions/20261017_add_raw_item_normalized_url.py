@@ -0,0 +1,45 @@
+"""Add unique normalized URL to raw_items
+
+Revision ID: add_raw_item_normalized_url
+Revises: add_source_http_cache
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_raw_item_normalized_url'
+down_revision = 'add_source_http_cache'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('raw_items', sa.Column('normalized_url', sa.String(length=1000), nullable=True))
+    
+    # Backfill: lowercase scheme/host and drop the fragment (mirrors cleaner.normalize_url)
+    op.execute("""
+        UPDATE raw_items
+        SET normalized_url = COALESCE(
+            lower(substring(url from '^[A-Za-z][A-Za-z0-9+.-]*://[^/?#]*'))
+                || substring(url from '^[A-Za-z][A-Za-z0-9+.-]*://[^/?#]*([^#]*)'),
+            split_part(url, '#', 1)
+        )
+    """)
+    
+    # Existing duplicates keep a NULL key (NULLs don't conflict); the oldest row owns the URL
+    op.execute("""
+        UPDATE raw_items r
+        SET normalized_url = NULL
+        FROM raw_items keeper
+        WHERE keeper.normalized_url = r.normalized_url
+          AND keeper.id < r.id
+    """)
+    
+    op.create_index(op.f('ix_raw_items_normalized_url'), 'raw_items', ['normalized_url'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_raw_items_normalized_url'), table_name='raw_items')
+    op.drop_column('raw_items', 'normalized_url')
@@ -0,0 +1,41 @@
+"""Add processing state and retry backoff to raw items
+
+Revision ID: add_raw_item_processing_state
+Revises: add_harvest_cursors
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_raw_item_processing_state'
+down_revision = 'add_harvest_cursors'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('raw_items', sa.Column('processing_state', sa.String(length=20), server_default='pending', nullable=False))
+    op.add_column('raw_items', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('raw_items', sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('raw_items', sa.Column('cleaned_at', sa.DateTime(timezone=True), nullable=True))
+    
+    # The Cleaner only ever handled items without content; everything else is done
+    op.execute(
+        "UPDATE raw_items SET processing_state = 'done' "
+        "WHERE content IS NOT NULL AND content <> ''"
+    )
+    
+    op.create_index(
+        'ix_raw_items_pending', 'raw_items', ['id'], unique=False,
+        postgresql_where=sa.text("processing_state = 'pending'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_raw_items_pending', table_name='raw_items')
+    op.drop_column('raw_items', 'cleaned_at')
+    op.drop_column('raw_items', 'next_attempt_at')
+    op.drop_column('raw_items', 'attempts')
+    op.drop_column('raw_items', 'processing_state')
@@ -0,0 +1,26 @@
+"""Add HTTP cache validators to sources
+
+Revision ID: add_source_http_cache
+Revises: add_medicine_lab_fields
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_source_http_cache'
+down_revision = 'add_medicine_lab_fields'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # ETag / Last-Modified from the last successful feed fetch
+    op.add_column('sources', sa.Column('etag', sa.String(length=500), nullable=True))
+    op.add_column('sources', sa.Column('last_modified', sa.String(length=100), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('sources', 'last_modified')
+    op.drop_column('sources', 'etag')
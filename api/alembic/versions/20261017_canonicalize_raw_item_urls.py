@@ -0,0 +1,94 @@
+"""Re-key raw item dedup keys with the canonical URL form
+
+Revision ID: canonicalize_raw_item_urls
+Revises: add_raw_item_processing_state
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from urllib.parse import unquote, unquote_plus, urlparse, urlunparse
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'canonicalize_raw_item_urls'
+down_revision = 'add_raw_item_processing_state'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of worker/agents/urls.py canonicalize_url (minus redirect resolution)
+# as of this revision; migrations must not import application code.
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_hsenc', '_hsmi', 'mkt_tok', 'ref_src', 'ref_url', 'cmpid', 'ncid',
+    'smid', 'sr_share', 'guccounter', 'guce_referrer', 'guce_referrer_sig', 'amp'
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'hsa_')
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+
+def _is_tracking_param(param):
+    name = unquote_plus(param.split('=', 1)[0]).lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def _is_google(host):
+    return host == 'google.com' or host.endswith('.google.com')
+
+
+def _unwrap_amp(host, path):
+    if host.endswith('.cdn.ampproject.org') or (_is_google(host) and path.startswith('/amp/')):
+        rest = path.split('/')[2:]
+        while rest and rest[0] in ('v', 'i', 's'):
+            rest = rest[1:]
+        if rest:
+            host, path = rest[0].lower(), '/' + '/'.join(rest[1:])
+    if host.startswith('amp.') and host.count('.') >= 2:
+        host = host[len('amp.'):]
+    return host, path
+
+
+def _canonicalize(url):
+    url = (url or '').strip()
+    try:
+        parsed = urlparse(url)
+        scheme = parsed.scheme.lower()
+        host = (parsed.hostname or '').lower()
+        port = parsed.port
+    except ValueError:
+        return url
+    if not scheme or not host:
+        return url
+
+    host, path = _unwrap_amp(host, parsed.path)
+    if host.startswith('www.'):
+        host = host[len('www.'):]
+    if port is not None and str(port) != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    params = [p for p in parsed.query.split('&') if p and not _is_tracking_param(p)]
+    path = unquote(path).rstrip('/') or '/'
+    scheme = 'https' if scheme in ('http', 'https') else scheme
+    return urlunparse((scheme, host, path, parsed.params, '&'.join(sorted(params)), ''))
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # The oldest row owns each canonical URL; later duplicates keep a NULL key
+    owners = {}
+    for row_id, url in bind.execute(sa.text("SELECT id, url FROM raw_items ORDER BY id")):
+        key = _canonicalize(url)[:1000]
+        if key and key not in owners:
+            owners[key] = row_id
+
+    op.execute("UPDATE raw_items SET normalized_url = NULL")
+    if owners:
+        bind.execute(
+            sa.text("UPDATE raw_items SET normalized_url = :key WHERE id = :id"),
+            [{"key": key, "id": row_id} for key, row_id in owners.items()]
+        )
+
+
+def downgrade() -> None:
+    # Canonical keys are a superset of the old ones' deduplication; nothing to undo
+    pass
@@ -3,7 +3,7 @@ SQLAlchemy models for AI Briefing Platform
 """
 from sqlalchemy import (
     Column, Integer, String, Text, Float, DateTime, ForeignKey, Table,
-    Enum as SQLEnum, Boolean
+    Enum as SQLEnum, Boolean, Index, LargeBinary, false
 )
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -17,6 +17,17 @@ class SourceType(str, enum.Enum):
     PRIMARY_LAB = "primary_lab"
 
 
+class ProcessingState(str, enum.Enum):
+    PENDING = "pending"  # Waiting for the Cleaner
+    DONE = "done"
+    FAILED = "failed"  # Gave up after repeated extraction failures
+
+
+class ClusterState(str, enum.Enum):
+    ACTIVE = "active"
+    ARCHIVED = "archived"  # Retired by cluster maintenance; kept for history, not ranked or matched
+
+
 class ClinicalMaturityLevel(str, enum.Enum):
     EXPLORATORY = "exploratory"
     CLINICALLY_VALIDATED = "clinically_validated"
@@ -56,6 +67,8 @@ class Source(Base):
     url = Column(String(500), nullable=False)
     source_type = Column(SQLEnum(SourceType), nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
+    etag = Column(String(500), nullable=True)  # HTTP validators for conditional feed requests
+    last_modified = Column(String(100), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
@@ -70,16 +83,39 @@ class RawItem(Base):
     source_id = Column(Integer, ForeignKey('sources.id', ondelete='CASCADE'), nullable=False, index=True)
     title = Column(String(500), nullable=False)
     url = Column(String(1000), nullable=False, index=True)
+    normalized_url = Column(String(1000), nullable=True, unique=True, index=True)  # Dedup key for idempotent ingestion
     content = Column(Text, nullable=True)
     published_at = Column(DateTime(timezone=True), nullable=True)
     ingested_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     frontier_lab = Column(String(100), nullable=True, index=True)  # e.g., "Anthropic", "OpenAI", "DeepMind"
+    processing_state = Column(String(20), nullable=False, default=ProcessingState.PENDING.value,
+                              server_default=ProcessingState.PENDING.value)  # ProcessingState value
+    attempts = Column(Integer, nullable=False, default=0, server_default='0')  # Failed cleaning attempts
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)  # Retry backoff
+    cleaned_at = Column(DateTime(timezone=True), nullable=True)
 
     source = relationship("Source", back_populates="raw_items")
     clusters = relationship("Cluster", secondary=cluster_items, back_populates="raw_items")
     citations = relationship("Citation", back_populates="raw_item", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Only pending rows are indexed, so claiming work is O(pending), not O(table)
+        Index('ix_raw_items_pending', 'id',
+              postgresql_where=processing_state == ProcessingState.PENDING.value,
+              sqlite_where=processing_state == ProcessingState.PENDING.value),
+    )
+
+
+class HarvestCursor(Base):
+    """Incremental harvesting high-water marks (e.g. per arXiv category)"""
+    __tablename__ = 'harvest_cursors'
+
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String(255), nullable=False, unique=True, index=True)  # e.g., "arxiv:cs.AI"
+    last_published_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
 
 class Topic(Base):
     """Topics/categories for clustering"""
@@ -107,7 +143,11 @@ class Cluster(Base):
     score = Column(Float, nullable=False, index=True)  # Overall score for ranking
     ranking_rationale = Column(Text, nullable=True)  # Explainable ranking reason
     clinical_maturity_level = Column(SQLEnum(ClinicalMaturityLevel), nullable=True, index=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    signature = Column(LargeBinary, nullable=True)  # MinHash of the seed item, for incremental matching
+    state = Column(String(20), default=ClusterState.ACTIVE.value, server_default=ClusterState.ACTIVE.value, nullable=False)
+    archived_at = Column(DateTime(timezone=True), nullable=True)
+    needs_rewrite = Column(Boolean, default=False, server_default=false(), nullable=False)  # Items changed since the Writer ran
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     raw_items = relationship("RawItem", secondary=cluster_items, back_populates="clusters")
@@ -116,6 +156,13 @@ class Cluster(Base):
     citations = relationship("Citation", back_populates="cluster", cascade="all, delete-orphan")
     briefings = relationship("DailyBriefing", secondary=briefing_clusters, back_populates="clusters")
 
+    __table_args__ = (
+        # Ranking queries only read active clusters, so archived ones stay out of the hot index
+        Index('ix_clusters_active_score', 'score',
+              postgresql_where=state == ClusterState.ACTIVE.value,
+              sqlite_where=state == ClusterState.ACTIVE.value),
+    )
+
 
 class ScoreBreakdown(Base):
     """Detailed scoring breakdown for explainability"""
@@ -8,7 +8,7 @@ from datetime import datetime, timedelta
 from typing import List
 
 from database import get_db
-from models import DailyBriefing, Cluster, ScoreBreakdown, Citation, Topic
+from models import DailyBriefing, Cluster, ClusterState, ScoreBreakdown, Citation, Topic
 from schemas import BriefingResponse, StoryItemResponse, ScoreBreakdownResponse, CitationResponse, TopicResponse
 
 router = APIRouter(prefix="/briefing", tags=["briefing"])
@@ -76,7 +76,9 @@ async def get_today_briefing(db: Session = Depends(get_db)):
     
     if not briefing:
         # If no briefing exists for today, return empty briefing with top clusters
-        clusters = db.query(Cluster).order_by(desc(Cluster.score)).limit(10).all()
+        clusters = db.query(Cluster).filter(
+            Cluster.state == ClusterState.ACTIVE.value
+        ).order_by(desc(Cluster.score)).limit(10).all()
         stories = [cluster_to_story_response(c) for c in clusters]
         
         return BriefingResponse(
@@ -7,7 +7,7 @@ from sqlalchemy import desc
 from typing import List
 
 from database import get_db
-from models import Topic, Cluster, ScoreBreakdown, Citation
+from models import Topic, Cluster, ClusterState, ScoreBreakdown, Citation
 from schemas import TopicStoriesResponse, TopicResponse, StoryItemResponse, ScoreBreakdownResponse, CitationResponse
 from routers.briefing import cluster_to_story_response
 
@@ -36,12 +36,13 @@ async def get_topic_stories(
     clusters = db.query(Cluster).join(
         Cluster.topics
     ).filter(
-        Topic.id == topic.id
+        Topic.id == topic.id,
+        Cluster.state == ClusterState.ACTIVE.value
     ).order_by(desc(Cluster.score)).offset(skip).limit(limit).all()
     
     total = db.query(Cluster).join(
         Cluster.topics
-    ).filter(Topic.id == topic.id).count()
+    ).filter(Topic.id == topic.id, Cluster.state == ClusterState.ACTIVE.value).count()
     
     stories = [cluster_to_story_response(c) for c in clusters]
     
@@ -0,0 +1,346 @@
+"""
+Tests for Cleaner article fetching
+"""
+import unittest
+from datetime import datetime, timedelta, timezone
+import threading
+import time
+import sys
+import os
+from unittest.mock import patch
+
+# Add worker to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'worker'))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from agents import cleaner
+from agents.cleaner import (
+    interleave_by_domain, fetch_articles, extract_text_from_html, extract_main_text,
+    ParseTask, Page, parse_in_batches
+)
+from agents.models import Base, Source, RawItem, SourceType, ProcessingState
+from agents.extractors import EXTRACTORS, get_extractor
+from agents.fetch_cache import FetchCache
+
+FIXTURES = os.path.join(os.path.dirname(__file__), '..', '..', 'worker', 'benchmarks', 'fixtures', 'html')
+PARSE_BATCH = cleaner.parse_batch  # the real one, for use while it is patched
+
+
+class FakeResponse:
+    def __init__(self, content, status_code=200, headers=None):
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        pass
+
+
+class TestCleanerFetching(unittest.TestCase):
+
+    def test_interleave_by_domain(self):
+        """Test URLs are ordered round-robin across hosts"""
+        urls = ["https://a.com/1", "https://a.com/2", "https://a.com/3", "https://b.com/1", "https://c.com/1"]
+        self.assertEqual(
+            interleave_by_domain(urls),
+            ["https://a.com/1", "https://b.com/1", "https://c.com/1", "https://a.com/2", "https://a.com/3"]
+        )
+
+    def test_per_domain_cap(self):
+        """Test no host sees more concurrent requests than the per-domain cap"""
+        lock = threading.Lock()
+        active = {}
+        peak = {}
+
+        def fake_get(session, url, **kwargs):
+            host = url.split("/")[2]
+            with lock:
+                active[host] = active.get(host, 0) + 1
+                peak[host] = max(peak.get(host, 0), active[host])
+            time.sleep(0.01)
+            with lock:
+                active[host] -= 1
+            return FakeResponse(f"<main>{url}</main>".encode())
+
+        urls = [f"https://{host}.com/{i}" for host in ("a", "b") for i in range(8)]
+        with patch("requests.Session.get", fake_get):
+            pages = fetch_articles(urls, max_workers=8, per_domain=2)
+
+        self.assertEqual(len(pages), 16)
+        self.assertLessEqual(max(peak.values()), 2)
+        self.assertEqual(extract_text_from_html(pages["https://a.com/3"].content), "https://a.com/3")
+
+    def test_failed_fetch_returns_none(self):
+        """Test a failing URL yields None without affecting the others"""
+        def fake_get(session, url, **kwargs):
+            if "bad" in url:
+                raise cleaner.requests.ConnectionError("boom")
+            return FakeResponse(b"<article>ok</article>")
+
+        with patch("requests.Session.get", fake_get):
+            pages = fetch_articles(["https://bad.com/x", "https://good.com/y"])
+
+        self.assertIsNone(pages["https://bad.com/x"])
+        self.assertEqual(extract_text_from_html(pages["https://good.com/y"].content), "ok")
+
+
+class TestExtractors(unittest.TestCase):
+
+    def test_backends_match_reference_on_fixtures(self):
+        """Test every backend extracts the same text as the bs4 reference"""
+        for name in sorted(os.listdir(FIXTURES)):
+            with open(os.path.join(FIXTURES, name), 'rb') as f:
+                content = f.read()
+            expected = EXTRACTORS['bs4'](content, 10000)
+            for backend, extract in EXTRACTORS.items():
+                with self.subTest(page=name, backend=backend):
+                    self.assertEqual(extract(content, 10000), expected)
+
+    def test_stream_skips_script_and_prefers_main(self):
+        """Test script/style text is dropped and <main> wins over <body>"""
+        html = b"<body><p>nav</p><script>var x = '<main>';</script><main>Story <style>p{}</style>text</main></body>"
+        self.assertEqual(get_extractor('stream')(html, 10000), "Story text")
+
+    def test_stream_stops_at_limit(self):
+        """Test output is capped at the character limit"""
+        html = b"<body>" + b"<p>word</p>" * 1000 + b"</body>"
+        self.assertEqual(get_extractor('stream')(html, 50), ("word " * 10)[:50])
+
+    def test_unknown_backend(self):
+        """Test an unknown backend name raises"""
+        with self.assertRaises(ValueError):
+            get_extractor('nope')
+
+
+class CrashOutside:
+    """parse_batch stand-in that kills any process but the test's own"""
+
+    def __init__(self, pid):
+        self.pid = pid
+
+    def __call__(self, batch, extractor):
+        if os.getpid() != self.pid:
+            os._exit(1)
+        return PARSE_BATCH(batch, extractor)
+
+
+class TestParseStage(unittest.TestCase):
+
+    def test_process_pool_returns_every_batch(self):
+        """Test batches parsed in worker processes all come back"""
+        tasks = [
+            ParseTask(i, f"Item {i}", f"<main>Body of item {i} with enough words to pass the filter</main>".encode(), None)
+            for i in range(5)
+        ]
+        tasks.append(ParseTask(5, "Casino bonus", None, "A long enough fallback body to not count as short"))
+
+        batches = list(parse_in_batches(tasks, workers=2, batch_size=2))
+        results = {item_id: (text, spam) for batch in batches for item_id, text, spam in batch}
+
+        self.assertEqual(len(batches), 3)
+        self.assertEqual(results[3], ("Body of item 3 with enough words to pass the filter", False))
+        self.assertEqual(results[5], (None, True))
+
+    def test_pool_is_reused(self):
+        """Test successive runs share one process pool"""
+        tasks = [ParseTask(i, f"Item {i}", f"<main>Body {i}</main>".encode(), None) for i in range(4)]
+        list(parse_in_batches(tasks, workers=2, batch_size=2))
+        pool = cleaner.get_parse_pool()
+        list(parse_in_batches(tasks, workers=2, batch_size=2))
+        self.assertIs(cleaner.get_parse_pool(), pool)
+
+    def test_broken_pool_falls_back_inline(self):
+        """Test batches lost to a dead pool process are parsed inline and the pool replaced"""
+        tasks = [
+            ParseTask(i, f"Item {i}", f"<main>Body of item {i} with enough words to pass the filter</main>".encode(), None)
+            for i in range(4)
+        ]
+        broken = cleaner.get_parse_pool(2)
+        with patch.object(cleaner, "parse_batch", CrashOutside(os.getpid())):
+            batches = list(parse_in_batches(tasks, workers=2, batch_size=2))
+
+        self.assertEqual(sorted(item_id for batch in batches for item_id, _, _ in batch), [0, 1, 2, 3])
+        self.assertIsNot(cleaner.get_parse_pool(), broken)
+
+    def test_run_applies_parsed_text_and_drops_spam(self):
+        """Test the Cleaner stores extracted text and deletes spam items"""
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        source = Source(name="Feed", url="https://example.com/feed", source_type=SourceType.RSS)
+        db.add(source)
+        db.flush()
+        db.add_all([
+            RawItem(source_id=source.id, title="Model release", url="https://Example.com/a/"),
+            RawItem(source_id=source.id, title="Win the lottery", url="https://example.com/b"),
+        ])
+        db.commit()
+
+        pages = {
+            "https://example.com/a/": Page(b"<article>The lab released a new model with open weights today.</article>"),
+            "https://example.com/b": Page(b"<article>Claim your prize now, limited time offer for readers.</article>"),
+        }
+        with patch.object(cleaner, "get_fetch_cache", return_value=None), \
+                patch.object(cleaner, "fetch_articles", return_value=pages):
+            result = cleaner.run(db)
+
+        self.assertEqual(result, {"processed": 1, "normalized": 1, "spam_filtered": 1, "failed": 0})
+        remaining = db.query(RawItem).all()
+        self.assertEqual(len(remaining), 1)
+        self.assertEqual(remaining[0].content, "The lab released a new model with open weights today.")
+        self.assertEqual(remaining[0].processing_state, ProcessingState.DONE.value)
+        self.assertIsNotNone(remaining[0].cleaned_at)
+
+
+class TestProcessingState(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        source = Source(name="Feed", url="https://example.com/feed", source_type=SourceType.RSS)
+        self.db.add(source)
+        self.db.flush()
+        self.item = RawItem(source_id=source.id, title="Unreachable", url="https://example.com/gone")
+        self.done = RawItem(source_id=source.id, title="Has content", url="https://example.com/ok",
+                            content="Already has content", processing_state=ProcessingState.DONE.value)
+        self.db.add_all([self.item, self.done])
+        self.db.commit()
+
+    def run_cleaner(self):
+        with patch.object(cleaner, "get_fetch_cache", return_value=None), \
+                patch.object(cleaner, "fetch_articles", return_value={}) as fetch:
+            result = cleaner.run(self.db)
+        return result, fetch
+
+    def test_only_pending_items_are_claimed(self):
+        """Test done items are never claimed"""
+        self.assertEqual([item.id for item in cleaner.claim_pending(self.db)], [self.item.id])
+
+    def test_failed_extraction_backs_off(self):
+        """Test a failed item is retried only after its backoff elapses"""
+        result, _ = self.run_cleaner()
+        self.assertEqual(result["failed"], 1)
+        self.assertEqual(self.item.attempts, 1)
+        self.assertEqual(self.item.processing_state, ProcessingState.PENDING.value)
+        self.assertIsNotNone(self.item.next_attempt_at)
+
+        result, fetch = self.run_cleaner()
+        self.assertEqual(result["processed"], 0)
+        fetch.assert_called_once_with([], validators={})
+
+    def test_gives_up_after_max_attempts(self):
+        """Test poison items stop being claimed"""
+        for _ in range(cleaner.MAX_ATTEMPTS):
+            self.item.next_attempt_at = None
+            self.db.commit()
+            self.run_cleaner()
+
+        self.assertEqual(self.item.attempts, cleaner.MAX_ATTEMPTS)
+        self.assertEqual(self.item.processing_state, ProcessingState.FAILED.value)
+        self.assertEqual(cleaner.claim_pending(self.db), [])
+
+    def test_claim_leases_items(self):
+        """Test a claimed item is skipped by other claims until its lease runs out"""
+        self.assertEqual([item.id for item in cleaner.claim_pending(self.db)], [self.item.id])
+        self.assertEqual(cleaner.claim_pending(self.db), [])
+
+        # A worker that died mid-fetch: its lease lapses and the item is claimable again
+        self.item.next_attempt_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+        self.db.commit()
+        self.assertEqual([item.id for item in cleaner.claim_pending(self.db)], [self.item.id])
+
+    def test_fetch_runs_outside_a_transaction(self):
+        """Test no transaction (and so no row lock) is held while pages are fetched"""
+        in_transaction = []
+
+        def fetch(urls, validators):
+            in_transaction.append(self.db.in_transaction())
+            return {}
+
+        with patch.object(cleaner, "get_fetch_cache", return_value=None), \
+                patch.object(cleaner, "fetch_articles", side_effect=fetch):
+            cleaner.run(self.db)
+        self.assertEqual(in_transaction, [False])
+        self.assertEqual(self.item.attempts, 1)
+
+
+class FakeClock:
+    """Manually advanced clock for testing"""
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestFetchCache(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = FetchCache(":memory:", max_bytes=100, ttl_seconds=60, clock=self.clock)
+
+    def tearDown(self):
+        self.cache.close()
+
+    def test_lru_eviction(self):
+        """Test least recently used entries are evicted once over the size budget"""
+        self.cache.put("https://a.com/1", "a" * 40)
+        self.clock.now += 1
+        self.cache.put("https://a.com/2", "b" * 40)
+        self.clock.now += 1
+        self.cache.get("https://a.com/1")
+        self.clock.now += 1
+        self.cache.put("https://a.com/3", "c" * 40)
+
+        self.assertIsNotNone(self.cache.get("https://a.com/1"))
+        self.assertIsNone(self.cache.get("https://a.com/2"))
+        self.assertIsNotNone(self.cache.get("https://a.com/3"))
+        self.assertLessEqual(self.cache.total_bytes(), 100)
+
+    def test_puts_under_budget_skip_the_size_scan(self):
+        """Test the running total tracks replacements without summing the table on each put"""
+        statements = []
+        self.cache._conn.set_trace_callback(statements.append)
+        self.cache.put("https://a.com/1", "a" * 40)
+        self.cache.put("https://a.com/1", "a" * 10)
+        self.cache.put("https://a.com/2", "b" * 50)
+        self.cache._conn.set_trace_callback(None)
+
+        self.assertFalse([sql for sql in statements if "SUM(size)" in sql])
+        self.assertEqual(self.cache._bytes, 60)
+        self.assertEqual(self.cache.total_bytes(), 60)
+
+    def test_fresh_entry_skips_network(self):
+        """Test a fresh entry is served without a request"""
+        self.cache.put("https://a.com/1", "cached text")
+        with patch("requests.get") as get:
+            self.assertEqual(extract_main_text("https://a.com/1", cache=self.cache), "cached text")
+        get.assert_not_called()
+
+    def test_stale_entry_revalidates(self):
+        """Test a stale entry sends validators and a 304 refreshes it"""
+        self.cache.put("https://a.com/1", "cached text", etag='"v1"')
+        self.clock.now += 120
+
+        with patch("requests.get", return_value=FakeResponse(b"", status_code=304)) as get:
+            self.assertEqual(extract_main_text("https://a.com/1", cache=self.cache), "cached text")
+        self.assertEqual(get.call_args.kwargs["headers"]["If-None-Match"], '"v1"')
+        self.assertTrue(self.cache.is_fresh(self.cache.get("https://a.com/1")))
+
+    def test_changed_page_replaces_entry(self):
+        """Test a 200 on revalidation re-extracts and stores the new text"""
+        self.cache.put("https://a.com/1", "old text", etag='"v1"')
+        self.clock.now += 120
+
+        response = FakeResponse(b"<main>new text</main>", headers={"ETag": '"v2"'})
+        with patch("requests.get", return_value=response):
+            self.assertEqual(extract_main_text("https://a.com/1", cache=self.cache), "new text")
+        entry = self.cache.get("https://a.com/1")
+        self.assertEqual((entry.text, entry.etag), ("new text", '"v2"'))
+
+
+if __name__ == '__main__':
+    unittest.main()
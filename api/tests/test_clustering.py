@@ -1,14 +1,46 @@
 """
 Tests for clustering agent
 """
+import hashlib
 import unittest
 import sys
 import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
 
 # Add worker to path for agent imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'worker'))
 
-from agents.cluster import similarity_score
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from agents import embeddings
+from agents.cluster import (
+    similarity_score, candidate_pairs, group_items, group_semantic, match_returned_ids, UnionFind,
+    run as cluster_run
+)
+from agents import maintenance
+from agents.embeddings import EmbeddingStore
+from agents.editor import run as editor_run
+from agents.tagger import run as tagger_run
+from agents.writer import run as writer_run
+from agents.cluster_index import ClusterIndex, encode_signature, decode_signature
+from agents.models import (
+    Base, Source, RawItem, SourceType, Cluster, ClusterState, DailyBriefing, ScoreBreakdown, Topic
+)
+from agents.tfidf import tfidf_groups
+from agents.minhash import MinHasher, LSHIndex, estimate_jaccard
+
+STORY = ("Anthropic released a new model on Tuesday that the company says improves coding and "
+         "long-context reasoning, with pricing unchanged from the previous generation.")
+ROBOT_STORY = ("A warehouse robot from a startup learned new grasping and manipulation skills from "
+               "a few demonstrations, picking unfamiliar objects off cluttered shelves on the first try.")
+OTHER = ("Regulators in the EU opened a consultation on medical AI devices, asking hospitals "
+         "and vendors for evidence on post-market monitoring of diagnostic software.")
 
 
 class TestClustering(unittest.TestCase):
@@ -45,5 +77,478 @@ class TestClustering(unittest.TestCase):
         self.assertEqual(score3, 0.0)
 
 
+class TestMinHashLSH(unittest.TestCase):
+
+    def test_signature_estimates_jaccard(self):
+        """Test near-duplicates agree on most permutations and unrelated texts on few"""
+        hasher = MinHasher()
+        near = STORY.replace("Tuesday", "Wednesday")
+        self.assertGreater(estimate_jaccard(hasher.text_signature(STORY), hasher.text_signature(near)), 0.7)
+        self.assertLess(estimate_jaccard(hasher.text_signature(STORY), hasher.text_signature(OTHER)), 0.2)
+
+    def test_signatures_are_stable(self):
+        """Test the same seed gives the same signature across instances"""
+        self.assertTrue((MinHasher().text_signature(STORY) == MinHasher().text_signature(STORY)).all())
+
+    def test_index_query_and_remove(self):
+        """Test an indexed near-duplicate is found and removed entries aren't"""
+        hasher = MinHasher()
+        index = LSHIndex()
+        signature = hasher.text_signature(STORY)
+        index.insert("a", signature)
+        index.insert("b", hasher.text_signature(OTHER))
+        self.assertEqual(index.query(hasher.text_signature(STORY + " Updated.")), {"a"})
+        index.remove("a", signature)
+        self.assertEqual(index.query(signature), set())
+
+    def test_candidate_pairs(self):
+        """Test only near-duplicate texts become candidates"""
+        hasher = MinHasher()
+        signatures = [hasher.text_signature(text) for text in [STORY, OTHER, STORY.replace("Tuesday", "Monday")]]
+        self.assertEqual(candidate_pairs(signatures), {(0, 2)})
+
+    def test_group_items(self):
+        """Test near-duplicates share a group and others stay single"""
+        items = [
+            SimpleNamespace(id=1, title="New model", content=STORY),
+            SimpleNamespace(id=2, title="Medical AI consultation", content=OTHER),
+            SimpleNamespace(id=3, title="New model", content=STORY.replace("Tuesday", "Monday")),
+        ]
+        groups = group_items(items)
+        self.assertEqual([[item.id for item in group] for group in groups], [[1, 3], [2]])
+
+    def test_groups_merge_transitively(self):
+        """Test a chain of similar items forms one group in any input order"""
+        edited = STORY.replace("on Tuesday that the company says improves coding",
+                               "on Tuesday which, the company said, speeds up coding")
+        rewritten = edited.replace("with pricing unchanged from the previous generation",
+                                   "and it ships to developers at the same price as before")
+        items = [
+            SimpleNamespace(id=1, title="New model", content=STORY),
+            SimpleNamespace(id=2, title="Medical AI consultation", content=OTHER),
+            SimpleNamespace(id=3, title="New model", content=edited),
+            SimpleNamespace(id=4, title="New model", content=rewritten),
+        ]
+        for ordered in (items, items[::-1]):
+            groups = group_items(ordered, engine="lexical")
+            self.assertEqual(sorted(sorted(item.id for item in group) for group in groups), [[1, 3, 4], [2]])
+
+    def test_union_find(self):
+        """Test sets merge once and come out ordered by smallest member"""
+        sets = UnionFind(5)
+        self.assertTrue(sets.union(3, 1))
+        self.assertTrue(sets.union(4, 3))
+        self.assertFalse(sets.union(1, 4))
+        self.assertEqual(sets.find(4), 1)
+        self.assertEqual(sets.groups(), [[0], [1, 3, 4], [2]])
+
+
+class TestTfidfEngine(unittest.TestCase):
+
+    def test_groups_reworded_story(self):
+        """Test rewordings of one story are linked and unrelated text isn't"""
+        texts = [STORY, OTHER, "The company said Anthropic's new model improves coding and long-context reasoning."]
+        self.assertEqual(tfidf_groups(texts, threshold=0.3), [[0, 2], [1]])
+
+    def test_links_are_transitive(self):
+        """Test a chain of similar texts forms one group"""
+        texts = ["alpha beta gamma delta", "beta gamma delta epsilon", "gamma delta epsilon zeta", "unrelated words here"]
+        self.assertEqual(tfidf_groups(texts, threshold=0.3), [[0, 1, 2], [3]])
+
+    def test_empty_inputs(self):
+        """Test no texts and stop-word-only texts don't fail"""
+        self.assertEqual(tfidf_groups([], threshold=0.5), [])
+        self.assertEqual(tfidf_groups(["the", "and"], threshold=0.5), [[0], [1]])
+
+    def test_engine_selection(self):
+        """Test group_items dispatches by engine name"""
+        items = [SimpleNamespace(id=1, title="New model", content=STORY), SimpleNamespace(id=2, title="EU", content=OTHER)]
+        self.assertEqual(len(group_items(items, engine="tfidf")), 2)
+        with self.assertRaises(ValueError):
+            group_items(items, engine="nope")
+
+
+class TestIncrementalClustering(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.source = Source(name="Feed", url="https://example.com/feed", source_type=SourceType.RSS)
+        self.db.add(self.source)
+        self.db.commit()
+        self.index = ClusterIndex()
+
+    def add_item(self, url, title, content):
+        item = RawItem(source_id=self.source.id, title=title, url=url, content=content)
+        self.db.add(item)
+        self.db.commit()
+        return item
+
+    def test_signature_round_trip(self):
+        """Test signatures survive the bytes encoding"""
+        signature = MinHasher().text_signature(STORY)
+        self.assertTrue((decode_signature(encode_signature(signature)) == signature).all())
+
+    def test_follow_up_joins_existing_cluster(self):
+        """Test a later near-duplicate is attached instead of starting a new cluster"""
+        first = self.add_item("https://example.com/1", "New model", STORY)
+        result = cluster_run(self.db, index=self.index)
+        self.assertEqual(result["clusters_created"], 1)
+
+        follow_up = self.add_item("https://example.com/2", "New model", STORY.replace("Tuesday", "Wednesday"))
+        unrelated = self.add_item("https://example.com/3", "Medical AI consultation", OTHER)
+        result = cluster_run(self.db, index=self.index)
+        self.assertEqual((result["clusters_created"], result["items_attached"]), (1, 1))
+
+        cluster = self.db.query(Cluster).filter(Cluster.id == first.clusters[0].id).one()
+        self.assertEqual({item.id for item in cluster.raw_items}, {first.id, follow_up.id})
+        self.assertNotEqual(unrelated.clusters[0].id, cluster.id)
+
+    def test_attach_triggers_rescore(self):
+        """Test a cluster that gains items is returned, invalidated and re-scored by the Editor"""
+        first = self.add_item("https://example.com/1", "New model", STORY)
+        cluster_run(self.db, index=self.index)
+        cluster_id = first.clusters[0].id
+        self.assertEqual(editor_run(self.db, cluster_ids=[cluster_id])["scored"], 1)
+        self.assertEqual(editor_run(self.db, cluster_ids=[cluster_id])["scored"], 0)
+
+        self.add_item("https://example.com/2", "New model", STORY + " Shares rose.")
+        result = cluster_run(self.db, index=self.index)
+        self.assertEqual((result["clusters_updated"], result["cluster_ids"]), (1, [cluster_id]))
+        self.assertIsNone(self.db.get(Cluster, cluster_id).score_breakdown)
+        self.assertEqual(editor_run(self.db, cluster_ids=result["cluster_ids"])["scored"], 1)
+
+    def run_pipeline(self, cluster_ids):
+        tagger_run(self.db, cluster_ids=cluster_ids)
+        editor_run(self.db, cluster_ids=cluster_ids)
+        writer_run(self.db, cluster_ids=cluster_ids)
+        cluster = self.db.get(Cluster, cluster_ids[0])
+        return [topic.slug for topic in cluster.topics], cluster.score_breakdown.relevance_score, cluster
+
+    def test_attach_keeps_topics_and_relevance(self):
+        """Test a cluster that gains an item keeps its text for re-tagging and re-scoring, then is rewritten"""
+        self.db.add_all([Topic(name="Robotics", slug="robotics"), Topic(name="General AI", slug="general-ai")])
+        self.add_item("https://example.com/1", "Warehouse robot", ROBOT_STORY)
+        before = self.run_pipeline(cluster_run(self.db, index=self.index)["cluster_ids"])
+
+        self.add_item("https://example.com/2", "Warehouse robot", ROBOT_STORY + " Shipping starts next year.")
+        result = cluster_run(self.db, index=self.index)
+        self.assertEqual(result["clusters_updated"], 1)
+        after = self.run_pipeline(result["cluster_ids"])
+
+        self.assertEqual(after[:2], before[:2])
+        self.assertEqual(after[0], ["robotics"])
+        self.assertAlmostEqual(after[1], 0.83)
+        self.assertFalse(after[2].needs_rewrite)
+        self.assertIn("(Based on 2 sources)", after[2].summary)
+
+    def test_fresh_index_loads_persisted_signatures(self):
+        """Test a new worker process picks up clusters created by an earlier one"""
+        first = self.add_item("https://example.com/1", "New model", STORY)
+        cluster_run(self.db, index=self.index)
+
+        self.add_item("https://example.com/2", "New model", STORY + " Shares rose.")
+        result = cluster_run(self.db, index=ClusterIndex())
+        self.assertEqual(result["items_attached"], 1)
+        self.assertEqual(len(first.clusters[0].raw_items), 2)
+
+    def record_statements(self, run):
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(self.db.get_bind(), "before_cursor_execute", listener)
+        try:
+            run()
+        finally:
+            event.remove(self.db.get_bind(), "before_cursor_execute", listener)
+        return statements
+
+    def test_statement_count_is_constant(self):
+        """Test a run issues the same number of statements for 5 and 50 new clusters"""
+        counts = []
+        page_size = self.db.get_bind().dialect.insertmanyvalues_page_size
+        for size in (5, 50):
+            start = self.db.query(RawItem).count()
+            self.db.add_all([
+                RawItem(source_id=self.source.id, title=f"Story {start + i}", url=f"https://example.com/{start + i}",
+                        content=" ".join(hashlib.md5(f"{start + i}/{j}".encode()).hexdigest()[:8] for j in range(40)))
+                for i in range(size)
+            ])
+            self.db.commit()
+            statements = self.record_statements(lambda: cluster_run(self.db, index=self.index))
+            cluster_inserts = [sql for sql in statements if sql.startswith("INSERT INTO clusters")]
+            self.assertLessEqual(len(cluster_inserts), -(-size // page_size))
+            counts.append(len(statements))
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(self.db.query(Cluster).count(), 55)
+        for cluster in self.db.query(Cluster):
+            self.assertEqual([item.title for item in cluster.raw_items], [cluster.title])
+
+    def test_refresh_loads_lower_ids_committed_later(self):
+        """Test a cluster committed after a higher id was loaded is still picked up"""
+        now = datetime.now(timezone.utc)
+        signature = MinHasher().text_signature(STORY)
+        self.db.add(Cluster(id=2, title="Later id", score=0.5, signature=encode_signature(signature), created_at=now))
+        self.db.commit()
+        index = ClusterIndex()
+        self.assertEqual(index.refresh(self.db), 1)
+
+        slow = MinHasher().text_signature(OTHER)
+        self.db.add(Cluster(id=1, title="Slow commit", score=0.5, signature=encode_signature(slow),
+                            created_at=now - timedelta(seconds=30)))
+        self.db.commit()
+        self.assertEqual(index.refresh(self.db), 1)
+        self.assertEqual(index.match(slow), 1)
+        self.assertEqual(index.refresh(self.db), 0)
+
+    def test_returned_ids_are_matched_by_value(self):
+        """Test inserted cluster ids pair with their rows whatever order RETURNING gives them in"""
+        rows = [
+            {"title": "A", "summary": None, "signature": b"1"},
+            {"title": "B", "summary": "b", "signature": b"2"},
+            {"title": "A", "summary": None, "signature": b"1"},
+        ]
+        returned = [(12, "B", "b", memoryview(b"2")), (13, "A", None, b"1"), (11, "A", None, b"1")]
+        self.assertEqual(match_returned_ids(rows, returned), [11, 12, 13])
+
+    def test_old_clusters_expire(self):
+        """Test clusters outside the window are neither loaded nor kept"""
+        signature = MinHasher().text_signature(STORY)
+        old = datetime.now(timezone.utc) - timedelta(days=30)
+        self.db.add(Cluster(title="Old", score=0.5, signature=encode_signature(signature), created_at=old))
+        self.db.commit()
+        index = ClusterIndex(window_days=7)
+        index.refresh(self.db)
+        self.assertEqual(len(index), 0)
+
+        index.add(99, signature, old)
+        self.assertEqual(index.match(signature), 99)
+        index.expire()
+        self.assertIsNone(index.match(signature))
+
+
+class TestClusterMaintenance(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.source = Source(name="Feed", url="https://example.com/feed", source_type=SourceType.RSS)
+        self.db.add(self.source)
+        self.db.commit()
+        self.hasher = MinHasher()
+
+    def add_cluster(self, text, created_at=None):
+        item = RawItem(source_id=self.source.id, title="Story", url=f"https://example.com/{len(text)}/{id(text)}",
+                       content=text)
+        cluster = Cluster(title="Story", summary=text, score=0.5, signature=encode_signature(self.hasher.text_signature(text)),
+                          created_at=created_at or datetime.now(timezone.utc), raw_items=[item])
+        self.db.add(cluster)
+        self.db.commit()
+        return cluster
+
+    def test_converged_clusters_merge_into_oldest(self):
+        """Test near-duplicate clusters from separate runs merge, keeping items and briefing links"""
+        first = self.add_cluster(STORY)
+        second = self.add_cluster(STORY + " Shares rose.")
+        other = self.add_cluster(OTHER)
+        self.db.add(ScoreBreakdown(cluster_id=first.id, relevance_score=0.5, impact_score=0.5,
+                                   credibility_score=0.5, novelty_score=0.5, corroboration_score=0.5))
+        self.db.add(DailyBriefing(briefing_date=datetime(2026, 10, 1), content="", clusters=[second, other]))
+        self.db.commit()
+        first_id, second_id, other_id = first.id, second.id, other.id
+        index = ClusterIndex()
+        index.refresh(self.db)
+
+        result = maintenance.run(self.db, index=index)
+        self.db.expire_all()
+
+        self.assertEqual((result["clusters_merged"], result["merged_cluster_ids"]), (1, [first_id]))
+        self.assertIsNone(self.db.get(Cluster, second_id))
+        survivor = self.db.get(Cluster, first_id)
+        self.assertEqual(len(survivor.raw_items), 2)
+        self.assertIsNone(survivor.score_breakdown)
+        self.assertTrue(survivor.needs_rewrite)
+        briefing = self.db.query(DailyBriefing).one()
+        self.assertEqual(sorted(cluster.id for cluster in briefing.clusters), [first_id, other_id])
+        self.assertNotIn(second_id, index)
+
+    def test_merged_survivor_keeps_topics_and_score(self):
+        """Test a merge survivor is re-tagged and re-scored from its text, not an emptied summary"""
+        self.db.add_all([Topic(name="Robotics", slug="robotics"), Topic(name="General AI", slug="general-ai")])
+        first = self.add_cluster(ROBOT_STORY)
+        second = self.add_cluster(ROBOT_STORY + " Shipping starts next year.")
+        first_id, second_id = first.id, second.id
+        tagger_run(self.db, cluster_ids=[first_id, second_id])
+        editor_run(self.db, cluster_ids=[first_id, second_id])
+        before = self.db.get(Cluster, first_id).score
+
+        survivors = maintenance.run(self.db, index=ClusterIndex())["merged_cluster_ids"]
+        self.assertEqual(survivors, [first_id])
+        tagger_run(self.db, cluster_ids=survivors)
+        editor_run(self.db, cluster_ids=survivors)
+        writer_run(self.db, cluster_ids=survivors)
+
+        survivor = self.db.get(Cluster, first_id)
+        self.assertEqual([topic.slug for topic in survivor.topics], ["robotics"])
+        self.assertAlmostEqual(survivor.score_breakdown.relevance_score, 0.83)
+        self.assertGreater(survivor.score, before)
+        self.assertFalse(survivor.needs_rewrite)
+
+    def test_stale_clusters_are_archived(self):
+        """Test clusters past the retire window are archived and dropped from matching"""
+        old = self.add_cluster(STORY, created_at=datetime.now(timezone.utc) - timedelta(days=60))
+        fresh = self.add_cluster(OTHER)
+        old_id, fresh_id = old.id, fresh.id
+        index = ClusterIndex(window_days=90)
+        index.refresh(self.db)
+
+        result = maintenance.run(self.db, index=index, retire_days=30)
+        self.db.expire_all()
+
+        self.assertEqual(result["clusters_retired"], 1)
+        self.assertEqual(self.db.get(Cluster, old_id).state, ClusterState.ARCHIVED.value)
+        self.assertIsNotNone(self.db.get(Cluster, old_id).archived_at)
+        self.assertEqual(self.db.get(Cluster, fresh_id).state, ClusterState.ACTIVE.value)
+        self.assertNotIn(old_id, index)
+        self.assertEqual(ClusterIndex(window_days=90).refresh(self.db), 1)
+
+
+class BagOfWordsEncoder:
+    """Deterministic stand-in for a sentence model: normalized hashed word counts"""
+
+    def __init__(self, dim=64):
+        self.dim = dim
+        self.calls = 0
+
+    def __call__(self, texts):
+        self.calls += len(texts)
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, sum(map(ord, word)) % self.dim] += 1
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+
+
+class TestSemanticEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.encoder = BagOfWordsEncoder()
+
+    def store(self):
+        return EmbeddingStore(self.tmp.name, model_name="test-model", encoder=self.encoder)
+
+    def test_groups_reworded_story(self):
+        """Test a reordering of the same story is grouped and unrelated text isn't"""
+        reordered = " ".join(reversed(STORY.split()))
+        items = [
+            SimpleNamespace(id=1, title="Model", content=STORY),
+            SimpleNamespace(id=2, title="EU", content=OTHER),
+            SimpleNamespace(id=3, title="Model", content=reordered),
+        ]
+        groups = group_semantic(items, threshold=0.9, store=self.store())
+        self.assertEqual([[item.id for item in group] for group in groups], [[1, 3], [2]])
+
+    def test_embeddings_are_computed_once(self):
+        """Test cached vectors are reused in memory and after reloading from disk"""
+        store = self.store()
+        first = store.embed([(1, STORY), (2, OTHER)])
+        store.save()
+        self.assertEqual(first.dtype, np.float16)
+        store.embed([(1, STORY), (3, STORY + " Update.")])
+        self.assertEqual(self.encoder.calls, 3)
+
+        store.save()
+        reloaded = self.store()
+        self.assertEqual(len(reloaded), 3)
+        self.assertTrue((reloaded.embed([(1, STORY)]) == first[:1]).all())
+        self.assertEqual(self.encoder.calls, 3)
+
+    def test_other_models_are_ignored(self):
+        """Test vectors from a different model aren't reused"""
+        store = self.store()
+        store.embed([(1, STORY)])
+        store.save()
+        self.assertEqual(len(EmbeddingStore(self.tmp.name, model_name="other", encoder=self.encoder)), 0)
+
+    def test_chunks_are_compacted(self):
+        """Test appended chunks are folded into one file past the limit"""
+        store = self.store()
+        with patch.object(embeddings, "MAX_CHUNKS", 2):
+            for item_id in range(3):
+                store.embed([(item_id, f"story number {item_id}")])
+                store.save()
+        self.assertEqual(len(store._chunk_paths()), 1)
+        self.assertEqual(len(self.store()), 3)
+
+    def test_reload_uses_stored_bucket_keys(self):
+        """Test loading refills the ANN buckets from saved keys instead of re-projecting"""
+        store = self.store()
+        store.embed([(1, STORY), (2, OTHER)])
+        store.save()
+        with patch.object(embeddings.HyperplaneLSH, "keys", side_effect=AssertionError("re-projected")):
+            reloaded = self.store()
+            self.assertTrue((reloaded.keys([1, 2]) == store.keys([1, 2])).all())
+
+    def test_vectors_outside_window_are_pruned(self):
+        """Test rows older than the window leave memory, the ANN buckets and disk"""
+        now = [1_000_000.0]
+        store = EmbeddingStore(self.tmp.name, model_name="test-model", encoder=self.encoder,
+                               window_days=1, clock=lambda: now[0])
+        vector = store.embed([(1, STORY)])[0].astype(np.float32)
+        store.save()
+        now[0] += 2 * 86400
+        store.embed([(2, OTHER)])
+        store.save()
+
+        self.assertNotIn(1, store)
+        self.assertEqual(store.neighbours(vector, 0.9), [])
+        self.assertEqual(len(store._chunk_paths()), 1)
+        reloaded = EmbeddingStore(self.tmp.name, model_name="test-model", encoder=self.encoder,
+                                  window_days=1, clock=lambda: now[0])
+        self.assertEqual(len(reloaded), 1)
+        self.assertIn(2, reloaded)
+
+    def test_buffers_grow_in_place(self):
+        """Test rows survive the buffers growing past their initial capacity"""
+        with patch.object(embeddings, "INITIAL_CAPACITY", 2):
+            store = self.store()
+            texts = [(item_id, f"story number {item_id} about topic {item_id * 7}") for item_id in range(9)]
+            for pair in texts:
+                store.embed([pair])
+        self.assertTrue((store.embed(texts) == self.encoder([text for _, text in texts]).astype(np.float16)).all())
+
+    def test_follow_up_joins_cluster_from_earlier_run(self):
+        """Test a reworded follow-up attaches through the store's index to an earlier run's cluster"""
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        source = Source(name="Feed", url="https://example.com/feed", source_type=SourceType.RSS)
+        db.add(source)
+        db.commit()
+        index = ClusterIndex()
+        first = RawItem(source_id=source.id, title="Model", url="https://example.com/1", content=STORY)
+        db.add(first)
+        db.commit()
+        cluster_run(db, index=index, engine="semantic", store=self.store())
+
+        reordered = " ".join(reversed(STORY.split()))
+        follow_up = RawItem(source_id=source.id, title="Model", url="https://example.com/2", content=reordered)
+        db.add(follow_up)
+        db.commit()
+        result = cluster_run(db, index=index, engine="semantic", store=self.store())
+        self.assertEqual((result["clusters_created"], result["items_attached"]), (0, 1))
+        self.assertEqual(follow_up.clusters[0].id, first.clusters[0].id)
+
+    def test_missing_package_is_explicit(self):
+        """Test the semantic engine asks for sentence-transformers when it isn't installed"""
+        items = [SimpleNamespace(id=1, title="Model", content=STORY)]
+        with patch.object(embeddings, "SentenceTransformer", None):
+            with self.assertRaisesRegex(RuntimeError, "sentence-transformers"):
+                group_items(items, engine="semantic")
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,53 @@
+"""
+Tests for compiled keyword matcher
+"""
+import unittest
+import sys
+import os
+
+# Add worker to path for agent imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'worker'))
+
+from agents.keywords import KeywordMatcher
+
+
+class TestKeywordMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = KeywordMatcher({
+            "robotics": ["robot", "autonomous robot", "self-driving"],
+            "medicine": ["clinical", "clinical trial"],
+            "meta": ["meta ai", "FAIR"],
+        })
+
+    def test_word_boundaries(self):
+        """Test patterns don't match inside longer words"""
+        self.assertEqual(self.matcher.counts("robotics news"), {})
+        self.assertEqual(self.matcher.counts("a robot arm"), {"robotics": 1})
+
+    def test_overlapping_phrases_counted_distinctly(self):
+        """Test a phrase and its prefix are both reported"""
+        counts = self.matcher.counts("Randomized clinical trial of an autonomous robot")
+        self.assertEqual(counts, {"medicine": 2, "robotics": 2})
+
+    def test_punctuation_insensitive(self):
+        """Test hyphenated patterns match regardless of punctuation"""
+        self.assertEqual(self.matcher.counts("Self driving cars"), {"robotics": 1})
+
+    def test_acronyms_are_case_sensitive(self):
+        """Test all-caps patterns only match the acronym"""
+        self.assertIsNone(self.matcher.first_label("A fair comparison by Jane Fair"))
+        self.assertEqual(self.matcher.first_label("Jane Doe (FAIR)"), "meta")
+
+    def test_first_label_uses_registration_order(self):
+        """Test the earliest registered label wins when several match"""
+        self.assertEqual(self.matcher.first_label("Meta AI clinical robot"), "robotics")
+
+    def test_empty_text(self):
+        """Test matching empty or missing text"""
+        self.assertEqual(self.matcher.counts(""), {})
+        self.assertIsNone(self.matcher.first_label(None))
+
+
+if __name__ == '__main__':
+    unittest.main()
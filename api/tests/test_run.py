@@ -0,0 +1,79 @@
+"""
+Tests for the worker CLI pipelines
+"""
+import unittest
+import sys
+import os
+from datetime import date, datetime
+from unittest.mock import MagicMock, call, patch
+
+# Add worker to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'worker'))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import run
+from agents.briefing import latest_briefing_date
+from agents.models import Base, DailyBriefing
+
+
+class TestRunMaintenance(unittest.TestCase):
+
+    def patch_agents(self, merged_cluster_ids):
+        agents = MagicMock()
+        agents.maintenance.return_value = {
+            "clusters_merged": len(merged_cluster_ids),
+            "clusters_retired": 0,
+            "merged_cluster_ids": merged_cluster_ids
+        }
+        for name, mock in [("maintenance_run", agents.maintenance), ("tagger_run", agents.tagger),
+                           ("editor_run", agents.editor), ("writer_run", agents.writer)]:
+            patcher = patch.object(run, name, mock)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        return agents
+
+    def test_survivors_are_retagged_rescored_and_rewritten(self):
+        """Test merged survivors go through the Tagger, Editor and Writer in pipeline order"""
+        agents = self.patch_agents([3, 7])
+        db = object()
+        run.run_maintenance(db)
+        self.assertEqual(agents.mock_calls, [
+            call.maintenance(db),
+            call.tagger(db, cluster_ids=[3, 7]),
+            call.editor(db, cluster_ids=[3, 7]),
+            call.writer(db, cluster_ids=[3, 7]),
+        ])
+
+    def test_nothing_merged_skips_pipeline(self):
+        """Test a pass without merges doesn't run the downstream agents"""
+        agents = self.patch_agents([])
+        run.run_maintenance(object())
+        self.assertEqual(len(agents.mock_calls), 1)
+
+
+class TestBriefingDate(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_no_briefing_yet(self):
+        """Test a fresh database has no last briefing date"""
+        self.assertIsNone(latest_briefing_date(self.db))
+
+    def test_restart_sees_todays_briefing(self):
+        """Test the watcher's last briefing date comes from the newest stored briefing"""
+        for day in (16, 17):
+            self.db.add(DailyBriefing(briefing_date=datetime(2026, 10, day), content=""))
+        self.db.commit()
+        self.assertEqual(latest_briefing_date(self.db), date(2026, 10, 17))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Tests for worker polling scheduler
+"""
+import unittest
+import random
+import sys
+import os
+
+# Add worker to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'worker'))
+
+from scheduler import PollSchedule, AdaptivePolicy
+
+
+class FakeClock:
+    """Manually advanced clock for testing"""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPollSchedule(unittest.TestCase):
+
+    def test_sources_polled_on_their_own_intervals(self):
+        """Test each source comes due according to its own interval"""
+        clock = FakeClock()
+        schedule = PollSchedule(clock=clock)
+        schedule.add("rss:fast", 10)
+        schedule.add("rss:slow", 60)
+
+        polled = []
+        while clock.now <= 60:
+            key = schedule.pop_due()
+            if key is None:
+                clock.now += schedule.seconds_until_due()
+                continue
+            polled.append((clock.now, key))
+            schedule.reschedule(key)
+
+        self.assertEqual(sum(1 for _, key in polled if key == "rss:fast"), 7)
+        self.assertEqual(sum(1 for _, key in polled if key == "rss:slow"), 2)
+
+    def test_nothing_due(self):
+        """Test pop_due returns None until a source is due"""
+        clock = FakeClock()
+        schedule = PollSchedule(clock=clock)
+        self.assertIsNone(schedule.seconds_until_due())
+        schedule.add("arxiv:cs.AI", 30, delay=5)
+        self.assertIsNone(schedule.pop_due())
+        self.assertEqual(schedule.seconds_until_due(), 5)
+        clock.now = 5
+        self.assertEqual(schedule.pop_due(), "arxiv:cs.AI")
+        self.assertEqual(len(schedule), 0)
+
+
+class TestAdaptivePolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.policy = AdaptivePolicy(min_interval=60, max_interval=6 * 3600, jitter=0.0, rng=random.Random(0))
+        self.week = 7 * 24 * 3600
+
+    def test_learns_interval_from_publish_rate(self):
+        """Test busy sources are polled often and quiet ones rarely"""
+        busy = self.policy.learn("arxiv:cs.AI", 2000, self.week, default=1800)
+        quiet = self.policy.learn("rss:lab-blog", 2, self.week, default=900)
+        self.assertAlmostEqual(busy, self.week / 2000)
+        self.assertEqual(quiet, 6 * 3600)
+
+    def test_no_history_uses_default(self):
+        """Test sources without history start at the default interval"""
+        self.assertEqual(self.policy.learn("rss:new", 0, self.week, default=900), 900)
+
+    def test_backoff_on_empty_polls_and_reset_on_new_items(self):
+        """Test empty polls back off to the cap and new items snap back to base"""
+        self.policy.learn("rss:feed", 0, self.week, default=900)
+        intervals = [self.policy.next_interval("rss:feed", 0) for _ in range(12)]
+        self.assertEqual(intervals[0], 1350)
+        self.assertEqual(intervals[-1], 6 * 3600)
+        self.assertEqual(self.policy.next_interval("rss:feed", 3), 900)
+
+    def test_jitter_bounds(self):
+        """Test jitter stays within the configured fraction"""
+        policy = AdaptivePolicy(min_interval=60, max_interval=3600, jitter=0.1, rng=random.Random(1))
+        policy.learn("rss:feed", 0, self.week, default=1000)
+        for _ in range(50):
+            self.assertTrue(900 <= policy.next_interval("rss:feed", 1) <= 1100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,350 @@
+"""
+Tests for scout agent
+"""
+import unittest
+from unittest import mock
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+# Add worker to path for agent imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'worker'))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from agents import scout
+from agents.models import Base, Source, RawItem, SourceType, HarvestCursor
+
+
+RSS_BODY = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Feed</title>
+<item><title>First</title><link>https://example.com/1</link></item>
+<item><title>Second</title><link>https://example.com/2</link></item>
+</channel></rss>"""
+
+
+class MockResponse:
+    """Mock HTTP response for testing"""
+    def __init__(self, content, status_code=200, headers=None):
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise Exception(f"HTTP {self.status_code}")
+
+
+class TestFeedFetching(unittest.TestCase):
+
+    def test_fetch_feeds_preserves_order_and_isolates_errors(self):
+        """Test a failing feed doesn't affect the others"""
+        def fake_get(url, **kwargs):
+            if "broken" in url:
+                raise Exception("connection reset")
+            return MockResponse(RSS_BODY)
+
+        feeds = [
+            {"name": "Good", "url": "https://good.example.com/feed"},
+            {"name": "Broken", "url": "https://broken.example.com/feed"},
+            {"name": "Also Good", "url": "https://good2.example.com/feed"},
+        ]
+        with mock.patch.object(scout.requests, "get", side_effect=fake_get):
+            results = scout.fetch_feeds(feeds, max_workers=3, timeout=1)
+
+        self.assertEqual([r["name"] for r in results], ["Good", "Broken", "Also Good"])
+        self.assertEqual(len(results[0]["entries"]), 2)
+        self.assertIsNone(results[0]["error"])
+        self.assertEqual(results[1]["entries"], [])
+        self.assertIn("connection reset", results[1]["error"])
+        self.assertTrue(all("elapsed" in r for r in results))
+
+    def test_fetch_feed_conditional_get_not_modified(self):
+        """Test cached validators are sent and a 304 skips parsing"""
+        feed = {"name": "Cached", "url": "https://example.com/feed"}
+        validators = {"etag": '"abc"', "last_modified": "Wed, 01 Jan 2025 00:00:00 GMT"}
+        with mock.patch.object(scout.requests, "get", return_value=MockResponse(b"", 304)) as get:
+            result = scout.fetch_feed(feed, timeout=1, validators=validators)
+
+        headers = get.call_args.kwargs["headers"]
+        self.assertEqual(headers["If-None-Match"], '"abc"')
+        self.assertEqual(headers["If-Modified-Since"], "Wed, 01 Jan 2025 00:00:00 GMT")
+        self.assertTrue(result["not_modified"])
+        self.assertEqual(result["entries"], [])
+        self.assertIsNone(result["error"])
+
+    def test_fetch_feed_returns_new_validators(self):
+        """Test validators from a full response are returned for caching"""
+        feed = {"name": "Fresh", "url": "https://example.com/feed"}
+        response = MockResponse(RSS_BODY, headers={"ETag": '"v2"', "Last-Modified": "Thu, 02 Jan 2025 00:00:00 GMT"})
+        with mock.patch.object(scout.requests, "get", return_value=response):
+            result = scout.fetch_feed(feed, timeout=1)
+
+        self.assertFalse(result["not_modified"])
+        self.assertEqual(result["etag"], '"v2"')
+        self.assertEqual(result["last_modified"], "Thu, 02 Jan 2025 00:00:00 GMT")
+
+    def test_fetch_feeds_empty(self):
+        """Test fetching with no configured feeds"""
+        self.assertEqual(scout.fetch_feeds([]), [])
+
+
+class TestRawItemUpsert(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+        self.source = Source(name="Feed", url="https://example.com/feed", source_type=SourceType.RSS)
+        self.db.add(self.source)
+        self.db.flush()
+
+    def tearDown(self):
+        self.db.close()
+
+    def row(self, url):
+        return {"source_id": self.source.id, "title": url, "url": url, "content": "", "published_at": None, "frontier_lab": None}
+
+    def test_upsert_raw_items_skips_existing_and_batch_duplicates(self):
+        """Test only unseen normalized URLs are inserted, once each"""
+        scout.upsert_raw_items(self.db, [self.row("https://example.com/old")])
+
+        rows = [self.row("https://Example.com/old#comments"), self.row("https://example.com/new"),
+                self.row("https://example.com/new"), self.row("")]
+        new_ids = scout.upsert_raw_items(self.db, rows)
+
+        self.assertEqual(len(new_ids), 1)
+        self.assertEqual(self.db.get(RawItem, new_ids[0]).url, "https://example.com/new")
+        self.assertEqual(self.db.query(RawItem).count(), 2)
+
+    def test_upsert_raw_items_large_batch_returns_all_new_ids(self):
+        """Test a multi-page batch returns exactly the newly inserted IDs"""
+        scout.upsert_raw_items(self.db, [self.row("https://example.com/2500")])
+        rows = [self.row(f"https://example.com/{i}") for i in range(3000)]
+        new_ids = scout.upsert_raw_items(self.db, rows)
+        self.assertEqual(len(new_ids), 2999)
+        self.assertEqual(len(set(new_ids)), 2999)
+        self.assertEqual(self.db.query(RawItem).count(), 3000)
+
+    def test_copy_text_value_escaping(self):
+        """Test COPY text-format encoding of NULLs and control characters"""
+        self.assertEqual(scout._copy_text_value(None), "\\N")
+        self.assertEqual(scout._copy_text_value("a\tb\nc\\d"), "a\\tb\\nc\\\\d")
+        self.assertEqual(scout._copy_text_value(datetime(2025, 1, 2, 3, 4, 5)), "2025-01-02T03:04:05")
+
+    def test_upsert_raw_items_is_idempotent(self):
+        """Test re-ingesting the same batch inserts nothing"""
+        rows = [self.row("https://example.com/a"), self.row("https://example.com/b")]
+        self.assertEqual(len(scout.upsert_raw_items(self.db, rows)), 2)
+        self.assertEqual(scout.upsert_raw_items(self.db, rows), [])
+        self.assertEqual(scout.upsert_raw_items(self.db, []), [])
+
+    def test_upsert_raw_items_sets_processing_state(self):
+        """Test only items without content are queued for the Cleaner"""
+        rows = [self.row("https://example.com/empty"), {**self.row("https://example.com/full"), "content": "Summary"}]
+        scout.upsert_raw_items(self.db, rows)
+        states = {item.url: item.processing_state for item in self.db.query(RawItem)}
+        self.assertEqual(states, {"https://example.com/empty": "pending", "https://example.com/full": "done"})
+
+
+class TestArxivCursor(unittest.TestCase):
+
+    config = {"max_results_per_category": 50, "max_backfill_per_category": 500, "overlap_hours": 48}
+
+    def test_search_without_cursor_fetches_latest(self):
+        """Test first run asks for the newest papers"""
+        search = scout.build_arxiv_search("cs.AI", self.config)
+        self.assertEqual(search.query, "cat:cs.AI")
+        self.assertEqual(search.max_results, 50)
+        self.assertEqual(search.sort_order, scout.arxiv.SortOrder.Descending)
+
+    def test_search_with_cursor_pages_forward_from_high_water_mark(self):
+        """Test later runs request submissions from the overlap before the cursor, oldest first"""
+        since = datetime(2025, 3, 4, 7, 30, tzinfo=timezone(timedelta(hours=2)))
+        search = scout.build_arxiv_search("cs.AI", self.config, since)
+        self.assertEqual(search.query, "cat:cs.AI AND submittedDate:[202503020530 TO 999912312359]")
+        self.assertEqual(search.sort_order, scout.arxiv.SortOrder.Ascending)
+
+
+class StubArxivClient:
+    """Stands in for arxiv.Client, serving a fixed list of papers (or raising)"""
+
+    def __init__(self, papers=(), error=None):
+        self.papers = list(papers)
+        self.error = error
+        self.searches = []
+
+    def results(self, search):
+        self.searches.append(search)
+        if self.error:
+            raise self.error
+        return iter(self.papers)
+
+
+def paper(number, published):
+    return SimpleNamespace(title=f"Paper {number}", entry_id=f"http://arxiv.org/abs/{number}",
+                           summary=f"Abstract {number}", published=published, authors=["Jane Doe"])
+
+
+class TestArxivHarvest(unittest.TestCase):
+
+    config = {"max_results_per_category": 50, "max_backfill_per_category": 500, "seconds_per_request": 0}
+    since = datetime(2025, 3, 4, 12, 0)
+
+    def setUp(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        self.db = sessionmaker(bind=engine)()
+
+    def tearDown(self):
+        self.db.close()
+
+    def cursor_value(self):
+        cursor = self.db.query(HarvestCursor).filter(HarvestCursor.key == "arxiv:cs.AI").first()
+        return cursor.last_published_at if cursor else None
+
+    def ingest(self, client):
+        with mock.patch.object(scout, "RateLimitedArxivClient", return_value=client):
+            return scout.ingest_arxiv_category(self.db, "cs.AI", scout.TokenBucket(rate=1000.0), self.config)
+
+    def set_cursor(self, value):
+        scout.get_harvest_cursor(self.db, "arxiv:cs.AI").last_published_at = value
+        self.db.commit()
+
+    def test_high_water_is_latest_published(self):
+        """Test the high-water mark is the newest paper seen and older ones don't lower it"""
+        papers = [paper(1, self.since + timedelta(hours=3)), paper(2, self.since - timedelta(minutes=1)),
+                  paper(3, self.since + timedelta(hours=1))]
+        result = scout.fetch_arxiv_category("cs.AI", self.config, self.since, StubArxivClient(papers))
+        self.assertIsNone(result["error"])
+        self.assertEqual(result["high_water"], self.since + timedelta(hours=3))
+        self.assertEqual(len(result["rows"]), 3)
+
+    def test_late_announced_paper_is_ingested(self):
+        """Test a paper submitted before the cursor but listed after it is stored once"""
+        self.set_cursor(self.since)
+        self.ingest(StubArxivClient([paper(1, self.since + timedelta(hours=1))]))
+        late = paper(2, self.since - timedelta(hours=5))
+        report = self.ingest(StubArxivClient([late, paper(1, self.since + timedelta(hours=1))]))
+        self.assertEqual(len(report["new_item_ids"]), 1)
+        self.assertEqual(self.db.get(RawItem, report["new_item_ids"][0]).url, "http://arxiv.org/abs/2")
+        self.assertEqual(self.cursor_value(), self.since + timedelta(hours=1))
+        self.assertEqual(self.db.query(RawItem).count(), 2)
+
+    def test_overlap_does_not_count_toward_backfill(self):
+        """Test the backfill cap only counts papers past the cursor"""
+        papers = [paper(n, self.since - timedelta(hours=n)) for n in range(1, 4)]
+        papers += [paper(n, self.since + timedelta(hours=n)) for n in range(4, 8)]
+        config = {**self.config, "max_backfill_per_category": 2}
+        result = scout.fetch_arxiv_category("cs.AI", config, self.since, StubArxivClient(papers))
+        self.assertEqual(len(result["rows"]), 5)
+        self.assertEqual(result["high_water"], self.since + timedelta(hours=5))
+
+    def test_cursor_advances_after_store(self):
+        """Test a stored page moves the cursor to its high-water mark"""
+        self.set_cursor(self.since)
+        report = self.ingest(StubArxivClient([paper(1, self.since + timedelta(hours=2))]))
+        self.assertEqual(len(report["new_item_ids"]), 1)
+        self.assertEqual(self.cursor_value(), self.since + timedelta(hours=2))
+
+    def test_cursor_kept_when_store_fails(self):
+        """Test a failed write leaves the cursor (and the items) where they were"""
+        self.set_cursor(self.since)
+        with mock.patch.object(scout, "upsert_raw_items", side_effect=RuntimeError("db down")):
+            report = self.ingest(StubArxivClient([paper(1, self.since + timedelta(hours=2))]))
+        self.assertEqual(report["error"], "db down")
+        self.assertEqual(self.cursor_value(), self.since)
+
+    def test_cursor_kept_when_fetch_fails(self):
+        """Test a failed query leaves the cursor unchanged"""
+        self.set_cursor(self.since)
+        report = self.ingest(StubArxivClient(error=RuntimeError("HTTP 503")))
+        self.assertEqual(report["error"], "HTTP 503")
+        self.assertEqual(self.cursor_value(), self.since)
+
+    def test_empty_page_keeps_cursor(self):
+        """Test a page with no new papers leaves the cursor unchanged"""
+        self.set_cursor(self.since)
+        report = self.ingest(StubArxivClient([]))
+        self.assertEqual(report["new_item_ids"], [])
+        self.assertEqual(self.cursor_value(), self.since)
+        self.assertEqual(self.db.query(RawItem).count(), 0)
+
+
+class TestArxivConcurrency(unittest.TestCase):
+
+    def test_drop_cross_listed_keeps_first_category(self):
+        """Test a paper listed in several categories is ingested once"""
+        results = [
+            {"category": "cs.AI", "rows": [{"url": "http://arxiv.org/abs/1"}, {"url": "http://arxiv.org/abs/2"}]},
+            {"category": "cs.LG", "rows": [{"url": "http://arxiv.org/abs/2"}, {"url": "http://arxiv.org/abs/3"}]},
+        ]
+        dropped = scout.drop_cross_listed(results)
+        self.assertEqual(dropped, 1)
+        self.assertEqual([r["url"] for r in results[1]["rows"]], ["http://arxiv.org/abs/3"])
+
+    def test_token_bucket_limits_rate(self):
+        """Test the shared bucket spaces out acquisitions"""
+        bucket = scout.TokenBucket(rate=50.0)
+        started = scout.time.monotonic()
+        for _ in range(4):
+            bucket.acquire()
+        # First token is available immediately, the next three wait ~20ms each
+        self.assertGreaterEqual(scout.time.monotonic() - started, 0.05)
+
+    def test_arxiv_retries_take_a_token_each(self):
+        """Test every arXiv HTTP attempt, including retries, draws from the shared bucket"""
+        limiter = mock.Mock()
+        client = scout.RateLimitedArxivClient(limiter, num_retries=3)
+        failed = scout.feedparser.FeedParserDict(status=503, entries=[], bozo=False)
+        page = scout.feedparser.FeedParserDict(status=200, entries=[{"id": "1"}], bozo=False)
+        with mock.patch.object(scout.feedparser, "parse", side_effect=[failed, failed, page]) as parse:
+            self.assertIs(client._parse_feed("http://export.arxiv.org/api/query"), page)
+        self.assertEqual(parse.call_count, 3)
+        self.assertEqual(limiter.acquire.call_count, 3)
+
+    def test_arxiv_gives_up_after_retries(self):
+        """Test the last error is raised once retries are exhausted"""
+        limiter = mock.Mock()
+        client = scout.RateLimitedArxivClient(limiter, num_retries=1)
+        failed = scout.feedparser.FeedParserDict(status=503, entries=[], bozo=False)
+        with mock.patch.object(scout.feedparser, "parse", return_value=failed):
+            with self.assertRaises(scout.arxiv.HTTPError):
+                client._parse_feed("http://export.arxiv.org/api/query")
+        self.assertEqual(limiter.acquire.call_count, 2)
+
+
+class TestFrontierLabDetection(unittest.TestCase):
+
+    def test_detect_frontier_lab_from_authors(self):
+        """Test frontier lab detection from arXiv author strings"""
+        self.assertEqual(scout.detect_frontier_lab_from_authors(["Jane Doe (Google Research)"]), "Google AI")
+        self.assertIsNone(scout.detect_frontier_lab_from_authors(["John Smith"]))
+
+    def test_fair_requires_acronym(self):
+        """Test "fair" inside ordinary author names is not a Meta AI match"""
+        self.assertIsNone(scout.detect_frontier_lab_from_authors(["Alex Fairbanks", "Sam Fair"]))
+        self.assertEqual(scout.detect_frontier_lab_from_authors(["Sam Lee (FAIR)"]), "Meta AI")
+
+    def test_author_patterns_match_whole_words(self):
+        """Test lab names match as words, across punctuation, in pattern priority order"""
+        self.assertIsNone(scout.detect_frontier_lab_from_authors(["Ana Philanthropic Institute"]))
+        self.assertEqual(scout.detect_frontier_lab_from_authors(["Kim (Open-AI)"]), "OpenAI")
+        self.assertEqual(scout.detect_frontier_lab_from_authors(["A (Google Brain)", "B (Anthropic)"]), "Anthropic")
+
+    def test_detect_frontier_lab_from_url_host_suffix(self):
+        """Test lab domains match as host suffixes only"""
+        self.assertEqual(scout.detect_frontier_lab_from_url("https://www.anthropic.com/news/x"), "Anthropic")
+        self.assertEqual(scout.detect_frontier_lab_from_url("https://ai.googleblog.com/2024/01/x.html"), "Google AI")
+        self.assertEqual(scout.detect_frontier_lab_from_url("https://deepmind.google/discover/blog/x"), "DeepMind")
+        self.assertIsNone(scout.detect_frontier_lab_from_url("https://notopenai.com/post"))
+        self.assertIsNone(scout.detect_frontier_lab_from_url("https://example.com/openai.com"))
+        self.assertIsNone(scout.detect_frontier_lab_from_url(""))
+        self.assertEqual(scout.detect_frontier_lab_from_url("HTTPS://Research.Google:443/blog"), "Google AI")
+        self.assertIsNone(scout.detect_frontier_lab_from_url("https://evil.com?u=openai.com"))
+
+
+if __name__ == '__main__':
+    unittest.main()
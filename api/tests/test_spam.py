@@ -0,0 +1,65 @@
+"""
+Tests for the spam rules engine
+"""
+import unittest
+import sys
+import os
+
+# Add worker to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'worker'))
+
+from agents.spam import SpamFilter, load_spam_config, SPAM_RULES_PATH
+
+LONG_BODY = "A detailed write-up of the new model, its training data and its evaluation results."
+
+
+class TestSpamFilter(unittest.TestCase):
+
+    def setUp(self):
+        self.spam_filter = SpamFilter({
+            "threshold": 1.0,
+            "short_content": {"min_length": 50, "weight": 1.0},
+            "rules": [
+                {"name": "scam", "weight": 1.0, "patterns": ["free money", "lottery"]},
+                {"name": "hard_sell", "weight": 0.5, "patterns": ["act now", "buy now"]},
+                {"name": "promo_title", "weight": 0.5, "fields": ["title"], "patterns": ["sponsored"]},
+            ]
+        })
+
+    def test_single_strong_rule_is_spam(self):
+        """Test a full-weight rule alone reaches the threshold"""
+        self.assertTrue(self.spam_filter.is_spam("Win the LOTTERY", LONG_BODY))
+        self.assertTrue(self.spam_filter.is_spam("News", LONG_BODY + " Get free money today."))
+
+    def test_weights_accumulate_across_rules(self):
+        """Test weaker rules only flag an item together"""
+        self.assertFalse(self.spam_filter.is_spam("Act now", LONG_BODY))
+        self.assertTrue(self.spam_filter.is_spam("Sponsored: act now", LONG_BODY))
+        self.assertEqual(self.spam_filter.fired_rules("Sponsored: act now", LONG_BODY), ["hard_sell", "promo_title"])
+
+    def test_rule_fires_once(self):
+        """Test repeated hits of one rule don't stack"""
+        self.assertEqual(self.spam_filter.score("Act now, buy now", LONG_BODY + " act now"), 0.5)
+
+    def test_field_restriction(self):
+        """Test a title-only rule ignores matches in the content"""
+        self.assertEqual(self.spam_filter.fired_rules("News", LONG_BODY + " sponsored"), [])
+
+    def test_short_content(self):
+        """Test very short content is penalized but missing content is not"""
+        self.assertTrue(self.spam_filter.is_spam("News", "Too short."))
+        self.assertFalse(self.spam_filter.is_spam("News", None))
+
+    def test_word_boundaries(self):
+        """Test patterns don't match inside other words"""
+        self.assertFalse(self.spam_filter.is_spam("Acting now on climate", LONG_BODY))
+
+    def test_shipped_config_loads(self):
+        """Test the bundled rules file compiles"""
+        spam_filter = SpamFilter(load_spam_config(SPAM_RULES_PATH))
+        self.assertGreater(spam_filter.matcher.size, 0)
+        self.assertTrue(spam_filter.is_spam("Click here to win", LONG_BODY))
+
+
+if __name__ == '__main__':
+    unittest.main()
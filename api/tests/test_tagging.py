@@ -4,11 +4,13 @@ Tests for tagging agent
 import unittest
 import sys
 import os
+from types import SimpleNamespace
 
 # Add worker to path for agent imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'worker'))
 
-from agents.tagger import assign_topics
+from agents.models import ClinicalMaturityLevel
+from agents.tagger import assign_topics, keyword_counts, detect_clinical_maturity
 
 
 class MockTopic:
@@ -68,6 +70,40 @@ class TestTagging(unittest.TestCase):
         self.assertEqual(assigned[0].slug, "general-ai")
 
 
+class TestCompiledKeywords(unittest.TestCase):
+
+    def cluster(self, title, summary):
+        return SimpleNamespace(title=title, summary=summary, raw_items=[])
+
+    def test_counts_respect_word_boundaries(self):
+        """Test keywords only match whole words (no "ai" inside "said")"""
+        counts = keyword_counts(self.cluster("Officials said", "A quiet email about the carnival"))
+        self.assertEqual(counts, {})
+
+    def test_plurals_count_as_their_keyword(self):
+        """Test "robots" hits "robot", and both forms together still count once"""
+        counts = keyword_counts(self.cluster("Robots and drones", "One robot uses grasping"))
+        self.assertEqual(counts["robotics"], 3)
+
+    def test_assign_topics_from_counts(self):
+        """Test topics come from one set of per-topic counts"""
+        topics = [MockTopic("Robotics", "robotics"), MockTopic("General AI", "general-ai")]
+        cluster = self.cluster("Warehouse robots", "Drones and robotic manipulation")
+        self.assertEqual([t.slug for t in assign_topics(cluster, topics)], ["robotics"])
+
+    def test_clinical_maturity(self):
+        """Test maturity levels from the regulatory, approval and validation keyword sets"""
+        cases = [
+            ("FDA clears device", "The tool was cleared by the FDA", ClinicalMaturityLevel.APPROVED_DEPLOYED),
+            ("NIH funding", "A regulatory review is underway", ClinicalMaturityLevel.REGULATORY_RELEVANT),
+            ("Sepsis model", "Results from a randomized clinical trial", ClinicalMaturityLevel.CLINICALLY_VALIDATED),
+            ("Imaging model", "An early preprint on radiology", ClinicalMaturityLevel.EXPLORATORY),
+        ]
+        for title, summary, expected in cases:
+            with self.subTest(title=title):
+                self.assertEqual(detect_clinical_maturity(self.cluster(title, summary)), expected)
+
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -0,0 +1,149 @@
+"""
+Tests for URL canonicalization
+"""
+import unittest
+from unittest import mock
+import sys
+import os
+
+# Add worker to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'worker'))
+
+from agents.urls import clean_url, canonicalize_url, RedirectResolver, resolve_entry_url
+
+
+class MockResponse:
+    """Mock HTTP response for testing"""
+    def __init__(self, url, status_code=200):
+        self.url = url
+        self.status_code = status_code
+
+    def close(self):
+        pass
+
+
+class TestCanonicalization(unittest.TestCase):
+
+    def test_clean_url_strips_tracking_and_fragment(self):
+        """Test tracking parameters and fragments are dropped, other params kept verbatim"""
+        self.assertEqual(
+            clean_url("HTTPS://Example.COM:443/post?utm_source=rss&id=a%2Fb&fbclid=x#comments"),
+            "https://example.com/post?id=a%2Fb"
+        )
+
+    def test_clean_url_keeps_fetchable_form(self):
+        """Test www and trailing slash are preserved for fetching"""
+        self.assertEqual(clean_url("https://www.example.com/post/"), "https://www.example.com/post/")
+
+    def test_amp_variants(self):
+        """Test AMP cache, AMP viewer and AMP subdomain URLs map to the article"""
+        for url in [
+            "https://example-com.cdn.ampproject.org/c/s/example.com/news/story",
+            "https://www.google.com/amp/s/example.com/news/story",
+            "https://amp.example.com/news/story",
+            "https://example.com/news/story?amp=1",
+        ]:
+            with self.subTest(url=url):
+                self.assertEqual(canonicalize_url(url), "https://example.com/news/story")
+
+    def test_amp_unwrapping_only_keys_viewer_hosts(self):
+        """Test 'amp' path segments on other hosts are kept and the fetch URL is never unwrapped"""
+        for url in [
+            "https://github.com/ampproject/amp",
+            "https://example.com/tags/amp",
+            "https://example.com/amp/",
+            "https://example.com/news/story.amp.html",
+            "https://notgoogle.com/amp/s/evil.com/x",
+        ]:
+            with self.subTest(url=url):
+                self.assertEqual(clean_url(url), url)
+                self.assertEqual(canonicalize_url(url), url.rstrip('/'))
+        viewer = "https://www.google.com/amp/s/example.com/x"
+        self.assertEqual(clean_url(viewer), viewer)
+        self.assertEqual(canonicalize_url(viewer), "https://example.com/x")
+        self.assertEqual(canonicalize_url("https://amp.dev/documentation/"), "https://amp.dev/documentation")
+
+    def test_ref_param_is_kept(self):
+        """Test a plain 'ref' parameter, which sites use for content, isn't treated as tracking"""
+        self.assertEqual(clean_url("https://example.com/diff?ref=main&ref_src=twsrc"), "https://example.com/diff?ref=main")
+
+    def test_equivalent_spellings_share_a_key(self):
+        """Test scheme, www, trailing slash and param order don't change the key"""
+        keys = {
+            canonicalize_url("http://www.example.com/post/?b=2&a=1"),
+            canonicalize_url("https://example.com/post?a=1&b=2&utm_medium=feed"),
+        }
+        self.assertEqual(keys, {"https://example.com/post?a=1&b=2"})
+        self.assertEqual(canonicalize_url("https://example.com"), "https://example.com/")
+
+    def test_non_http_urls_untouched(self):
+        """Test URLs without a host are returned as-is"""
+        self.assertEqual(canonicalize_url("mailto:news@example.com"), "mailto:news@example.com")
+        self.assertEqual(canonicalize_url(""), "")
+
+
+class TestRedirectResolver(unittest.TestCase):
+
+    def test_resolves_once_and_caches(self):
+        """Test a feed-proxy link is resolved once per process"""
+        session = mock.Mock()
+        session.headers = {}
+        session.head.return_value = MockResponse("https://example.com/story")
+        resolver = RedirectResolver(session=session)
+
+        for _ in range(3):
+            self.assertEqual(resolver.resolve("https://feedproxy.google.com/~r/blog/~3/abc/"), "https://example.com/story")
+        self.assertEqual(session.head.call_count, 1)
+
+    def test_non_redirect_urls_skip_network(self):
+        """Test ordinary links are not requested"""
+        session = mock.Mock()
+        session.headers = {}
+        resolver = RedirectResolver(session=session)
+        self.assertEqual(resolver.resolve("https://example.com/a"), "https://example.com/a")
+        session.head.assert_not_called()
+
+    def test_failure_falls_back_without_caching(self):
+        """Test a failed lookup returns the original URL and is retried later"""
+        session = mock.Mock()
+        session.headers = {}
+        session.head.side_effect = [Exception("timeout"), MockResponse("https://example.com/story")]
+        resolver = RedirectResolver(session=session)
+
+        self.assertEqual(resolver.resolve("https://bit.ly/xyz"), "https://bit.ly/xyz")
+        self.assertEqual(resolver.resolve("https://bit.ly/xyz"), "https://example.com/story")
+
+    def test_deadline_bounds_lookups(self):
+        """Test lookups are cut to the time left and skipped once the deadline has passed"""
+        session = mock.Mock()
+        session.headers = {}
+        session.head.return_value = MockResponse("https://example.com/story")
+        resolver = RedirectResolver(session=session)
+
+        with mock.patch("agents.urls.time.monotonic", return_value=100.0):
+            self.assertEqual(resolver.resolve("https://bit.ly/a", deadline=100.0), "https://bit.ly/a")
+            session.head.assert_not_called()
+            self.assertEqual(resolver.resolve("https://bit.ly/a", deadline=102.5), "https://example.com/story")
+        self.assertEqual(session.head.call_args.kwargs["timeout"], 2.5)
+
+    def test_lru_bound(self):
+        """Test the cache never exceeds its size"""
+        session = mock.Mock()
+        session.headers = {}
+        session.head.side_effect = lambda url, **kwargs: MockResponse(url.replace("bit.ly", "example.com"))
+        resolver = RedirectResolver(max_entries=2, session=session)
+        for i in range(5):
+            resolver.resolve(f"https://bit.ly/{i}")
+        self.assertIsNone(resolver.cached("https://bit.ly/0"))
+        self.assertEqual(resolver.cached("https://bit.ly/4"), "https://example.com/4")
+
+    def test_entry_prefers_feedburner_origlink(self):
+        """Test the feed's original link is used without a request"""
+        resolver = mock.Mock()
+        entry = {"link": "https://feedproxy.google.com/~r/x", "feedburner_origlink": "https://example.com/a?utm_source=feedburner"}
+        self.assertEqual(resolve_entry_url(entry, resolver), "https://example.com/a")
+        resolver.resolve.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,12 +2,12 @@
 Daily Briefing Generator: Create daily briefing from top clusters
 """
 import logging
-from typing import Dict
+from typing import Dict, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from datetime import datetime
+from sqlalchemy import desc, func
+from datetime import date, datetime
 
-from .models import DailyBriefing, Cluster
+from .models import DailyBriefing, Cluster, ClusterState
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +27,12 @@ def generate_briefing_content(clusters: list) -> str:
     return content
 
 
+def latest_briefing_date(db: Session) -> Optional[date]:
+    """Date of the newest stored briefing (None if there is none yet)"""
+    latest = db.query(func.max(DailyBriefing.briefing_date)).scalar()
+    return latest.date() if latest else None
+
+
 def run(db: Session) -> Dict:
     """Run daily briefing generator"""
     logger.info("Starting Daily Briefing Generator")
@@ -47,7 +53,9 @@ def run(db: Session) -> Dict:
         }
     
     # Get top clusters by score
-    top_clusters = db.query(Cluster).order_by(
+    top_clusters = db.query(Cluster).filter(
+        Cluster.state == ClusterState.ACTIVE.value
+    ).order_by(
         desc(Cluster.score)
     ).limit(10).all()
     
@@ -2,120 +2,433 @@
 Cleaner Agent: Normalize URLs, extract text, spam filtering
 """
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
 from urllib.parse import urljoin, urlparse
 import logging
-from typing import Optional, Dict
+import os
+import threading
+from typing import Iterator, NamedTuple, Optional, Dict, List, Tuple
+from sqlalchemy import or_, select, update
 from sqlalchemy.orm import Session
 
-from .models import RawItem
+from .extractors import get_extractor
+from .fetch_cache import CacheEntry, FetchCache, get_fetch_cache
+from .models import RawItem, ProcessingState
+from .spam import get_spam_filter
+from .urls import clean_url
+
+# Article fetching
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+FETCH_TIMEOUT = 10
+FETCH_WORKERS = int(os.getenv("CLEANER_FETCH_WORKERS", "16"))
+FETCH_PER_DOMAIN = int(os.getenv("CLEANER_FETCH_PER_DOMAIN", "2"))
+MAX_TEXT_LENGTH = 10000
+EXTRACTOR = os.getenv("CLEANER_EXTRACTOR", "stream")
+
+# Work claiming and retries
+CLAIM_LIMIT = 100
+MAX_ATTEMPTS = int(os.getenv("CLEANER_MAX_ATTEMPTS", "5"))
+RETRY_BASE_SECONDS = int(os.getenv("CLEANER_RETRY_BASE_SECONDS", "300"))
+LEASE_SECONDS = int(os.getenv("CLEANER_LEASE_SECONDS", "900"))  # How long a claim keeps other workers off an item
+
+# HTML parsing (CPU-bound, so it runs in worker processes)
+PARSE_WORKERS = int(os.getenv("CLEANER_PARSE_WORKERS", str(os.cpu_count() or 1)))
+PARSE_BATCH_SIZE = int(os.getenv("CLEANER_PARSE_BATCH_SIZE", "20"))
 
 logger = logging.getLogger(__name__)
 
 
+class ParseTask(NamedTuple):
+    """One item for the parsing stage (plain data so it pickles cheaply)"""
+    item_id: int
+    title: str
+    html: Optional[bytes]
+    fallback: Optional[str]
+
+
+class ClaimedItem(NamedTuple):
+    """A leased raw item, copied out so fetching runs without an open transaction"""
+    id: int
+    title: str
+    url: str
+    content: Optional[str]
+
+
+class Page(NamedTuple):
+    """A fetched page; content is None when the server answered 304"""
+    content: Optional[bytes]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    not_modified: bool = False
+
+
 def normalize_url(url: str) -> str:
-    """Normalize URL"""
-    parsed = urlparse(url)
-    # Remove fragment, normalize scheme
-    normalized = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
-    if parsed.query:
-        normalized += f"?{parsed.query}"
-    return normalized
+    """Normalize URL (see urls.clean_url)"""
+    return clean_url(url)
 
 
-def extract_main_text(url: str, existing_content: Optional[str] = None) -> Optional[str]:
-    """Extract main readable text from URL"""
-    try:
-        response = requests.get(url, timeout=10, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+def make_session(per_domain: int = FETCH_PER_DOMAIN, hosts: int = FETCH_WORKERS) -> requests.Session:
+    """Keep-alive HTTP session with a bounded connection pool per host"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=hosts, pool_maxsize=per_domain)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
+
+
+class DomainLimiter:
+    """Caps concurrent requests per host so we stay polite to publishers"""
+    
+    def __init__(self, per_domain: int = FETCH_PER_DOMAIN):
+        self.per_domain = per_domain
+        self._semaphores: Dict[str, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+    
+    def __call__(self, url: str) -> threading.Semaphore:
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.Semaphore(self.per_domain)
+            return self._semaphores[host]
+
+
+def extract_text_from_html(content: bytes, backend: Optional[str] = None) -> Optional[str]:
+    """Extract main readable text from an HTML document"""
+    return get_extractor(backend or EXTRACTOR)(content, MAX_TEXT_LENGTH)
+
+
+def fetch_html(url: str, session: Optional[requests.Session] = None,
+               limiter: Optional[DomainLimiter] = None,
+               validators: Optional[Tuple[Optional[str], Optional[str]]] = None) -> Page:
+    """Download a page, holding the host's slot while the request is in flight
+
+    `validators` is a cached (etag, last_modified) pair; when given the
+    request is conditional and an unchanged page comes back as not_modified.
+    """
+    headers = {'User-Agent': USER_AGENT}
+    etag, last_modified = validators or (None, None)
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    
+    with limiter(url) if limiter else nullcontext():
+        response = (session or requests).get(url, timeout=FETCH_TIMEOUT, headers=headers)
         response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
-        
-        # Try to find main content
-        main_content = soup.find('main') or soup.find('article') or soup.find('body')
-        
-        if main_content:
-            text = main_content.get_text(separator=' ', strip=True)
-            # Limit length
-            return text[:10000] if len(text) > 10000 else text
-        
-        return None
-        
+    
+    page_etag = response.headers.get('ETag')
+    page_last_modified = response.headers.get('Last-Modified')
+    if response.status_code == 304:
+        return Page(None, page_etag, page_last_modified, not_modified=True)
+    return Page(response.content, page_etag, page_last_modified)
+
+
+def resolve_text(url: str, page: Optional[Page], entry: Optional[CacheEntry],
+                 cache: Optional[FetchCache]) -> Optional[str]:
+    """Extracted text for a URL from a new download, a 304 or the cache
+
+    `page` is None when the URL wasn't fetched (fresh cache hit) or the
+    fetch failed, in which case any cached text is used as-is.
+    """
+    if page is None or page.not_modified:
+        if page is not None and cache and entry:
+            cache.touch(url, page.etag, page.last_modified)
+        return entry.text if entry else None
+    
+    text = extract_text_from_html(page.content)
+    if text and cache:
+        cache.put(url, text, page.etag, page.last_modified)
+    return text
+
+
+def extract_main_text(url: str, existing_content: Optional[str] = None,
+                      session: Optional[requests.Session] = None,
+                      cache: Optional[FetchCache] = None) -> Optional[str]:
+    """Extract main readable text from URL (served from or revalidated against the cache)"""
+    entry = cache.get(url) if cache else None
+    if entry and cache.is_fresh(entry):
+        return entry.text
+    
+    try:
+        page = fetch_html(url, session, validators=(entry.etag, entry.last_modified) if entry else None)
+        return resolve_text(url, page, entry, cache)
     except Exception as e:
         logger.warning(f"Failed to extract text from {url}: {e}")
-        return existing_content
+        return entry.text if entry else existing_content
+
+
+def interleave_by_domain(urls: List[str]) -> List[str]:
+    """Round-robin URLs across hosts so one busy host doesn't block the pool"""
+    by_host: Dict[str, List[str]] = {}
+    for url in urls:
+        by_host.setdefault(urlparse(url).netloc.lower(), []).append(url)
+    
+    queues = list(by_host.values())
+    ordered = []
+    for i in range(max((len(q) for q in queues), default=0)):
+        ordered.extend(q[i] for q in queues if i < len(q))
+    return ordered
+
+
+def fetch_articles(urls: List[str], max_workers: int = FETCH_WORKERS,
+                   per_domain: int = FETCH_PER_DOMAIN,
+                   validators: Optional[Dict[str, Tuple[Optional[str], Optional[str]]]] = None
+                   ) -> Dict[str, Optional[Page]]:
+    """Fetch pages concurrently under a global and a per-domain cap
+
+    Returns pages keyed by URL (None where the fetch failed). URLs with
+    cached validators are fetched conditionally.
+    """
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return {}
+    
+    validators = validators or {}
+    limiter = DomainLimiter(per_domain)
+    
+    with make_session(per_domain) as session:
+        def fetch(url: str):
+            try:
+                return url, fetch_html(url, session, limiter, validators.get(url))
+            except Exception as e:
+                logger.warning(f"Failed to fetch {url}: {e}")
+                return url, None
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls)))) as executor:
+            return dict(executor.map(fetch, interleave_by_domain(urls)))
 
 
 def is_spam(item: RawItem) -> bool:
     """Simple spam filter"""
-    title = item.title.lower()
-    content = (item.content or '').lower()
-    
-    spam_keywords = ['click here', 'free money', 'viagra', 'casino', 'lottery']
+    return is_spam_text(item.title, item.content)
+
+
+def is_spam_text(title: Optional[str], content: Optional[str]) -> bool:
+    """Spam filter on an item's title and content (rules in config/spam_rules.json)"""
+    return get_spam_filter().is_spam(title, content)
+
+
+def parse_batch(tasks: List[ParseTask], backend: str = EXTRACTOR) -> List[Tuple[int, Optional[str], bool]]:
+    """Extract text and spam-check a batch of items
+
+    Runs in a worker process. Returns (item_id, extracted_text, is_spam)
+    per task; extracted_text is None when there was no page or nothing could
+    be extracted, in which case the spam check uses the fallback text.
+    """
+    results = []
+    for task in tasks:
+        text = None
+        if task.html:
+            try:
+                text = extract_text_from_html(task.html, backend)
+            except Exception as e:
+                logger.warning(f"Failed to extract text for item {task.item_id}: {e}")
+        results.append((task.item_id, text, is_spam_text(task.title, text or task.fallback)))
+    return results
+
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+
+
+def get_parse_pool(workers: int = PARSE_WORKERS) -> ProcessPoolExecutor:
+    """Process-wide parse pool, started on first use and kept for the worker's lifetime"""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            _parse_pool = ProcessPoolExecutor(max_workers=workers)
+        return _parse_pool
+
+
+def discard_parse_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next get_parse_pool() starts a fresh one"""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is pool:
+            _parse_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def parse_in_batches(tasks: List[ParseTask], workers: int = PARSE_WORKERS,
+                     batch_size: int = PARSE_BATCH_SIZE) -> Iterator[List[Tuple[int, Optional[str], bool]]]:
+    """Run parse_batch over the tasks, yielding each batch's results as it completes
+
+    Uses the shared process pool so parsing isn't serialized by the GIL; a
+    single batch (or workers <= 1) is parsed inline to skip the round trip.
+    If a pool process dies, the pool is replaced and the batches it lost are
+    parsed inline.
+    """
+    batches = [tasks[i:i + batch_size] for i in range(0, len(tasks), batch_size)]
+    if workers <= 1 or len(batches) <= 1:
+        for batch in batches:
+            yield parse_batch(batch, EXTRACTOR)
+        return
     
-    for keyword in spam_keywords:
-        if keyword in title or keyword in content:
-            return True
+    pool = get_parse_pool(workers)
+    futures = {}
+    lost = []
+    for batch in batches:
+        try:
+            futures[pool.submit(parse_batch, batch, EXTRACTOR)] = batch
+        except BrokenProcessPool:
+            lost.append(batch)
+    for future in as_completed(futures):
+        try:
+            yield future.result()
+        except BrokenProcessPool:
+            lost.append(futures[future])
     
-    # Check for very short content
-    if content and len(content) < 50:
-        return True
+    if lost:
+        logger.warning(f"Parse pool broke, parsing {len(lost)} batches inline")
+        discard_parse_pool(pool)
+        for batch in lost:
+            yield parse_batch(batch, EXTRACTOR)
+
+
+def claim_pending(db: Session, item_ids: Optional[List[int]] = None,
+                  limit: int = CLAIM_LIMIT, lease_seconds: int = LEASE_SECONDS) -> List[ClaimedItem]:
+    """Lease pending items whose retry backoff has elapsed, oldest first, and commit
+
+    The lease pushes next_attempt_at lease_seconds ahead: other workers skip
+    the rows while this one fetches them, and pick them up again if it dies
+    before recording a result. Rows are only locked (SKIP LOCKED on
+    PostgreSQL) by the short claiming transaction, never during fetching.
+    Served from the partial index on pending rows.
+    """
+    now = datetime.now(timezone.utc)
+    claimable = select(RawItem.id).where(
+        RawItem.processing_state == ProcessingState.PENDING.value,
+        or_(RawItem.next_attempt_at.is_(None), RawItem.next_attempt_at <= now)
+    )
+    if item_ids is not None:
+        claimable = claimable.where(RawItem.id.in_(item_ids))
+    claimable = claimable.order_by(RawItem.id).limit(limit).with_for_update(skip_locked=True)
     
-    return False
+    rows = db.execute(
+        update(RawItem)
+        .where(RawItem.id.in_(claimable))
+        .values(next_attempt_at=now + timedelta(seconds=lease_seconds))
+        .returning(RawItem.id, RawItem.title, RawItem.url, RawItem.content),
+        execution_options={"synchronize_session": False}
+    ).all()
+    db.commit()
+    return sorted((ClaimedItem(*row) for row in rows), key=lambda item: item.id)
+
+
+def record_failure(item: RawItem, now: datetime) -> None:
+    """Count a failed attempt: back off exponentially, give up after MAX_ATTEMPTS"""
+    item.attempts = (item.attempts or 0) + 1
+    if item.attempts >= MAX_ATTEMPTS:
+        item.processing_state = ProcessingState.FAILED.value
+        item.next_attempt_at = None
+        logger.warning(f"Giving up on item {item.id} after {item.attempts} attempts")
+    else:
+        item.next_attempt_at = now + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (item.attempts - 1))
 
 
-def run(db: Session) -> Dict:
-    """Run cleaner agent"""
+def run(db: Session, item_ids: Optional[List[int]] = None) -> Dict:
+    """Run cleaner agent (optionally scoped to specific raw item IDs)"""
     logger.info("Starting Cleaner Agent")
     
-    # Get unprocessed raw items (simplified: process recent items)
-    items = db.query(RawItem).filter(
-        RawItem.content.is_(None) | (RawItem.content == '')
-    ).limit(100).all()
+    claimed = claim_pending(db, item_ids)
     
     processed = 0
-    normalized = 0
     spam_filtered = 0
+    failed = 0
     
-    for item in items:
-        try:
-            # Normalize URL
-            old_url = item.url
-            item.url = normalize_url(item.url)
-            if old_url != item.url:
-                normalized += 1
-            
-            # Extract content if missing
-            if not item.content or len(item.content) < 100:
-                extracted = extract_main_text(item.url, item.content)
+    # Normalize URLs
+    urls = {item.id: normalize_url(item.url) for item in claimed}
+    normalized = sum(1 for item in claimed if urls[item.id] != item.url)
+    
+    # Serve fresh pages from the fetch cache, fetch (or revalidate) the rest in parallel
+    needed = list(dict.fromkeys(
+        urls[item.id] for item in claimed
+        if not item.content or len(item.content) < 100
+    ))
+    cache = get_fetch_cache()
+    cached = {url: cache.get(url) for url in needed} if cache else {}
+    stale = [url for url in needed if not (cached.get(url) and cache.is_fresh(cached[url]))]
+    pages = fetch_articles(stale, validators={
+        url: (cached[url].etag, cached[url].last_modified)
+        for url in stale if cached.get(url)
+    })
+    logger.info(f"Cleaner fetch: {len(needed) - len(stale)} cache hits, {len(stale)} fetched")
+    
+    # Downloaded pages go to the parser; cache hits, 304s and failed fetches resolve here
+    html = {}
+    known = {}
+    for url in needed:
+        page = pages.get(url)
+        if page is not None and not page.not_modified:
+            html[url] = page.content
+        else:
+            known[url] = resolve_text(url, page, cached.get(url), cache)
+    
+    tasks = [
+        ParseTask(item.id, item.title, html.get(urls[item.id]), known.get(urls[item.id]) or item.content)
+        for item in claimed
+    ]
+    # Rows are loaded only now, after the network work, and written in one transaction
+    items_by_id = {
+        item.id: item for item in db.query(RawItem).filter(
+            RawItem.id.in_(list(urls)),
+            RawItem.processing_state == ProcessingState.PENDING.value
+        )
+    } if claimed else {}
+    
+    # Apply parsed results as each batch comes back
+    now = datetime.now(timezone.utc)
+    for results in parse_in_batches(tasks):
+        for item_id, extracted, spam in results:
+            item = items_by_id.get(item_id)
+            if item is None:
+                continue  # Deleted or finished elsewhere while its lease ran
+            url = item.url = urls[item_id]
+            try:
                 if extracted:
                     item.content = extracted
-            
-            # Spam filter
-            if is_spam(item):
-                db.delete(item)
-                spam_filtered += 1
+                    page = pages.get(url)
+                    if cache and page:
+                        cache.put(url, extracted, page.etag, page.last_modified)
+                elif known.get(url):
+                    item.content = known[url]
+                
+                # Spam filter
+                if spam:
+                    db.delete(item)
+                    spam_filtered += 1
+                    continue
+                
+                if item.content:
+                    item.processing_state = ProcessingState.DONE.value
+                    item.cleaned_at = now
+                    item.next_attempt_at = None
+                else:
+                    record_failure(item, now)
+                    failed += 1
+                
+                processed += 1
+                
+            except Exception as e:
+                logger.error(f"Error cleaning item {item_id}: {e}")
                 continue
-            
-            processed += 1
-            
-        except Exception as e:
-            logger.error(f"Error cleaning item {item.id}: {e}")
-            continue
+        
+        db.flush()
     
     db.commit()
     
-    logger.info(f"Cleaner Agent completed: {processed} processed, {normalized} normalized, {spam_filtered} spam filtered")
+    logger.info(f"Cleaner Agent completed: {processed} processed, {normalized} normalized, "
+                f"{spam_filtered} spam filtered, {failed} without content")
     
     return {
         "processed": processed,
         "normalized": normalized,
-        "spam_filtered": spam_filtered
+        "spam_filtered": spam_filtered,
+        "failed": failed
     }
 
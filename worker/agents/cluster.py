@@ -2,12 +2,26 @@
 Clustering Agent: Deduplicate items into story clusters
 """
 import logging
-from typing import List, Dict
+import os
+from typing import List, Dict, NamedTuple, Optional, Set, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import delete, func, insert, update
 from difflib import SequenceMatcher
 
-from .models import RawItem, Cluster
+import numpy as np
+
+from . import embeddings
+from .cluster_index import ClusterIndex, get_cluster_index, encode_signature, ATTACH_THRESHOLD
+from .minhash import MinHasher, LSHIndex, NUM_PERM, BANDS
+from .models import RawItem, Cluster, ClusterState, ScoreBreakdown, Citation, cluster_items, cluster_topics
+from .tfidf import tfidf_groups
+
+SIMILARITY_THRESHOLD = 0.6
+TEXT_PREFIX_LENGTH = 500
+CLUSTER_BATCH_LIMIT = int(os.getenv("CLUSTER_BATCH_LIMIT", "20000"))
+CLUSTER_ENGINE = os.getenv("CLUSTER_ENGINE", "lexical")
+TFIDF_THRESHOLD = float(os.getenv("CLUSTER_TFIDF_THRESHOLD", "0.5"))
+SEMANTIC_THRESHOLD = float(os.getenv("CLUSTER_SEMANTIC_THRESHOLD", "0.75"))
 
 logger = logging.getLogger(__name__)
 
@@ -19,17 +33,21 @@ def similarity_score(text1: str, text2: str) -> float:
     return SequenceMatcher(None, text1.lower(), text2.lower()).ratio()
 
 
+def item_text(item: RawItem) -> str:
+    """Text an item is compared on"""
+    return f"{item.title} {item.content or ''}"[:TEXT_PREFIX_LENGTH]
+
+
 def find_similar_items(item: RawItem, items: List[RawItem], threshold: float = 0.7) -> List[RawItem]:
-    """Find items similar to the given item"""
+    """Find items similar to the given item (exhaustive; group_items uses LSH candidate pairs instead)"""
     similar = []
-    item_text = f"{item.title} {item.content or ''}"[:500]
+    text = item_text(item)
     
     for other in items:
         if other.id == item.id:
             continue
         
-        other_text = f"{other.title} {other.content or ''}"[:500]
-        sim = similarity_score(item_text, other_text)
+        sim = similarity_score(text, item_text(other))
         
         if sim >= threshold:
             similar.append(other)
@@ -37,68 +55,354 @@ def find_similar_items(item: RawItem, items: List[RawItem], threshold: float = 0
     return similar
 
 
-def run(db: Session) -> Dict:
-    """Run clustering agent"""
+class PreparedText(NamedTuple):
+    """An item's comparison text, lowercased and truncated, and its MinHash signature"""
+    text: str
+    signature: np.ndarray
+
+
+def prepare_items(items: List[RawItem], hasher: Optional[MinHasher] = None) -> List[PreparedText]:
+    """Lowercase, truncate and shingle each item's text once"""
+    hasher = hasher or MinHasher()
+    prepared = []
+    for item in items:
+        text = item_text(item).lower()
+        prepared.append(PreparedText(text, hasher.text_signature(text)))
+    return prepared
+
+
+def candidate_pairs(signatures: List[np.ndarray], bands: int = BANDS) -> Set[Tuple[int, int]]:
+    """(i, j) index pairs, i < j, whose signatures share an LSH band bucket"""
+    index = LSHIndex(len(signatures[0]) if signatures else NUM_PERM, bands)
+    for i, signature in enumerate(signatures):
+        index.insert(i, signature)
+    return index.candidate_pairs()
+
+
+class UnionFind:
+    """Disjoint sets over 0..n-1; each set's root is its smallest member"""
+
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]  # Path halving
+            i = parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> bool:
+        """Merge the sets of i and j; False if they were already one set"""
+        root_i, root_j = self.find(i), self.find(j)
+        if root_i == root_j:
+            return False
+        if root_j < root_i:
+            root_i, root_j = root_j, root_i
+        self.parent[root_j] = root_i
+        return True
+
+    def groups(self) -> List[List[int]]:
+        """Sets as sorted member lists, ordered by their smallest member"""
+        members: Dict[int, List[int]] = {}
+        for i in range(len(self.parent)):
+            members.setdefault(self.find(i), []).append(i)
+        return sorted(members.values(), key=lambda group: group[0])
+
+
+def lexical_union(prepared: List[PreparedText], threshold: float = SIMILARITY_THRESHOLD) -> List[List[int]]:
+    """Union LSH candidate pairs whose SequenceMatcher ratio clears the threshold
+
+    Pairs already in one set are skipped, and SequenceMatcher's cheap upper
+    bounds (real_quick_ratio, quick_ratio) reject most of the rest before the
+    full ratio. Pairs are visited grouped by their second text, so the
+    matcher indexes each text once. Groups are the connected components of
+    the similar pairs, so they don't depend on item order.
+    """
+    sets = UnionFind(len(prepared))
+    by_second: Dict[int, List[int]] = {}
+    for i, j in candidate_pairs([p.signature for p in prepared]):
+        by_second.setdefault(j, []).append(i)
+    
+    matcher = SequenceMatcher(None)
+    for j in sorted(by_second):
+        if not prepared[j].text:
+            continue
+        matcher.set_seq2(prepared[j].text)
+        for i in sorted(by_second[j]):
+            if not prepared[i].text or sets.find(i) == sets.find(j):
+                continue
+            matcher.set_seq1(prepared[i].text)
+            if (matcher.real_quick_ratio() >= threshold and matcher.quick_ratio() >= threshold
+                    and matcher.ratio() >= threshold):
+                sets.union(i, j)
+    return sets.groups()
+
+
+def group_lexical(items: List[RawItem], threshold: float = SIMILARITY_THRESHOLD,
+                  prepared: Optional[List[PreparedText]] = None) -> List[List[RawItem]]:
+    """Lexical engine: SequenceMatcher similarity on MinHash LSH candidates, merged transitively"""
+    prepared = prepared if prepared is not None else prepare_items(items)
+    return [[items[i] for i in group] for group in lexical_union(prepared, threshold)]
+
+
+def group_tfidf(items: List[RawItem], threshold: float = TFIDF_THRESHOLD,
+                prepared: Optional[List[PreparedText]] = None) -> List[List[RawItem]]:
+    """TF-IDF engine: connected components of the sparse cosine-similarity graph"""
+    texts = [p.text for p in prepared] if prepared is not None else [item_text(item) for item in items]
+    groups = tfidf_groups(texts, threshold)
+    return [[items[i] for i in group] for group in groups]
+
+
+def semantic_store(store: Optional[embeddings.EmbeddingStore] = None) -> embeddings.EmbeddingStore:
+    """The given embedding store, or the shared one (which needs sentence-transformers)"""
+    if store is not None:
+        return store
+    embeddings.require_sentence_transformers()
+    return embeddings.get_embedding_store()
+
+
+def group_semantic(items: List[RawItem], threshold: float = SEMANTIC_THRESHOLD,
+                   prepared: Optional[List[PreparedText]] = None,
+                   store: Optional[embeddings.EmbeddingStore] = None) -> List[List[RawItem]]:
+    """Semantic engine: connected components over embedding cosine similarity
+
+    Candidate pairs come from a batch-local ANN index built from the bucket
+    keys the embedding store keeps for each item, so the cost depends on the
+    batch, not on the store. Embeddings are cached per item, so re-runs need
+    no inference (and the model sees the original-case text, so prepared
+    texts aren't used).
+    """
+    if not items:
+        return []
+    store = semantic_store(store)
+    vectors = store.embed([(item.id, item_text(item)) for item in items]).astype(np.float32)
+    keys = store.keys([item.id for item in items])
+    store.save()
+
+    sets = UnionFind(len(items))
+    for i, j in sorted(embeddings.batch_candidate_pairs(keys)):
+        if sets.find(i) != sets.find(j) and float(vectors[i] @ vectors[j]) >= threshold:
+            sets.union(i, j)
+    return [[items[i] for i in group] for group in sets.groups()]
+
+
+ENGINES = {
+    'lexical': group_lexical,
+    'tfidf': group_tfidf,
+    'semantic': group_semantic,
+}
+
+
+def group_items(items: List[RawItem], engine: Optional[str] = None,
+                prepared: Optional[List[PreparedText]] = None) -> List[List[RawItem]]:
+    """Split items into story groups with the configured engine (CLUSTER_ENGINE)
+
+    Groups are ordered by their first item and list items in input order.
+    """
+    name = engine or CLUSTER_ENGINE
+    if name not in ENGINES:
+        raise ValueError(f"Unknown clustering engine '{name}' (available: {', '.join(sorted(ENGINES))})")
+    return ENGINES[name](items, prepared=prepared)
+
+
+def attach_to_index(items: List[RawItem], prepared: Dict[int, PreparedText], index: ClusterIndex,
+                    threshold: float = ATTACH_THRESHOLD) -> Tuple[Dict[int, List[RawItem]], List[RawItem]]:
+    """Match items against indexed clusters
+
+    Returns (cluster id -> matched items, unmatched items).
+    """
+    attached: Dict[int, List[RawItem]] = {}
+    unmatched = []
+    for item in items:
+        cluster_id = index.match(prepared[item.id].signature, threshold)
+        if cluster_id is None:
+            unmatched.append(item)
+        else:
+            attached.setdefault(cluster_id, []).append(item)
+    return attached, unmatched
+
+
+def attach_semantic(db: Session, items: List[RawItem], store: embeddings.EmbeddingStore,
+                    threshold: float = SEMANTIC_THRESHOLD) -> Tuple[Dict[int, List[RawItem]], List[RawItem]]:
+    """Match items against recently clustered items by embedding
+
+    The semantic engine's counterpart of attach_to_index: the embedding
+    store's ANN index holds every item embedded within the index window, so
+    an item joins the active cluster of its most similar clustered neighbour.
+    Returns (cluster id -> matched items, unmatched items).
+    """
+    if not items:
+        return {}, []
+    vectors = store.embed([(item.id, item_text(item)) for item in items]).astype(np.float32)
+    store.save()
+    
+    batch = {item.id for item in items}
+    ranked: Dict[int, List[int]] = {}
+    for item, vector in zip(items, vectors):
+        matches = sorted((-score, item_id) for item_id, score in store.neighbours(vector, threshold)
+                         if item_id not in batch)
+        ranked[item.id] = [item_id for _, item_id in matches]
+    neighbour_ids = sorted({item_id for item_ids in ranked.values() for item_id in item_ids})
+    cluster_of: Dict[int, int] = {}
+    if neighbour_ids:
+        cluster_of = dict(
+            db.query(cluster_items.c.raw_item_id, cluster_items.c.cluster_id)
+            .join(Cluster, Cluster.id == cluster_items.c.cluster_id)
+            .filter(cluster_items.c.raw_item_id.in_(neighbour_ids), Cluster.state == ClusterState.ACTIVE.value)
+            .all()
+        )
+    
+    attached: Dict[int, List[RawItem]] = {}
+    unmatched = []
+    for item in items:
+        cluster_id = next((cluster_of[item_id] for item_id in ranked[item.id] if item_id in cluster_of), None)
+        if cluster_id is None:
+            unmatched.append(item)
+        else:
+            attached.setdefault(cluster_id, []).append(item)
+    return attached, unmatched
+
+
+def invalidate_clusters(db: Session, cluster_ids: List[int]) -> None:
+    """Mark clusters whose items changed for re-tagging, re-scoring and rewriting
+
+    Their topics, score breakdown and citations are removed (the Tagger and
+    Editor only pick up clusters without them) and needs_rewrite is set for
+    the Writer. The old summary stays until the Writer replaces it, so the
+    Tagger and Editor still see the cluster's text when they run first.
+    """
+    if not cluster_ids:
+        return
+    options = {"synchronize_session": False}
+    db.execute(delete(cluster_topics).where(cluster_topics.c.cluster_id.in_(cluster_ids)))
+    db.execute(delete(ScoreBreakdown).where(ScoreBreakdown.cluster_id.in_(cluster_ids)), execution_options=options)
+    db.execute(delete(Citation).where(Citation.cluster_id.in_(cluster_ids)), execution_options=options)
+    db.execute(
+        update(Cluster).where(Cluster.id.in_(cluster_ids)).values(needs_rewrite=True, clinical_maturity_level=None),
+        execution_options=options
+    )
+
+
+def match_returned_ids(rows: List[Dict], returned) -> List[int]:
+    """Ids for inserted cluster rows, in row order, from (id, title, summary, signature) RETURNING rows
+
+    RETURNING order isn't guaranteed to follow VALUES order, so each id is
+    paired with the row holding the same values; rows equal in all of them
+    are interchangeable.
+    """
+    ids_by_values: Dict[tuple, List[int]] = {}
+    for cluster_id, title, summary, signature in returned:
+        ids_by_values.setdefault((title, summary, bytes(signature)), []).append(cluster_id)
+    for ids in ids_by_values.values():
+        ids.sort(reverse=True)
+    return [ids_by_values[(row["title"], row["summary"], bytes(row["signature"]))].pop() for row in rows]
+
+
+def run(db: Session, item_ids: Optional[List[int]] = None, index: Optional[ClusterIndex] = None,
+        engine: Optional[str] = None, store: Optional[embeddings.EmbeddingStore] = None) -> Dict:
+    """Run clustering agent (optionally scoped to specific raw item IDs)
+
+    Items first join a recent cluster from the cluster index when their
+    signature matches one (with the semantic engine, then when their
+    embedding is close to an already clustered item's); the rest are
+    grouped among themselves into new
+    clusters, which are added to the index for later runs. Clusters that
+    gained items are invalidated so downstream agents redo them; the
+    returned cluster_ids lists both new and updated clusters. Clusters and
+    cluster_items rows are written with one bulk INSERT each, so the number
+    of statements doesn't grow with the batch.
+    """
     logger.info("Starting Clustering Agent")
     
     # Get unclustered items
-    items = db.query(RawItem).filter(
+    query = db.query(RawItem).filter(
         ~RawItem.clusters.any()
-    ).limit(200).all()
+    )
+    if item_ids is not None:
+        query = query.filter(RawItem.id.in_(item_ids))
+    items = query.order_by(RawItem.id).limit(CLUSTER_BATCH_LIMIT).all()
     
-    clusters_created = 0
-    items_clustered = 0
+    index = index if index is not None else get_cluster_index()
+    index.refresh(db)
+    prepared = dict(zip((item.id for item in items), prepare_items(items, MinHasher(index.num_perm))))
+    attached, unmatched = attach_to_index(items, prepared, index)
     
-    processed_item_ids = set()
+    if attached:
+        # Drop matches whose cluster was merged away or archived since it was indexed
+        # (possibly by another worker); cluster those items afresh
+        existing = {cluster_id for (cluster_id,) in db.query(Cluster.id).filter(
+            Cluster.id.in_(list(attached)),
+            Cluster.state == ClusterState.ACTIVE.value
+        )}
+        for cluster_id in [cluster_id for cluster_id in attached if cluster_id not in existing]:
+            index.discard(cluster_id)
+            unmatched.extend(attached.pop(cluster_id))
+        unmatched.sort(key=lambda item: item.id)
     
-    for item in items:
-        if item.id in processed_item_ids:
-            continue
-        
-        # Find similar items
-        similar = find_similar_items(item, items, threshold=0.6)
-        
-        if similar:
-            # Create cluster
-            cluster = Cluster(
-                title=item.title[:500],  # Use first item's title as cluster title
-                summary=item.content[:1000] if item.content else None,
-                score=0.5  # Default score, will be updated by editor
-            )
-            db.add(cluster)
-            db.flush()
-            
-            # Add items to cluster
-            cluster.raw_items.append(item)
-            processed_item_ids.add(item.id)
-            
-            for sim_item in similar:
-                if sim_item.id not in processed_item_ids:
-                    cluster.raw_items.append(sim_item)
-                    processed_item_ids.add(sim_item.id)
-            
-            clusters_created += 1
-            items_clustered += len(similar) + 1
-        else:
-            # Single item cluster
-            cluster = Cluster(
-                title=item.title[:500],
-                summary=item.content[:1000] if item.content else None,
-                score=0.5
-            )
-            db.add(cluster)
-            db.flush()
-            cluster.raw_items.append(item)
-            processed_item_ids.add(item.id)
-            clusters_created += 1
-            items_clustered += 1
+    engine = engine or CLUSTER_ENGINE
+    if engine == 'semantic':
+        store = semantic_store(store)
+        by_embedding, unmatched = attach_semantic(db, unmatched, store)
+        for cluster_id, members in by_embedding.items():
+            attached.setdefault(cluster_id, []).extend(members)
+        groups = group_semantic(unmatched, store=store)
+    else:
+        groups = group_items(unmatched, engine, prepared=[prepared[item.id] for item in unmatched])
+    memberships = [
+        {"cluster_id": cluster_id, "raw_item_id": item.id}
+        for cluster_id, members in attached.items()
+        for item in members
+    ]
     
+    # Seed signatures, taken before the commit expires the items
+    seed_signatures = [prepared[group[0].id].signature for group in groups]
+    new_cluster_ids = []
+    if groups:
+        # First item's title as cluster title; score is updated by the editor.
+        # One multi-row INSERT ... RETURNING per page, without sort_by_parameter_order
+        # (which SQLite can only honour a row at a time), so ids are matched back by value
+        rows = [
+            {
+                "title": group[0].title[:500],
+                "summary": group[0].content[:1000] if group[0].content else None,
+                "score": 0.5,
+                "signature": encode_signature(signature),
+            }
+            for group, signature in zip(groups, seed_signatures)
+        ]
+        result = db.execute(
+            insert(Cluster).returning(Cluster.id, Cluster.title, Cluster.summary, Cluster.signature), rows
+        )
+        new_cluster_ids = match_returned_ids(rows, result)
+        memberships.extend(
+            {"cluster_id": cluster_id, "raw_item_id": item.id}
+            for cluster_id, group in zip(new_cluster_ids, groups)
+            for item in group
+        )
+    
+    items_attached = sum(len(members) for members in attached.values())
+    updated_cluster_ids = sorted(attached)
+    invalidate_clusters(db, updated_cluster_ids)
+    if memberships:
+        db.execute(insert(cluster_items), memberships)
     db.commit()
     
-    logger.info(f"Clustering Agent completed: {clusters_created} clusters created, {items_clustered} items clustered")
+    for cluster_id, signature in zip(new_cluster_ids, seed_signatures):
+        index.add(cluster_id, signature)
+    
+    clusters_created = len(new_cluster_ids)
+    items_clustered = len(memberships)
+    
+    logger.info(
+        f"Clustering Agent completed: {clusters_created} clusters created, "
+        f"{items_attached} items attached to {len(attached)} existing clusters, {items_clustered} items clustered"
+    )
     
     return {
         "clusters_created": clusters_created,
-        "items_clustered": items_clustered
+        "clusters_updated": len(updated_cluster_ids),
+        "items_attached": items_attached,
+        "items_clustered": items_clustered,
+        "cluster_ids": new_cluster_ids + updated_cluster_ids
     }
-
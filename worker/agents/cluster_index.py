@@ -0,0 +1,135 @@
+"""
+Cluster index: match new items against recent clusters by their stored MinHash signatures
+"""
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from .minhash import LSHIndex, estimate_jaccard, NUM_PERM, BANDS
+from .models import Cluster, ClusterState
+
+INDEX_WINDOW_DAYS = int(os.getenv("CLUSTER_INDEX_WINDOW_DAYS", "7"))
+ATTACH_THRESHOLD = float(os.getenv("CLUSTER_ATTACH_THRESHOLD", "0.5"))
+# Clusters become visible at commit but are stamped at insert, so a refresh re-reads
+# this far behind the newest one loaded to catch slower transactions
+REFRESH_OVERLAP_SECONDS = int(os.getenv("CLUSTER_INDEX_REFRESH_OVERLAP_SECONDS", "600"))
+
+logger = logging.getLogger(__name__)
+
+
+def encode_signature(signature: np.ndarray) -> bytes:
+    """Little-endian uint32 bytes, as stored in clusters.signature"""
+    return signature.astype('<u4').tobytes()
+
+
+def decode_signature(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype='<u4').astype(np.uint32)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive timestamps; they are stored in UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class ClusterIndex:
+    """LSH index over the signatures of clusters created in the last window_days
+
+    Persisted through clusters.signature: refresh() only reads clusters
+    created shortly before the newest one it has loaded, so a long-running
+    worker keeps one index and matching a new item costs one LSH lookup plus
+    a few signature comparisons, however many clusters exist.
+    """
+
+    def __init__(self, window_days: int = INDEX_WINDOW_DAYS, num_perm: int = NUM_PERM, bands: int = BANDS):
+        self.window = timedelta(days=window_days)
+        self.num_perm = num_perm
+        self.bands = bands
+        self._lsh = LSHIndex(num_perm, bands)
+        self._signatures: Dict[int, np.ndarray] = {}
+        self._created: Dict[int, datetime] = {}
+        self._loaded_until: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, cluster_id: int) -> bool:
+        return cluster_id in self._signatures
+
+    def add(self, cluster_id: int, signature: np.ndarray, created_at: Optional[datetime] = None) -> None:
+        self.discard(cluster_id)
+        self._lsh.insert(cluster_id, signature)
+        self._signatures[cluster_id] = signature
+        self._created[cluster_id] = _as_utc(created_at or datetime.now(timezone.utc))
+
+    def discard(self, cluster_id: int) -> None:
+        signature = self._signatures.pop(cluster_id, None)
+        if signature is not None:
+            self._lsh.remove(cluster_id, signature)
+            del self._created[cluster_id]
+
+    def expire(self, now: Optional[datetime] = None) -> int:
+        """Drop clusters older than the window; returns how many were dropped"""
+        cutoff = (now or datetime.now(timezone.utc)) - self.window
+        stale = [cluster_id for cluster_id, created in self._created.items() if created < cutoff]
+        for cluster_id in stale:
+            self.discard(cluster_id)
+        return len(stale)
+
+    def refresh(self, db: Session, now: Optional[datetime] = None) -> int:
+        """Load clusters created since the last refresh (by any worker) and expire old ones
+
+        Reads from REFRESH_OVERLAP_SECONDS before the newest cluster already
+        loaded rather than from the highest id, since another worker's
+        transaction can commit a lower id after a higher one was seen.
+        Returns how many clusters were added.
+        """
+        now = now or datetime.now(timezone.utc)
+        since = now - self.window
+        if self._loaded_until is not None:
+            since = max(since, self._loaded_until - timedelta(seconds=REFRESH_OVERLAP_SECONDS))
+        rows = db.query(Cluster.id, Cluster.signature, Cluster.created_at).filter(
+            Cluster.state == ClusterState.ACTIVE.value,
+            Cluster.signature.isnot(None),
+            Cluster.created_at >= since
+        ).order_by(Cluster.id).all()
+
+        loaded = 0
+        for cluster_id, data, created_at in rows:
+            created_at = _as_utc(created_at)
+            if self._loaded_until is None or created_at > self._loaded_until:
+                self._loaded_until = created_at
+            if cluster_id in self._signatures:
+                continue
+            signature = decode_signature(data)
+            if signature.size == self.num_perm:
+                self.add(cluster_id, signature, created_at)
+                loaded += 1
+
+        expired = self.expire(now)
+        if loaded or expired:
+            logger.info(f"Cluster index: loaded {loaded}, expired {expired}, holding {len(self)}")
+        return loaded
+
+    def match(self, signature: np.ndarray, threshold: float = ATTACH_THRESHOLD) -> Optional[int]:
+        """Most similar indexed cluster at or above the Jaccard threshold (lowest id on ties)"""
+        best_id, best_score = None, threshold
+        for cluster_id in sorted(self._lsh.query(signature)):
+            score = estimate_jaccard(signature, self._signatures[cluster_id])
+            if score > best_score or (score == best_score and best_id is None):
+                best_id, best_score = cluster_id, score
+        return best_id
+
+
+_cluster_index: Optional[ClusterIndex] = None
+
+
+def get_cluster_index() -> ClusterIndex:
+    """Process-wide index, kept across runs so watch mode only loads new clusters"""
+    global _cluster_index
+    if _cluster_index is None:
+        _cluster_index = ClusterIndex()
+    return _cluster_index
@@ -2,7 +2,7 @@
 Editor Agent: Score and rank clusters
 """
 import logging
-from typing import Dict
+from typing import Dict, List, Optional
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from datetime import datetime, timedelta
@@ -210,14 +210,17 @@ def generate_rationale(breakdown: Dict, cluster: Cluster) -> str:
         return "Ranked based on standard criteria."
 
 
-def run(db: Session) -> Dict:
-    """Run editor agent"""
+def run(db: Session, cluster_ids: Optional[List[int]] = None) -> Dict:
+    """Run editor agent (optionally scoped to specific cluster IDs)"""
     logger.info("Starting Editor Agent")
     
     # Get clusters without scores or with outdated scores
-    clusters = db.query(Cluster).filter(
+    query = db.query(Cluster).filter(
         (Cluster.score_breakdown == None) | (Cluster.score < 0.1)
-    ).limit(100).all()
+    )
+    if cluster_ids is not None:
+        query = query.filter(Cluster.id.in_(cluster_ids))
+    clusters = query.limit(100).all()
     
     scored = 0
     
@@ -241,7 +244,6 @@ def run(db: Session) -> Dict:
         else:
             sb = ScoreBreakdown(cluster_id=cluster.id)
             db.add(sb)
-            db.flush()
         
         sb.relevance_score = breakdown['relevance_score']
         sb.impact_score = breakdown['impact_score']
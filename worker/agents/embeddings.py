@@ -0,0 +1,307 @@
+"""
+Sentence embeddings for semantic clustering: a local CPU model, a float16 on-disk
+store (one vector per item, computed once) and a random-hyperplane ANN index
+"""
+import glob
+import logging
+import os
+import re
+import time
+from collections import defaultdict, deque
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # optional semantic engine, see requirements-semantic.txt
+    SentenceTransformer = None
+
+from .cluster_index import INDEX_WINDOW_DAYS
+
+EMBEDDING_MODEL = os.getenv("CLUSTER_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(__file__), '..', '.cache', 'embeddings')
+STORE_PATH = os.getenv("CLUSTER_EMBEDDING_PATH", DEFAULT_STORE_PATH)
+ENCODE_BATCH_SIZE = 64
+
+HASH_TABLES = 8
+HASH_BITS = 12  # 8 tables x 12 bits: neighbours above ~0.8 cosine nearly always share a bucket
+MAX_CHUNKS = 16  # Compact the store into one file past this many appended chunks
+INITIAL_CAPACITY = 1024
+
+CHUNK_PATTERN = re.compile(r'chunk-(\d+)-(\d+)\.npz$')
+
+Encoder = Callable[[List[str]], np.ndarray]
+
+logger = logging.getLogger(__name__)
+
+
+def require_sentence_transformers() -> None:
+    if SentenceTransformer is None:
+        raise RuntimeError(
+            "CLUSTER_ENGINE=semantic needs the sentence-transformers package: "
+            "install it with pip install -r worker/requirements-semantic.txt"
+        )
+
+
+def load_encoder(model_name: str = EMBEDDING_MODEL) -> Encoder:
+    """Encoder returning L2-normalized embeddings from a local sentence-transformers model on CPU"""
+    require_sentence_transformers()
+    model = SentenceTransformer(model_name, device='cpu')
+
+    def encode(texts: List[str]) -> np.ndarray:
+        return model.encode(
+            texts,
+            batch_size=ENCODE_BATCH_SIZE,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+
+    return encode
+
+
+class HyperplaneLSH:
+    """Cosine ANN via random-hyperplane (sign) hashing
+
+    Each table hashes a vector to the sign pattern of `bits` random
+    projections; rows sharing a bucket in any table are candidates. Rows are
+    inserted with increasing numbers and evicted oldest first, so each bucket
+    is a deque and eviction pops from its front.
+    """
+
+    def __init__(self, dim: int, tables: int = HASH_TABLES, bits: int = HASH_BITS, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.planes = rng.standard_normal((tables * bits, dim)).astype(np.float32)
+        self.tables = tables
+        self.bits = bits
+        self._weights = 1 << np.arange(bits, dtype=np.int64)
+        self._buckets: List[Dict[int, Deque[int]]] = [defaultdict(deque) for _ in range(tables)]
+
+    def keys(self, vectors: np.ndarray) -> np.ndarray:
+        """(n, tables) bucket keys"""
+        signs = (np.asarray(vectors, dtype=np.float32) @ self.planes.T) > 0
+        return signs.reshape(len(signs), self.tables, self.bits) @ self._weights
+
+    def insert(self, row: int, keys: List[int]) -> None:
+        for table, key in enumerate(keys):
+            self._buckets[table][key].append(row)
+
+    def evict(self, row: int, keys: List[int]) -> None:
+        for table, key in enumerate(keys):
+            bucket = self._buckets[table].get(key)
+            if bucket and bucket[0] == row:
+                bucket.popleft()
+                if not bucket:
+                    del self._buckets[table][key]
+
+    def query(self, keys: List[int]) -> Set[int]:
+        found = set()
+        for table, key in enumerate(keys):
+            found.update(self._buckets[table].get(key, ()))
+        return found
+
+
+def batch_candidate_pairs(keys: np.ndarray) -> Set[Tuple[int, int]]:
+    """(i, j) row pairs, i < j, sharing a bucket in any table of the given (n, tables) keys"""
+    pairs = set()
+    for table in range(keys.shape[1]):
+        buckets = defaultdict(list)
+        for row, key in enumerate(keys[:, table].tolist()):
+            buckets[key].append(row)
+        for rows in buckets.values():
+            for a in range(len(rows)):
+                for b in range(a + 1, len(rows)):
+                    pairs.add((rows[a], rows[b]))
+    return pairs
+
+
+class EmbeddingStore:
+    """Item embeddings (float16) for the last window_days, persisted as .npz chunks with their LSH keys
+
+    Vectors are keyed by raw item id and never recomputed while in the
+    window: embed() only runs the model for ids it hasn't stored, and save()
+    writes just the new rows. Each row's bucket keys are saved alongside it,
+    so loading refills the ANN buckets without re-projecting anything. Rows
+    sit in growable buffers in the order they were embedded; rows older than
+    the window are evicted from the front, and chunks holding only expired
+    rows are deleted. Chunks from another model or hash layout are ignored.
+    """
+
+    def __init__(self, path: str, model_name: str = EMBEDDING_MODEL, encoder: Optional[Encoder] = None,
+                 window_days: int = INDEX_WINDOW_DAYS, clock: Callable[[], float] = time.time):
+        self.path = path
+        self.model_name = model_name
+        self.window = window_days * 86400
+        self._encoder = encoder
+        self._clock = clock
+        self._rows: Dict[int, int] = {}  # item id -> row number
+        # Row n lives at buffer position n - _base; live rows are [_start, _end)
+        self._base = self._start = self._end = self._saved = 0
+        self._ids = np.empty(0, dtype=np.int64)
+        self._added = np.empty(0, dtype=np.float64)
+        self._vectors: Optional[np.ndarray] = None
+        self._keys: Optional[np.ndarray] = None
+        self._ann: Optional[HyperplaneLSH] = None
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._rows
+
+    def _chunk_paths(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.path, 'chunk-*.npz')))
+
+    def _load(self) -> None:
+        cutoff = self._clock() - self.window
+        for chunk_path in self._chunk_paths():
+            match = CHUNK_PATTERN.search(chunk_path)
+            if not match or int(match.group(2)) < cutoff:
+                continue
+            with np.load(chunk_path) as chunk:
+                if str(chunk['model']) != self.model_name or chunk['keys'].shape[1] != HASH_TABLES \
+                        or int(chunk['bits']) != HASH_BITS:
+                    continue
+                self._append(chunk['ids'].tolist(), chunk['vectors'], chunk['keys'], chunk['added'])
+            self._evict(cutoff)
+        self._saved = self._end
+
+    def _reserve(self, count: int, dim: int) -> None:
+        """Make room for count more rows, compacting live rows to the front and doubling when full"""
+        if self._vectors is None:
+            capacity = max(INITIAL_CAPACITY, count)
+            self._ids = np.empty(capacity, dtype=np.int64)
+            self._added = np.empty(capacity, dtype=np.float64)
+            self._vectors = np.empty((capacity, dim), dtype=np.float16)
+            self._keys = np.empty((capacity, HASH_TABLES), dtype=np.int64)
+            return
+        if self._end - self._base + count <= len(self._ids):
+            return
+        live = slice(self._start - self._base, self._end - self._base)
+        size = self._end - self._start
+        capacity = max(INITIAL_CAPACITY, 2 * (size + count))
+        for name in ('_ids', '_added', '_vectors', '_keys'):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:size] = old[live]
+            setattr(self, name, new)
+        self._base = self._start
+
+    def _append(self, ids: List[int], vectors: np.ndarray, keys: np.ndarray, added: np.ndarray) -> None:
+        fresh = [i for i, item_id in enumerate(ids) if item_id not in self._rows]
+        if not fresh:
+            return
+        if self._ann is None:
+            self._ann = HyperplaneLSH(vectors.shape[1])
+        self._reserve(len(fresh), vectors.shape[1])
+        position = self._end - self._base
+        span = slice(position, position + len(fresh))
+        self._ids[span] = [ids[i] for i in fresh]
+        self._added[span] = added[fresh]
+        self._vectors[span] = vectors[fresh]
+        self._keys[span] = keys[fresh]
+        for offset, row_keys in enumerate(self._keys[span].tolist()):
+            row = self._end + offset
+            self._rows[ids[fresh[offset]]] = row
+            self._ann.insert(row, row_keys)
+        self._end += len(fresh)
+
+    def _evict(self, cutoff: float) -> int:
+        """Drop rows added before the cutoff; they are always the oldest, at the front"""
+        live = slice(self._start - self._base, self._end - self._base)
+        count = int(np.searchsorted(self._added[live], cutoff, side='left'))
+        for row in range(self._start, self._start + count):
+            position = row - self._base
+            item_id = int(self._ids[position])
+            if self._rows.get(item_id) == row:
+                del self._rows[item_id]
+            self._ann.evict(row, self._keys[position].tolist())
+        self._start += count
+        return count
+
+    def _position(self, item_id: int) -> int:
+        return self._rows[item_id] - self._base
+
+    def embed(self, items: List[Tuple[int, str]]) -> np.ndarray:
+        """float16 embeddings for (item id, text) pairs, encoding only unseen ids"""
+        now = self._clock()
+        if self._end > self._start:
+            self._evict(now - self.window)
+        missing = [(item_id, text) for item_id, text in dict(items).items() if item_id not in self._rows]
+        if missing:
+            if self._encoder is None:
+                self._encoder = load_encoder(self.model_name)
+            ids = [item_id for item_id, _ in missing]
+            vectors = np.asarray(self._encoder([text for _, text in missing]), dtype=np.float16)
+            if self._ann is None:
+                self._ann = HyperplaneLSH(vectors.shape[1])
+            self._append(ids, vectors, self._ann.keys(vectors), np.full(len(ids), now))
+            logger.info(f"Embedded {len(missing)} items ({len(items) - len(missing)} cached)")
+        if not items:
+            return np.empty((0, 0 if self._vectors is None else self._vectors.shape[1]), dtype=np.float16)
+        return self._vectors[[self._position(item_id) for item_id, _ in items]]
+
+    def keys(self, item_ids: List[int]) -> np.ndarray:
+        """Stored (n, tables) bucket keys of embedded items"""
+        return self._keys[[self._position(item_id) for item_id in item_ids]]
+
+    def neighbours(self, vector: np.ndarray, threshold: float) -> List[Tuple[int, float]]:
+        """(item id, cosine) of stored items above the threshold among the vector's ANN candidates"""
+        if self._ann is None:
+            return []
+        rows = sorted(self._ann.query(self._ann.keys(vector[None, :])[0].tolist()))
+        if not rows:
+            return []
+        positions = [row - self._base for row in rows]
+        scores = self._vectors[positions].astype(np.float32) @ np.asarray(vector, dtype=np.float32)
+        return [(int(self._ids[position]), float(score)) for position, score in zip(positions, scores)
+                if score >= threshold]
+
+    def _write_chunk(self, sequence: int, rows: slice) -> None:
+        added = self._added[rows]
+        target = os.path.join(self.path, f'chunk-{sequence:06d}-{int(added.max()):d}.npz')
+        temporary = target + '.tmp'
+        with open(temporary, 'wb') as f:
+            np.savez(f, ids=self._ids[rows], vectors=self._vectors[rows], keys=self._keys[rows],
+                     added=added, bits=np.array(HASH_BITS), model=np.array(self.model_name))
+        os.replace(temporary, target)
+
+    def save(self) -> None:
+        """Write rows added since the last save as a new chunk and delete expired chunks
+
+        Compacts every live row into a single chunk when chunks pile up.
+        """
+        if max(self._saved, self._start) >= self._end:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        cutoff = self._clock() - self.window
+        existing = []
+        for chunk_path in self._chunk_paths():
+            match = CHUNK_PATTERN.search(chunk_path)
+            if match and int(match.group(2)) >= cutoff:
+                existing.append(chunk_path)
+            else:
+                os.remove(chunk_path)
+
+        sequence = int(CHUNK_PATTERN.search(existing[-1]).group(1)) + 1 if existing else 0
+        compact = len(existing) >= MAX_CHUNKS
+        first = self._start if compact else max(self._saved, self._start)
+        self._write_chunk(sequence, slice(first - self._base, self._end - self._base))
+        if compact:
+            # The new chunk holds every live row; older ones (including other models') are obsolete
+            for chunk_path in existing:
+                os.remove(chunk_path)
+        self._saved = self._end
+
+
+_store: Optional[EmbeddingStore] = None
+
+
+def get_embedding_store() -> EmbeddingStore:
+    """Process-wide store from CLUSTER_EMBEDDING_* settings; the model loads on first use"""
+    global _store
+    if _store is None:
+        _store = EmbeddingStore(STORE_PATH)
+    return _store
@@ -0,0 +1,152 @@
+"""
+Main-text extraction backends for the Cleaner
+"""
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+from bs4.dammit import UnicodeDammit
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # optional backend
+    lxml = None
+
+# Elements whose text is the article, in order of preference
+CONTAINERS = ('main', 'article', 'body')
+SKIPPED = ('script', 'style')
+
+Extractor = Callable[[bytes, int], Optional[str]]
+
+
+def extract_bs4(content: bytes, limit: int) -> Optional[str]:
+    """Reference extractor: full BeautifulSoup tree with html.parser"""
+    soup = BeautifulSoup(content, 'html.parser')
+
+    # Remove script and style elements
+    for script in soup(list(SKIPPED)):
+        script.decompose()
+
+    # Try to find main content
+    main_content = soup.find('main') or soup.find('article') or soup.find('body')
+
+    if main_content:
+        text = main_content.get_text(separator=' ', strip=True)
+        return text[:limit] if len(text) > limit else text
+
+    return None
+
+
+class _StopParsing(Exception):
+    pass
+
+
+class _MainTextParser(HTMLParser):
+    """Tokenizer that collects the text of the first main/article/body element
+
+    No tree is built: text nodes are stripped and appended to a buffer per
+    container while it is open, script/style content is dropped as it is
+    tokenized, and each buffer stops growing once it reaches the limit.
+    Parsing is abandoned as soon as the preferred container is settled.
+    """
+
+    def __init__(self, limit: int):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.chunks: Dict[str, List[str]] = {tag: [] for tag in CONTAINERS}
+        self.lengths: Dict[str, int] = {tag: 0 for tag in CONTAINERS}
+        self.depth: Dict[str, int] = {tag: 0 for tag in CONTAINERS}
+        self.seen = set()
+        self.closed = set()
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED:
+            self.skip_depth += 1
+        elif tag in self.depth and tag not in self.closed:
+            self.depth[tag] += 1
+            self.seen.add(tag)
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif self.depth.get(tag):
+            self.depth[tag] -= 1
+            if not self.depth[tag]:
+                self.closed.add(tag)
+                self._check_settled()
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        text = data.strip()
+        if not text:
+            return
+        for tag in CONTAINERS:
+            if self.depth[tag] and self.lengths[tag] < self.limit:
+                # +1 for the joining space
+                self.lengths[tag] += len(text) + (1 if self.chunks[tag] else 0)
+                self.chunks[tag].append(text)
+        self._check_settled()
+
+    def _check_settled(self):
+        # Once the first <main> is closed or full nothing later can change the result
+        if 'main' in self.closed or self.lengths['main'] >= self.limit:
+            raise _StopParsing()
+
+    def result(self) -> Optional[str]:
+        for tag in CONTAINERS:
+            if tag in self.seen:
+                return ' '.join(self.chunks[tag])[:self.limit]
+        return None
+
+
+def extract_stream(content: bytes, limit: int) -> Optional[str]:
+    """Streaming extractor on the stdlib tokenizer (no tree, early exit)"""
+    markup = UnicodeDammit(content, is_html=True).unicode_markup or ''
+    parser = _MainTextParser(limit)
+    try:
+        parser.feed(markup)
+        parser.close()
+    except _StopParsing:
+        pass
+    return parser.result()
+
+
+def extract_lxml(content: bytes, limit: int) -> Optional[str]:
+    """lxml (libxml2) extractor; requires the optional lxml package"""
+    if not content or not content.strip():
+        return None
+    root = lxml.html.document_fromstring(content)
+    etree.strip_elements(root, etree.Comment, *SKIPPED, with_tail=False)
+
+    for tag in CONTAINERS:
+        element = next(root.iter(tag), None)
+        if element is not None:
+            parts = []
+            length = 0
+            for chunk in element.itertext():
+                chunk = chunk.strip()
+                if chunk:
+                    parts.append(chunk)
+                    length += len(chunk) + 1
+                    if length > limit:
+                        break
+            return ' '.join(parts)[:limit]
+    return None
+
+
+EXTRACTORS: Dict[str, Extractor] = {
+    'bs4': extract_bs4,
+    'stream': extract_stream,
+}
+if lxml is not None:
+    EXTRACTORS['lxml'] = extract_lxml
+
+
+def get_extractor(name: str) -> Extractor:
+    """Look up an extraction backend by name"""
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown extractor '{name}' (available: {', '.join(sorted(EXTRACTORS))})")
+    return EXTRACTORS[name]
@@ -0,0 +1,158 @@
+"""
+Fetch cache: on-disk store of extracted article text keyed by normalized URL
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(__file__), '..', '.cache', 'fetch_cache.db')
+CACHE_PATH = os.getenv("CLEANER_CACHE_PATH", DEFAULT_CACHE_PATH)
+CACHE_MAX_MB = float(os.getenv("CLEANER_CACHE_MAX_MB", "256"))
+CACHE_TTL_HOURS = float(os.getenv("CLEANER_CACHE_TTL_HOURS", "24"))
+# Evictions free space down to this fraction of the budget, so they stay rare
+EVICT_TO_FRACTION = 0.9
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    text TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_entries_accessed_at ON entries (accessed_at);
+"""
+
+
+class CacheEntry(NamedTuple):
+    url: str
+    text: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+
+def cache_key(url: str) -> str:
+    """Content address for a (normalized) URL"""
+    return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+
+class FetchCache:
+    """Size-bounded LRU cache of extracted text plus HTTP validators
+
+    Entries younger than the TTL are served without touching the network;
+    older ones keep their ETag/Last-Modified so the Cleaner can revalidate
+    with a conditional GET and only re-parse pages that actually changed.
+    Once the stored text exceeds `max_bytes`, least recently used entries
+    are evicted down to EVICT_TO_FRACTION of it. The size is tracked as a
+    running total, so a put costs no table scan. Callers should pass URLs
+    through `normalize_url` first.
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: float, clock=time.time):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.executescript(SCHEMA)
+        self._bytes = self._total_bytes()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return self.clock() - entry.fetched_at < self.ttl_seconds
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Look up a URL (fresh or stale) and mark it as recently used"""
+        key = cache_key(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, text, etag, last_modified, fetched_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (self.clock(), key))
+        return CacheEntry(*row)
+
+    def put(self, url: str, text: str, etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> None:
+        """Store freshly extracted text, evicting LRU entries if over budget"""
+        now = self.clock()
+        key = cache_key(url)
+        size = len(text.encode('utf-8'))
+        with self._lock:
+            replaced = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, url, text, etag, last_modified, size, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, text, etag, last_modified, size, now, now)
+            )
+            self._bytes += size - (replaced[0] if replaced else 0)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def touch(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Mark an entry as revalidated (server answered 304 Not Modified)"""
+        now = self.clock()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE entries SET fetched_at = ?, accessed_at = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE key = ?",
+                (now, now, etag, last_modified, cache_key(url))
+            )
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._total_bytes()
+
+    def _total_bytes(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _evict(self) -> None:
+        # Another process may share the file, so start from the stored total
+        self._bytes = self._total_bytes()
+        if self._bytes <= self.max_bytes:
+            return
+
+        excess = self._bytes - int(self.max_bytes * EVICT_TO_FRACTION)
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY accessed_at"):
+            doomed.append((key,))
+            excess -= size
+            self._bytes -= size
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+        logger.debug(f"Fetch cache evicted {len(doomed)} entries")
+
+
+_cache: Optional[FetchCache] = None
+
+
+def get_fetch_cache() -> Optional[FetchCache]:
+    """Process-wide cache from CLEANER_CACHE_* settings (None if disabled or unusable)"""
+    global _cache
+    if _cache is None and CACHE_PATH and CACHE_MAX_MB > 0:
+        try:
+            _cache = FetchCache(CACHE_PATH, int(CACHE_MAX_MB * 1024 * 1024), CACHE_TTL_HOURS * 3600)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Fetch cache disabled, could not open {CACHE_PATH}: {e}")
+            return None
+    return _cache
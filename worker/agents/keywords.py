@@ -0,0 +1,98 @@
+"""
+Keyword matching: compiled multi-pattern matcher shared by the agents
+"""
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+TOKEN_RE = re.compile(r"[A-Za-z0-9]+")
+
+# Trie key marking the end of a pattern (tokens are never empty strings)
+_TERMINAL = ""
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into alphanumeric word tokens"""
+    return TOKEN_RE.findall(text or "")
+
+
+class KeywordMatcher:
+    """Word-boundary keyword/phrase matcher compiled into a token trie
+
+    Patterns are grouped by label (topic slug, lab name, rule name, ...) and
+    compiled once into a trie keyed by lowercased word tokens. Matching
+    tokenizes the text a single time and walks the trie from each token, so
+    the cost per text depends on its length and the longest phrase, not on
+    how many patterns are registered. Overlapping hits are all reported
+    ("clinical trial" also yields "clinical"). Punctuation is ignored
+    ("self-driving" matches "self driving"), and all-uppercase patterns such
+    as "FAIR" only match the acronym, not the ordinary word.
+    """
+
+    def __init__(self, patterns: Dict[str, Iterable[str]]):
+        self.labels: List[str] = []
+        self._priority: Dict[str, int] = {}
+        self._trie: Dict = {}
+        self.size = 0
+
+        for label, label_patterns in patterns.items():
+            self._register_label(label)
+            for pattern in label_patterns:
+                self.add(label, pattern)
+
+    def _register_label(self, label: str) -> None:
+        if label not in self._priority:
+            self._priority[label] = len(self.labels)
+            self.labels.append(label)
+
+    def add(self, label: str, pattern: str) -> None:
+        """Register one pattern under a label"""
+        tokens = tokenize(pattern)
+        if not tokens:
+            return
+
+        self._register_label(label)
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(token.lower(), {})
+
+        exact = tuple(tokens) if pattern.isupper() else None
+        node.setdefault(_TERMINAL, []).append((label, pattern, exact))
+        self.size += 1
+
+    def find(self, text: Optional[str]) -> Iterator[Tuple[str, str]]:
+        """Yield (label, pattern) for every match, including overlapping ones"""
+        tokens = tokenize(text)
+        lowered = [token.lower() for token in tokens]
+        trie = self._trie
+        n = len(lowered)
+
+        for start in range(n):
+            node = trie.get(lowered[start])
+            end = start
+            while node is not None:
+                for label, pattern, exact in node.get(_TERMINAL, ()):
+                    if exact is None or tuple(tokens[start:end + 1]) == exact:
+                        yield label, pattern
+                end += 1
+                if end >= n:
+                    break
+                node = node.get(lowered[end])
+
+    def matches(self, text: Optional[str]) -> Dict[str, Set[str]]:
+        """Distinct matched patterns per label"""
+        found: Dict[str, Set[str]] = {}
+        for label, pattern in self.find(text):
+            found.setdefault(label, set()).add(pattern)
+        return found
+
+    def counts(self, text: Optional[str]) -> Dict[str, int]:
+        """Number of distinct matched patterns per label"""
+        return {label: len(patterns) for label, patterns in self.matches(text).items()}
+
+    def first_label(self, text: Optional[str]) -> Optional[str]:
+        """Highest-priority (earliest registered) label that matches, if any"""
+        best = None
+        for label, _ in self.find(text):
+            if best is None or self._priority[label] < self._priority[best]:
+                best = label
+        return best
@@ -0,0 +1,131 @@
+"""
+Cluster maintenance: merge converged clusters and retire stale ones
+"""
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from .cluster import UnionFind, candidate_pairs, invalidate_clusters
+from .cluster_index import ClusterIndex, get_cluster_index, decode_signature, INDEX_WINDOW_DAYS
+from .minhash import estimate_jaccard
+from .models import Cluster, ClusterState, cluster_items, briefing_clusters
+
+MERGE_THRESHOLD = float(os.getenv("CLUSTER_MERGE_THRESHOLD", "0.6"))
+RETIRE_DAYS = int(os.getenv("CLUSTER_RETIRE_DAYS", "30"))
+MAINTENANCE_INTERVAL = int(os.getenv("CLUSTER_MAINTENANCE_INTERVAL", "21600"))
+
+logger = logging.getLogger(__name__)
+
+
+def find_merges(cluster_ids: List[int], signatures: List, threshold: float = MERGE_THRESHOLD) -> Dict[int, int]:
+    """Absorbed cluster id -> surviving cluster id for clusters whose signatures converge
+
+    Candidate pairs come from LSH and are linked when their estimated Jaccard
+    clears the threshold; each connected set merges into its oldest (lowest
+    id) cluster.
+    """
+    sets = UnionFind(len(cluster_ids))
+    for i, j in candidate_pairs(signatures):
+        if estimate_jaccard(signatures[i], signatures[j]) >= threshold:
+            sets.union(i, j)
+
+    merges = {}
+    for group in sets.groups():
+        ordered = sorted(cluster_ids[i] for i in group)
+        for absorbed in ordered[1:]:
+            merges[absorbed] = ordered[0]
+    return merges
+
+
+def merge_clusters(db: Session, merges: Dict[int, int]) -> None:
+    """Move items and briefing links of absorbed clusters to their survivors, then delete them
+
+    Survivors are invalidated like clusters that gained items in a clustering
+    run, so the Tagger, Editor and Writer redo them with their new items.
+    """
+    absorbed = list(merges)
+    survivors = set(merges.values())
+
+    db.execute(
+        update(cluster_items)
+        .where(cluster_items.c.cluster_id.in_(absorbed))
+        .values(cluster_id=case(merges, value=cluster_items.c.cluster_id)),
+        execution_options={"synchronize_session": False}
+    )
+
+    # Re-point briefing links, skipping briefings that already list the survivor
+    links = db.execute(
+        select(briefing_clusters.c.briefing_id, briefing_clusters.c.cluster_id)
+        .where(briefing_clusters.c.cluster_id.in_(absorbed + list(survivors)))
+    ).all()
+    existing = {(briefing_id, cluster_id) for briefing_id, cluster_id in links}
+    moved = {
+        (briefing_id, merges[cluster_id]) for briefing_id, cluster_id in links if cluster_id in merges
+    } - existing
+    if moved:
+        db.execute(insert(briefing_clusters), [
+            {"briefing_id": briefing_id, "cluster_id": cluster_id} for briefing_id, cluster_id in sorted(moved)
+        ])
+
+    # Absorbed clusters' derived rows go too, before the clusters themselves
+    invalidate_clusters(db, absorbed + sorted(survivors))
+    db.execute(
+        delete(briefing_clusters).where(briefing_clusters.c.cluster_id.in_(absorbed))
+    )
+    db.execute(
+        delete(Cluster).where(Cluster.id.in_(absorbed)),
+        execution_options={"synchronize_session": False}
+    )
+
+
+def retire_clusters(db: Session, cutoff: datetime, now: datetime) -> List[int]:
+    """Archive active clusters created before the cutoff; returns their ids"""
+    result = db.execute(
+        update(Cluster)
+        .where(Cluster.state == ClusterState.ACTIVE.value, Cluster.created_at < cutoff)
+        .values(state=ClusterState.ARCHIVED.value, archived_at=now)
+        .returning(Cluster.id),
+        execution_options={"synchronize_session": False}
+    )
+    return [cluster_id for (cluster_id,) in result]
+
+
+def run(db: Session, now: Optional[datetime] = None, index: Optional[ClusterIndex] = None,
+        retire_days: int = RETIRE_DAYS, merge_threshold: float = MERGE_THRESHOLD) -> Dict:
+    """Merge converged clusters created within the cluster-index window and retire old ones"""
+    logger.info("Starting cluster maintenance")
+    now = now or datetime.now(timezone.utc)
+    index = index if index is not None else get_cluster_index()
+
+    rows = db.query(Cluster.id, Cluster.signature).filter(
+        Cluster.state == ClusterState.ACTIVE.value,
+        Cluster.signature.isnot(None),
+        Cluster.created_at >= now - timedelta(days=INDEX_WINDOW_DAYS)
+    ).order_by(Cluster.id).all()
+
+    merges = find_merges([cluster_id for cluster_id, _ in rows],
+                         [decode_signature(data) for _, data in rows], merge_threshold)
+    if merges:
+        merge_clusters(db, merges)
+
+    retired = retire_clusters(db, now - timedelta(days=retire_days), now)
+    db.commit()
+
+    for cluster_id in list(merges) + retired:
+        index.discard(cluster_id)
+
+    survivors = sorted(set(merges.values()))
+    logger.info(
+        f"Cluster maintenance completed: {len(merges)} clusters merged into {len(survivors)}, "
+        f"{len(retired)} retired"
+    )
+
+    return {
+        "clusters_merged": len(merges),
+        "clusters_retired": len(retired),
+        "merged_cluster_ids": survivors
+    }
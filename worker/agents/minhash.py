@@ -0,0 +1,119 @@
+"""
+MinHash signatures and LSH banding for near-duplicate candidate search
+"""
+import re
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+import numpy as np
+
+MAX_HASH = (1 << 32) - 1
+SHINGLE_BASE = np.uint64(1099511628211)  # FNV prime, for the rolling k-gram hash
+
+NUM_PERM = 128
+BANDS = 32  # 32 bands x 4 rows: pairs above ~0.4 Jaccard almost always collide
+SHINGLE_SIZE = 5
+
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def shingle_hashes(text: str, k: int = SHINGLE_SIZE) -> np.ndarray:
+    """32-bit hashes of the distinct k-grams (UTF-8 bytes) of lowercased, whitespace-collapsed text
+
+    Computed as a vectorized polynomial rolling hash, so there is no
+    per-shingle Python work.
+    """
+    data = WHITESPACE_RE.sub(' ', (text or '').lower()).strip().encode('utf-8')
+    if not data:
+        return np.empty(0, dtype=np.uint32)
+    codes = np.frombuffer(data, dtype=np.uint8).astype(np.uint64)
+    width = min(k, len(codes))
+    count = len(codes) - width + 1
+
+    hashes = np.zeros(count, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for offset in range(width):
+            hashes = hashes * SHINGLE_BASE + codes[offset:offset + count]
+    return np.unique((hashes ^ (hashes >> np.uint64(32))).astype(np.uint32))
+
+
+class MinHasher:
+    """Fixed family of random 32-bit permutations (seeded, so signatures are stable across runs)
+
+    h_i(x) = a_i * x + b_i mod 2**32 with odd a_i is a bijection on 32-bit
+    values; uint32 arithmetic wraps natively, so no modulo is needed.
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = (rng.randint(0, 1 << 31, size=num_perm, dtype=np.uint32) << np.uint32(1)) | np.uint32(1)
+        self.b = rng.randint(0, MAX_HASH, size=num_perm, dtype=np.uint32)
+
+    def signature(self, hashes: np.ndarray) -> np.ndarray:
+        """MinHash signature (uint32 per permutation) of a set of shingle hashes"""
+        if hashes.size == 0:
+            return np.full(self.num_perm, MAX_HASH, dtype=np.uint32)
+        with np.errstate(over='ignore'):
+            permuted = self.a[:, None] * hashes[None, :] + self.b[:, None]
+        return permuted.min(axis=1)
+
+    def text_signature(self, text: str, k: int = SHINGLE_SIZE) -> np.ndarray:
+        return self.signature(shingle_hashes(text, k))
+
+
+def estimate_jaccard(sig1: np.ndarray, sig2: np.ndarray) -> float:
+    """Fraction of agreeing permutations, an unbiased Jaccard estimate"""
+    return float(np.mean(sig1 == sig2))
+
+
+class LSHIndex:
+    """Banded locality-sensitive hash index over MinHash signatures
+
+    Each signature is cut into `bands` bands; keys sharing any band bucket
+    become candidates. Lookups touch one bucket per band, so finding the
+    candidates for an item doesn't depend on how many items are indexed.
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, bands: int = BANDS):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets: List[Dict[bytes, List[Hashable]]] = [defaultdict(list) for _ in range(bands)]
+
+    def _band_keys(self, signature: np.ndarray) -> Iterable[Tuple[int, bytes]]:
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def insert(self, key: Hashable, signature: np.ndarray) -> None:
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band][band_key].append(key)
+
+    def remove(self, key: Hashable, signature: np.ndarray) -> None:
+        for band, band_key in self._band_keys(signature):
+            bucket = self._buckets[band].get(band_key)
+            if bucket and key in bucket:
+                bucket.remove(key)
+                if not bucket:
+                    del self._buckets[band][band_key]
+
+    def query(self, signature: np.ndarray) -> Set[Hashable]:
+        """Keys sharing at least one band with the signature"""
+        found = set()
+        for band, band_key in self._band_keys(signature):
+            found.update(self._buckets[band].get(band_key, ()))
+        return found
+
+    def candidate_pairs(self) -> Set[Tuple[Hashable, Hashable]]:
+        """All (a, b) pairs, a < b, that share a bucket in any band"""
+        pairs = set()
+        for buckets in self._buckets:
+            for keys in buckets.values():
+                if len(keys) < 2:
+                    continue
+                ordered = sorted(keys)
+                for i, a in enumerate(ordered):
+                    for b in ordered[i + 1:]:
+                        pairs.add((a, b))
+        return pairs
@@ -4,39 +4,88 @@ Scout Agent: Ingest RSS feeds and arXiv
 import feedparser
 import arxiv
 import requests
-from datetime import datetime
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Optional
+import io
 import json
+import re
 import os
+import time
+import threading
 import logging
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
-from .models import Source, RawItem, SourceType
-from urllib.parse import urlparse
+from .models import Source, RawItem, SourceType, HarvestCursor, ProcessingState
+from .urls import canonicalize_url, clean_url, resolve_entry_url
+from .keywords import tokenize
 
-# Frontier lab domains and identifiers
+# Frontier lab domains and identifiers (matched as host suffixes)
 FRONTIER_LABS = {
     "anthropic.com": "Anthropic",
     "openai.com": "OpenAI",
     "deepmind.com": "DeepMind",
-    "google.com": "Google AI",  # ai.googleblog.com, research.google
-    "googleblog.com": "Google AI",
+    "deepmind.google": "DeepMind",
+    "google.com": "Google AI",
+    "googleblog.com": "Google AI",  # ai.googleblog.com
+    "research.google": "Google AI",
     "meta.com": "Meta AI",
     "facebook.com": "Meta AI",
     "microsoft.com": "Microsoft Research",
     "microsoftresearch.com": "Microsoft Research"
 }
 
-# arXiv author patterns for frontier labs
+# arXiv author patterns for frontier labs (all-caps patterns are acronyms, matched case-sensitively)
 ARXIV_LAB_PATTERNS = {
     "Anthropic": ["anthropic", "anthropic ai"],
     "OpenAI": ["openai", "open ai"],
     "DeepMind": ["deepmind", "deep mind"],
     "Google AI": ["google research", "google ai", "google brain"],
-    "Meta AI": ["meta ai", "facebook ai research", "fair"],
-    "Microsoft Research": ["microsoft research", "msr"]
+    "Meta AI": ["meta ai", "facebook ai research", "FAIR"],
+    "Microsoft Research": ["microsoft research", "MSR"]
 }
 
+
+def _lab_check(pattern: str):
+    """(lowercase first word, compiled word-boundary regex) for one author pattern"""
+    # Same tokens as KeywordMatcher: any run of punctuation separates words
+    tokens = tokenize(pattern)
+    body = '[^A-Za-z0-9]+'.join(map(re.escape, tokens))
+    flags = 0 if pattern.isupper() else re.IGNORECASE
+    return tokens[0].lower(), re.compile(f'(?<![A-Za-z0-9]){body}(?![A-Za-z0-9])', flags)
+
+
+# Compiled once at import time. Authors: a substring check on the lowercased
+# text gates each pattern's regex, so most texts cost a few `in` scans.
+# URLs: one host-suffix alternation.
+ARXIV_LAB_CHECKS = [
+    (lab_name, [_lab_check(pattern) for pattern in patterns])
+    for lab_name, patterns in ARXIV_LAB_PATTERNS.items()
+]
+# The lazy host prefix tries the whole host first, so the most specific suffix wins
+FRONTIER_LAB_URL_RE = re.compile(
+    r'[A-Za-z][A-Za-z0-9+.-]*://(?:[^/?#@]*@)?(?:[^/?#@:]*?\.)??('
+    + '|'.join(map(re.escape, FRONTIER_LABS))
+    + r')(?::[0-9]*)?(?:[/?#]|$)',
+    re.IGNORECASE
+)
+
+# Concurrent feed fetching
+FEED_FETCH_WORKERS = int(os.getenv("SCOUT_FEED_WORKERS", "8"))
+FEED_FETCH_TIMEOUT = float(os.getenv("SCOUT_FEED_TIMEOUT", "15"))
+MAX_ENTRIES_PER_FEED = 20
+ARXIV_SOURCE_URL = "https://arxiv.org/list/cs.AI/recent"
+# arXiv announces some papers days after later submissions; re-query this far back
+ARXIV_OVERLAP_HOURS = 48
+
+# Bulk RawItem writes
+COPY_THRESHOLD = 10000
+COPY_COLUMNS = (
+    "source_id", "title", "url", "normalized_url", "content", "published_at", "frontier_lab", "processing_state"
+)
+USER_AGENT = 'Mozilla/5.0 (compatible; AIBriefingScout/1.0)'
+
 logger = logging.getLogger(__name__)
 
 
@@ -60,107 +109,525 @@ def load_arxiv_config() -> Dict:
             return json.load(f)
     except Exception as e:
         logger.error(f"Failed to load arXiv config: {e}")
-        return {"categories": [], "keywords": [], "max_results_per_category": 50}
+        return {
+            "categories": [], "keywords": [], "max_results_per_category": 50,
+            "max_backfill_per_category": 500, "overlap_hours": ARXIV_OVERLAP_HOURS,
+            "seconds_per_request": 3, "max_parallel_categories": 5
+        }
 
 
-def detect_frontier_lab_from_url(url: str) -> str:
-    """Detect frontier lab from URL"""
-    parsed = urlparse(url)
-    domain = parsed.netloc.lower()
+def detect_frontier_lab_from_url(url: str) -> Optional[str]:
+    """Detect frontier lab from URL by host suffix (most specific first)"""
+    match = FRONTIER_LAB_URL_RE.match(url or '')
+    return FRONTIER_LABS[match.group(1).lower()] if match else None
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by concurrent fetchers of one upstream"""
     
-    for lab_domain, lab_name in FRONTIER_LABS.items():
-        if lab_domain in domain:
-            return lab_name
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate  # tokens per second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
     
-    return None
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
 
 
-def ingest_rss_feeds(db) -> int:
-    """Ingest items from RSS feeds"""
-    feeds = load_rss_config()
-    count = 0
+class RateLimitedArxivClient(arxiv.Client):
+    """arXiv client whose HTTP requests, retries included, all draw from a shared TokenBucket"""
     
-    for feed_config in feeds:
-        try:
-            logger.info(f"Ingesting RSS feed: {feed_config['name']}")
-            
-            # Check if this is a frontier lab feed
-            frontier_lab = feed_config.get('frontier_lab')
-            source_type = SourceType.PRIMARY_LAB if frontier_lab else SourceType.RSS
-            
-            # Get or create source
-            source = db.query(Source).filter(
-                Source.url == feed_config['url']
-            ).first()
-            
-            if not source:
-                source = Source(
-                    name=feed_config['name'],
-                    url=feed_config['url'],
-                    source_type=source_type,
-                    is_active=True
-                )
-                db.add(source)
-                db.flush()
+    def __init__(self, limiter: TokenBucket, **kwargs):
+        super().__init__(**kwargs)
+        self.limiter = limiter
+    
+    def _parse_feed(self, url: str, first_page: bool = True) -> feedparser.FeedParserDict:
+        """Fetch one results page, retrying like arxiv.Client but taking a token per attempt
+
+        The base client retries inside a private helper that would only pass
+        through here once, so the retry loop is reimplemented around the limiter.
+        """
+        for retry in range(self.num_retries + 1):
+            self.limiter.acquire()
+            feed = feedparser.parse(url)
+            if feed.status != 200:
+                error = arxiv.HTTPError(url, retry, feed)
+            elif not feed.entries and not first_page:
+                error = arxiv.UnexpectedEmptyPageError(url, retry)
             else:
-                # Update source type if it's a frontier lab
-                if frontier_lab and source.source_type != SourceType.PRIMARY_LAB:
-                    source.source_type = SourceType.PRIMARY_LAB
-                    db.flush()
-            
-            # Parse feed
-            parsed = feedparser.parse(feed_config['url'])
-            
-            for entry in parsed.entries[:20]:  # Limit to 20 items per feed
-                # Check if already exists
-                existing = db.query(RawItem).filter(
-                    RawItem.url == entry.get('link', '')
-                ).first()
-                
-                if existing:
-                    continue
-                
-                # Detect frontier lab from URL if not in config
-                item_frontier_lab = frontier_lab
-                if not item_frontier_lab:
-                    item_frontier_lab = detect_frontier_lab_from_url(entry.get('link', ''))
-                
-                # Parse published date
-                published_at = None
-                if 'published_parsed' in entry:
-                    try:
-                        published_at = datetime(*entry.published_parsed[:6])
-                    except:
-                        pass
-                
-                item = RawItem(
-                    source_id=source.id,
-                    title=entry.get('title', 'Untitled'),
-                    url=entry.get('link', ''),
-                    content=entry.get('summary', ''),
-                    published_at=published_at,
-                    frontier_lab=item_frontier_lab
-                )
-                db.add(item)
-                count += 1
-            
-            db.commit()
-            logger.info(f"Ingested {count} items from {feed_config['name']}")
+                return feed
+            logger.info(f"arXiv page request failed ({error}), {self.num_retries - retry} retries left")
+        raise error
+
+
+def fetch_feed(feed_config: Dict, timeout: float = FEED_FETCH_TIMEOUT,
+               validators: Optional[Dict] = None) -> Dict:
+    """Download and parse a single feed (no DB access, safe to run in a thread)
+
+    Sends a conditional GET when cached validators (ETag / Last-Modified) are
+    given; a 304 response skips parsing entirely. Feed-proxy and shortener
+    links are resolved within the same timeout, counted from the start of
+    the fetch; links still unresolved when it runs out are kept as given.
+    """
+    started = time.monotonic()
+    result = {
+        "name": feed_config.get('name', 'unknown'),
+        "url": feed_config['url'],
+        "entries": [],
+        "not_modified": False,
+        "etag": None,
+        "last_modified": None,
+        "error": None
+    }
+    
+    headers = {'User-Agent': USER_AGENT}
+    if validators:
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+    
+    try:
+        response = requests.get(feed_config['url'], timeout=timeout, headers=headers)
+        
+        if response.status_code == 304:
+            result["not_modified"] = True
+        else:
+            response.raise_for_status()
             
-        except Exception as e:
-            logger.error(f"Error ingesting RSS feed {feed_config.get('name', 'unknown')}: {e}")
-            db.rollback()
+            parsed = feedparser.parse(response.content)
+            result["entries"] = parsed.entries[:MAX_ENTRIES_PER_FEED]
+            # Resolve feed-proxy links here, in the fetch thread, so the DB stage sees article URLs
+            deadline = started + timeout
+            for entry in result["entries"]:
+                entry['link'] = resolve_entry_url(entry, deadline=deadline)
+            result["etag"] = response.headers.get('ETag')
+            result["last_modified"] = response.headers.get('Last-Modified')
+    except Exception as e:
+        result["error"] = str(e)
+    
+    result["elapsed"] = round(time.monotonic() - started, 3)
+    return result
+
+
+def fetch_feeds(feeds: List[Dict], max_workers: int = FEED_FETCH_WORKERS,
+                timeout: float = FEED_FETCH_TIMEOUT,
+                validators: Optional[Dict[str, Dict]] = None) -> List[Dict]:
+    """Fetch all feeds concurrently with a bounded thread pool, preserving config order"""
+    if not feeds:
+        return []
+    
+    validators = validators or {}
+    
+    def fetch(feed_config: Dict) -> Dict:
+        return fetch_feed(feed_config, timeout, validators.get(feed_config['url']))
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(feeds)))) as executor:
+        return list(executor.map(fetch, feeds))
+
+
+def load_feed_validators(db, feeds: List[Dict]) -> Dict[str, Dict]:
+    """Load cached HTTP validators for the configured feeds, keyed by feed URL"""
+    urls = [feed_config['url'] for feed_config in feeds]
+    if not urls:
+        return {}
+    
+    rows = db.query(Source.url, Source.etag, Source.last_modified).filter(
+        Source.url.in_(urls)
+    ).all()
+    
+    return {
+        url: {"etag": etag, "last_modified": last_modified}
+        for url, etag, last_modified in rows
+    }
+
+
+def get_or_create_feed_source(db, feed_config: Dict) -> Source:
+    """Get or create the Source row for an RSS feed"""
+    frontier_lab = feed_config.get('frontier_lab')
+    source_type = SourceType.PRIMARY_LAB if frontier_lab else SourceType.RSS
+    
+    source = db.query(Source).filter(
+        Source.url == feed_config['url']
+    ).first()
+    
+    if not source:
+        source = Source(
+            name=feed_config['name'],
+            url=feed_config['url'],
+            source_type=source_type,
+            is_active=True
+        )
+        db.add(source)
+        db.flush()
+    else:
+        # Update source type if it's a frontier lab
+        if frontier_lab and source.source_type != SourceType.PRIMARY_LAB:
+            source.source_type = SourceType.PRIMARY_LAB
+            db.flush()
+    
+    return source
+
+
+def prepare_raw_item_rows(rows: List[Dict]) -> List[Dict]:
+    """Add the canonical-URL dedup key and initial processing state, dropping URL-less and in-batch duplicate rows
+
+    Only items that arrive without content need the Cleaner.
+    """
+    candidates = {}
+    for row in rows:
+        if not row['url']:
             continue
+        key = canonicalize_url(row['url'])
+        if key not in candidates:
+            state = ProcessingState.DONE if row.get('content') else ProcessingState.PENDING
+            candidates[key] = {
+                **row,
+                "url": clean_url(row['url']),
+                "normalized_url": key,
+                "processing_state": state.value
+            }
+    return list(candidates.values())
+
+
+def upsert_raw_items(db, rows: List[Dict]) -> List[int]:
+    """Bulk insert raw item rows, skipping URLs that are already stored
+
+    Executes one cached INSERT ... ON CONFLICT (normalized_url) DO NOTHING
+    RETURNING id as an executemany, which SQLAlchemy sends as multi-row
+    VALUES pages (insertmanyvalues), so ingestion is idempotent, safe to run
+    from several workers at once and needs one statement per page. On
+    PostgreSQL, batches of COPY_THRESHOLD rows or more go through
+    copy_raw_items instead. Returns the IDs of the newly inserted rows.
+    """
+    rows = prepare_raw_item_rows(rows)
+    if not rows:
+        return []
     
-    return count
+    is_postgres = db.get_bind().dialect.name == 'postgresql'
+    if is_postgres and len(rows) >= COPY_THRESHOLD:
+        return copy_raw_items(db, rows, prepared=True)
+    
+    dialect = postgresql if is_postgres else sqlite
+    stmt = (
+        dialect.insert(RawItem)
+        .on_conflict_do_nothing(index_elements=['normalized_url'])
+        .returning(RawItem.id)
+    )
+    
+    return [row_id for (row_id,) in db.execute(stmt, rows)]
 
 
-def ingest_arxiv(db) -> int:
-    """Ingest items from arXiv"""
-    config = load_arxiv_config()
+def _copy_text_value(value) -> str:
+    """Encode one value for PostgreSQL COPY text format"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace('\t', '\\t')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+    )
+
+
+def copy_raw_items(db, rows: List[Dict], prepared: bool = False) -> List[int]:
+    """Bulk load raw items with PostgreSQL COPY (for large backfills)
+
+    Streams rows into a temporary staging table with COPY, then moves them
+    into raw_items with one INSERT ... SELECT ... ON CONFLICT DO NOTHING
+    RETURNING id. Runs inside the session's current transaction.
+    """
+    if not prepared:
+        rows = prepare_raw_item_rows(rows)
+    if not rows:
+        return []
+    
+    columns = ", ".join(COPY_COLUMNS)
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(_copy_text_value(row.get(column)) for column in COPY_COLUMNS))
+        buffer.write('\n')
+    buffer.seek(0)
+    
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.execute(
+            f"CREATE TEMP TABLE raw_items_staging ON COMMIT DROP AS "
+            f"SELECT {columns} FROM raw_items WITH NO DATA"
+        )
+        cursor.copy_expert(f"COPY raw_items_staging ({columns}) FROM STDIN", buffer)
+        cursor.execute(
+            f"INSERT INTO raw_items ({columns}) SELECT {columns} FROM raw_items_staging "
+            f"ON CONFLICT (normalized_url) DO NOTHING RETURNING id"
+        )
+        new_item_ids = [row_id for (row_id,) in cursor.fetchall()]
+        cursor.execute("DROP TABLE raw_items_staging")
+    finally:
+        cursor.close()
+    
+    return new_item_ids
+
+
+def store_feed_entries(db, feed_config: Dict, entries: List,
+                       etag: Optional[str] = None, last_modified: Optional[str] = None) -> List[int]:
+    """Write parsed feed entries for one feed to the database, returning new item IDs"""
+    frontier_lab = feed_config.get('frontier_lab')
+    source = get_or_create_feed_source(db, feed_config)
+    rows = []
+    
+    for entry in entries:
+        # Detect frontier lab from URL if not in config
+        item_frontier_lab = frontier_lab
+        if not item_frontier_lab:
+            item_frontier_lab = detect_frontier_lab_from_url(entry.get('link', ''))
+        
+        # Parse published date
+        published_at = None
+        if 'published_parsed' in entry:
+            try:
+                published_at = datetime(*entry.published_parsed[:6])
+            except:
+                pass
+        
+        rows.append({
+            "source_id": source.id,
+            "title": entry.get('title', 'Untitled'),
+            "url": entry.get('link', ''),
+            "content": entry.get('summary', ''),
+            "published_at": published_at,
+            "frontier_lab": item_frontier_lab
+        })
+    
+    new_item_ids = upsert_raw_items(db, rows)
+    
+    # Only remember validators once the entries they cover are stored
+    source.etag = etag
+    source.last_modified = last_modified
+    
+    db.commit()
+    return new_item_ids
+
+
+def store_fetched_feed(db, feed_config: Dict, result: Dict) -> Dict:
+    """DB stage for one fetched feed; returns its report for the run result"""
+    report = {
+        "name": result["name"],
+        "elapsed": result["elapsed"],
+        "ingested": 0,
+        "new_item_ids": [],
+        "not_modified": result["not_modified"],
+        "error": result["error"]
+    }
+    
+    if result["error"]:
+        logger.error(f"Error fetching RSS feed {result['name']}: {result['error']}")
+        return report
+    
+    if result["not_modified"]:
+        logger.info(f"RSS feed {result['name']} not modified since last run")
+        return report
+    
+    try:
+        new_item_ids = store_feed_entries(
+            db, feed_config, result["entries"],
+            etag=result["etag"], last_modified=result["last_modified"]
+        )
+        report["new_item_ids"] = new_item_ids
+        report["ingested"] = len(new_item_ids)
+        logger.info(f"Ingested {len(new_item_ids)} items from {result['name']} (fetched in {result['elapsed']}s)")
+    except Exception as e:
+        logger.error(f"Error ingesting RSS feed {result['name']}: {e}")
+        report["error"] = str(e)
+        db.rollback()
+    
+    return report
+
+
+def ingest_feed(db, feed_config: Dict) -> Dict:
+    """Fetch and store a single RSS feed (used by the streaming worker)"""
+    validators = load_feed_validators(db, [feed_config]).get(feed_config['url'])
+    result = fetch_feed(feed_config, validators=validators)
+    return store_fetched_feed(db, feed_config, result)
+
+
+def ingest_rss_feeds(db) -> Dict:
+    """Ingest items from RSS feeds: fetch concurrently, then write in a single stage"""
+    feeds = load_rss_config()
     count = 0
+    not_modified = 0
+    reports = []
+    
+    validators = load_feed_validators(db, feeds)
+    
+    logger.info(f"Fetching {len(feeds)} RSS feeds with up to {FEED_FETCH_WORKERS} workers")
+    fetched = fetch_feeds(feeds, validators=validators)
+    
+    for feed_config, result in zip(feeds, fetched):
+        report = store_fetched_feed(db, feed_config, result)
+        # Keep the run result compact; IDs are only needed by the streaming worker
+        report.pop("new_item_ids")
+        reports.append(report)
+        count += report["ingested"]
+        if report["not_modified"]:
+            not_modified += 1
+    
+    return {
+        "count": count,
+        "not_modified": not_modified,
+        "feeds": reports
+    }
+
+
+def get_harvest_cursor(db, key: str) -> HarvestCursor:
+    """Get or create the harvest cursor for a key"""
+    cursor = db.query(HarvestCursor).filter(HarvestCursor.key == key).first()
+    
+    if not cursor:
+        cursor = HarvestCursor(key=key)
+        db.add(cursor)
+        db.flush()
+    
+    return cursor
+
+
+def build_arxiv_search(category: str, config: Dict, since: Optional[datetime] = None) -> arxiv.Search:
+    """Build the arXiv query for a category
+
+    Without a cursor this is the newest max_results_per_category papers.
+    With one, it asks for submissions from overlap_hours before the cursor,
+    oldest first, so papers announced after later submissions are still
+    picked up and successive runs page forward until they catch up. The
+    result count is left open; fetch_arxiv_category caps the papers past
+    the cursor instead, so the overlap can't use up a page.
+    """
+    if since is None:
+        return arxiv.Search(
+            query=f"cat:{category}",
+            max_results=config.get('max_results_per_category', 50),
+            sort_by=arxiv.SortCriterion.SubmittedDate
+        )
+    
+    # arXiv submittedDate ranges are inclusive, minute granularity, GMT
+    if since.tzinfo:
+        since = since.astimezone(timezone.utc)
+    since -= timedelta(hours=config.get('overlap_hours', ARXIV_OVERLAP_HOURS))
+    since_str = since.strftime('%Y%m%d%H%M')
+    return arxiv.Search(
+        query=f"cat:{category} AND submittedDate:[{since_str} TO 999912312359]",
+        sort_by=arxiv.SortCriterion.SubmittedDate,
+        sort_order=arxiv.SortOrder.Ascending
+    )
+
+
+def detect_frontier_lab_from_authors(authors: List) -> Optional[str]:
+    """Detect frontier lab from arXiv author strings (first lab in ARXIV_LAB_PATTERNS order)"""
+    text = ' '.join([str(a) for a in authors])
+    lowered = text.lower()
+    for lab_name, checks in ARXIV_LAB_CHECKS:
+        for word, pattern in checks:
+            if word in lowered and pattern.search(text):
+                return lab_name
+    return None
+
+
+def fetch_arxiv_category(category: str, config: Dict, since: Optional[datetime],
+                         client: arxiv.Client) -> Dict:
+    """Query one arXiv category (no DB access, safe to run in a thread)"""
+    started = time.monotonic()
+    result = {
+        "category": category,
+        "rows": [],
+        "high_water": since,
+        "error": None
+    }
+    
+    backfill = config.get('max_backfill_per_category', 500)
+    past_cursor = 0
+    
+    try:
+        search = build_arxiv_search(category, config, since)
+        for paper in client.results(search):
+            # Papers from the overlap are kept; the upsert skips the ones already stored
+            if since and paper.published >= since:
+                past_cursor += 1
+                if past_cursor > backfill:
+                    break
+            if result["high_water"] is None or paper.published > result["high_water"]:
+                result["high_water"] = paper.published
+            
+            result["rows"].append({
+                "title": paper.title,
+                "url": paper.entry_id,
+                "content": paper.summary,
+                "published_at": paper.published,
+                "frontier_lab": detect_frontier_lab_from_authors(paper.authors)
+            })
+    except Exception as e:
+        result["error"] = str(e)
     
-    # Get or create arXiv source
+    result["elapsed"] = round(time.monotonic() - started, 3)
+    return result
+
+
+def make_arxiv_limiter(config: Dict) -> TokenBucket:
+    """Token bucket enforcing the configured arXiv request rate"""
+    return TokenBucket(rate=1.0 / max(config.get('seconds_per_request', 3), 0.001))
+
+
+def fetch_arxiv_categories(categories: List[str], config: Dict,
+                           cursors: Dict[str, Optional[datetime]]) -> List[Dict]:
+    """Query all categories concurrently under one shared arXiv rate limit"""
+    if not categories:
+        return []
+    
+    limiter = make_arxiv_limiter(config)
+    max_workers = max(1, min(config.get('max_parallel_categories', 5), len(categories)))
+    
+    def fetch(category: str) -> Dict:
+        # One client per thread: arxiv.Client keeps per-instance request state
+        client = RateLimitedArxivClient(limiter, delay_seconds=config.get('seconds_per_request', 3))
+        return fetch_arxiv_category(category, config, cursors.get(category), client)
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(fetch, categories))
+
+
+def drop_cross_listed(results: List[Dict]) -> int:
+    """Remove papers already seen in an earlier category, in place; returns count dropped"""
+    seen = set()
+    dropped = 0
+    
+    for result in results:
+        unique_rows = []
+        for row in result["rows"]:
+            key = canonicalize_url(row["url"])
+            if key in seen:
+                dropped += 1
+                continue
+            seen.add(key)
+            unique_rows.append(row)
+        result["rows"] = unique_rows
+    
+    return dropped
+
+
+def get_or_create_arxiv_source(db) -> Source:
+    """Get or create the shared arXiv Source row"""
     source = db.query(Source).filter(
         Source.name == "ArXiv",
         Source.source_type == SourceType.ARXIV
@@ -169,60 +636,86 @@ def ingest_arxiv(db) -> int:
     if not source:
         source = Source(
             name="ArXiv",
-            url="https://arxiv.org/list/cs.AI/recent",
+            url=ARXIV_SOURCE_URL,
             source_type=SourceType.ARXIV,
             is_active=True
         )
         db.add(source)
         db.flush()
     
+    return source
+
+
+def store_arxiv_result(db, source: Source, cursor: HarvestCursor, result: Dict) -> List[int]:
+    """DB stage for one fetched arXiv category; returns new item IDs"""
+    rows = [{**row, "source_id": source.id} for row in result["rows"]]
+    new_item_ids = upsert_raw_items(db, rows)
+    # Advance the cursor in the same transaction as the rows it covers
+    cursor.last_published_at = result["high_water"]
+    db.commit()
+    logger.info(f"Ingested {len(new_item_ids)} items from arXiv {result['category']} (fetched in {result['elapsed']}s)")
+    return new_item_ids
+
+
+def ingest_arxiv_category(db, category: str, limiter: TokenBucket,
+                          config: Optional[Dict] = None) -> Dict:
+    """Fetch and store a single arXiv category (used by the streaming worker)"""
+    config = config or load_arxiv_config()
+    source = get_or_create_arxiv_source(db)
+    cursor = get_harvest_cursor(db, f"arxiv:{category}")
+    
+    client = RateLimitedArxivClient(limiter, delay_seconds=config.get('seconds_per_request', 3))
+    result = fetch_arxiv_category(category, config, cursor.last_published_at, client)
+    report = {"name": f"arXiv {category}", "new_item_ids": [], "error": result["error"]}
+    
+    if result["error"]:
+        logger.error(f"Error ingesting arXiv category {category}: {result['error']}")
+        db.rollback()
+        return report
+    
+    try:
+        report["new_item_ids"] = store_arxiv_result(db, source, cursor, result)
+    except Exception as e:
+        logger.error(f"Error ingesting arXiv category {category}: {e}")
+        report["error"] = str(e)
+        db.rollback()
+    
+    return report
+
+
+def ingest_arxiv(db) -> int:
+    """Ingest items from arXiv: query categories concurrently, then write in a single stage"""
+    config = load_arxiv_config()
+    count = 0
+    
+    source = get_or_create_arxiv_source(db)
+    
     categories = config.get('categories', [])
+    cursors = {
+        category: get_harvest_cursor(db, f"arxiv:{category}")
+        for category in categories
+    }
+    db.commit()
+    
+    logger.info(f"Querying {len(categories)} arXiv categories concurrently")
+    fetched = fetch_arxiv_categories(
+        categories, config,
+        {category: cursor.last_published_at for category, cursor in cursors.items()}
+    )
+    
+    cross_listed = drop_cross_listed([result for result in fetched if not result["error"]])
+    if cross_listed:
+        logger.info(f"Dropped {cross_listed} cross-listed arXiv papers before ingest")
     
-    for category in categories:
+    for result in fetched:
+        category = result["category"]
+        
+        if result["error"]:
+            logger.error(f"Error ingesting arXiv category {category}: {result['error']}")
+            continue
+        
         try:
-            logger.info(f"Ingesting arXiv category: {category}")
-            
-            # Search arXiv
-            search = arxiv.Search(
-                query=f"cat:{category}",
-                max_results=config.get('max_results_per_category', 50),
-                sort_by=arxiv.SortCriterion.SubmittedDate
-            )
-            
-            for result in search.results():
-                # Check if already exists
-                existing = db.query(RawItem).filter(
-                    RawItem.url == result.entry_id
-                ).first()
-                
-                if existing:
-                    continue
-                
-                # Detect frontier lab from author affiliations
-                frontier_lab = None
-                authors_str = ' '.join([str(a) for a in result.authors]).lower()
-                for lab_name, patterns in ARXIV_LAB_PATTERNS.items():
-                    for pattern in patterns:
-                        if pattern in authors_str:
-                            frontier_lab = lab_name
-                            break
-                    if frontier_lab:
-                        break
-                
-                item = RawItem(
-                    source_id=source.id,
-                    title=result.title,
-                    url=result.entry_id,
-                    content=result.summary,
-                    published_at=result.published,
-                    frontier_lab=frontier_lab
-                )
-                db.add(item)
-                count += 1
-            
-            db.commit()
-            logger.info(f"Ingested {count} items from arXiv {category}")
-            
+            count += len(store_arxiv_result(db, source, cursors[category], result))
         except Exception as e:
             logger.error(f"Error ingesting arXiv category {category}: {e}")
             db.rollback()
@@ -235,7 +728,8 @@ def run(db) -> Dict:
     """Run scout agent"""
     logger.info("Starting Scout Agent")
     
-    rss_count = ingest_rss_feeds(db)
+    rss_result = ingest_rss_feeds(db)
+    rss_count = rss_result["count"]
     arxiv_count = ingest_arxiv(db)
     
     total = rss_count + arxiv_count
@@ -245,6 +739,8 @@ def run(db) -> Dict:
     return {
         "rss_count": rss_count,
         "arxiv_count": arxiv_count,
-        "total": total
+        "total": total,
+        "rss_not_modified": rss_result["not_modified"],
+        "rss_feeds": rss_result["feeds"]
     }
 
@@ -0,0 +1,96 @@
+"""
+Spam filter: weighted keyword rules compiled into a single matcher
+"""
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+from .keywords import KeywordMatcher
+
+logger = logging.getLogger(__name__)
+
+SPAM_RULES_PATH = os.path.join(os.path.dirname(__file__), '..', 'config', 'spam_rules.json')
+FIELDS = ('title', 'content')
+
+# Used when the rules file is missing or invalid
+DEFAULT_SPAM_CONFIG = {
+    "threshold": 1.0,
+    "short_content": {"min_length": 50, "weight": 1.0},
+    "rules": [
+        {"name": "default", "weight": 1.0,
+         "patterns": ['click here', 'free money', 'viagra', 'casino', 'lottery']}
+    ]
+}
+
+
+def load_spam_config(path: str = SPAM_RULES_PATH) -> Dict:
+    """Load spam rules configuration"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.error(f"Failed to load spam rules: {e}")
+        return DEFAULT_SPAM_CONFIG
+
+
+class SpamFilter:
+    """Scores items against weighted keyword rules
+
+    Every rule's patterns are compiled into one KeywordMatcher, so each
+    field is tokenized and scanned once however many rules are configured.
+    A rule adds its weight once when any of its patterns appears in one of
+    its fields (title and content by default); content shorter than
+    short_content.min_length adds that weight. An item is spam when its
+    score reaches the threshold.
+    """
+
+    def __init__(self, config: Dict):
+        self.threshold = float(config.get("threshold", 1.0))
+        short = config.get("short_content") or {}
+        self.min_length = int(short.get("min_length", 0))
+        self.short_weight = float(short.get("weight", 0.0))
+
+        self.weights: Dict[str, float] = {}
+        self.fields: Dict[str, Tuple[str, ...]] = {}
+        patterns: Dict[str, List[str]] = {}
+        for rule in config.get("rules", []):
+            if not rule.get("enabled", True):
+                continue
+            name = rule["name"]
+            self.weights[name] = float(rule.get("weight", 1.0))
+            self.fields[name] = tuple(rule.get("fields", FIELDS))
+            patterns.setdefault(name, []).extend(rule.get("patterns", []))
+
+        self.matcher = KeywordMatcher(patterns)
+
+    def fired_rules(self, title: Optional[str], content: Optional[str]) -> List[str]:
+        """Names of the rules that match, in configuration order"""
+        fired = set()
+        for field, text in (('title', title), ('content', content)):
+            for rule, _ in self.matcher.find(text):
+                if field in self.fields[rule]:
+                    fired.add(rule)
+        return [rule for rule in self.weights if rule in fired]
+
+    def score(self, title: Optional[str], content: Optional[str]) -> float:
+        """Total weight of the matching rules plus the short-content penalty"""
+        total = sum(self.weights[rule] for rule in self.fired_rules(title, content))
+        if content and len(content) < self.min_length:
+            total += self.short_weight
+        return total
+
+    def is_spam(self, title: Optional[str], content: Optional[str]) -> bool:
+        return self.score(title, content) >= self.threshold
+
+
+_spam_filter: Optional[SpamFilter] = None
+
+
+def get_spam_filter() -> SpamFilter:
+    """Process-wide filter compiled from config/spam_rules.json on first use"""
+    global _spam_filter
+    if _spam_filter is None:
+        _spam_filter = SpamFilter(load_spam_config())
+        logger.info(f"Compiled {_spam_filter.matcher.size} spam patterns from {len(_spam_filter.weights)} rules")
+    return _spam_filter
@@ -2,9 +2,10 @@
 Tagger Agent: Assign topics to clusters
 """
 import logging
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Tuple
 from sqlalchemy.orm import Session
 
+from .keywords import KeywordMatcher
 from .models import Cluster, Topic, ClinicalMaturityLevel
 
 logger = logging.getLogger(__name__)
@@ -35,29 +36,66 @@ FRONTIER_LAB_DEFAULT_TOPICS = {
 }
 
 
-def detect_clinical_maturity(cluster: Cluster) -> ClinicalMaturityLevel:
+# Keyword sets outside TOPIC_KEYWORDS, compiled into the same matcher under these labels
+RULE_KEYWORDS = {
+    "rule:policy": ["safety", "alignment", "policy", "governance", "regulation"],
+    "rule:regulatory": ["fda", "nih", "approval", "clearance", "regulatory", "ce mark", "ema"],
+    "rule:approved": ["approved", "cleared", "authorized"],
+    "rule:validated": ["clinical trial", "randomized", "validated", "peer-reviewed", "phase"],
+}
+
+
+def keyword_variants(keyword: str) -> Iterable[str]:
+    """The keyword and its plural (word-boundary matching of "robot" would otherwise miss "robots")"""
+    yield keyword
+    if not keyword.endswith('s'):
+        yield keyword + 's'
+
+
+def compile_keywords(keyword_sets: Dict[str, List[str]]) -> Tuple[KeywordMatcher, Dict[str, str]]:
+    """One matcher over every keyword set, plus the variant -> keyword map used for counting"""
+    canonical = {}
+    patterns = {}
+    for label, keywords in keyword_sets.items():
+        for keyword in keywords:
+            for variant in keyword_variants(keyword):
+                canonical.setdefault(variant, keyword)
+                patterns.setdefault(label, []).append(variant)
+    return KeywordMatcher(patterns), canonical
+
+
+KEYWORD_MATCHER, CANONICAL_KEYWORDS = compile_keywords({**TOPIC_KEYWORDS, **RULE_KEYWORDS})
+
+
+def keyword_counts(cluster: Cluster) -> Dict[str, int]:
+    """Distinct keywords hit per topic slug / rule label, from one pass over the cluster text"""
+    found: Dict[str, set] = {}
+    for label, pattern in KEYWORD_MATCHER.find(f"{cluster.title} {cluster.summary or ''}"):
+        found.setdefault(label, set()).add(CANONICAL_KEYWORDS[pattern])
+    return {label: len(keywords) for label, keywords in found.items()}
+
+
+def detect_clinical_maturity(cluster: Cluster, counts: Optional[Dict[str, int]] = None) -> ClinicalMaturityLevel:
     """Detect clinical maturity level from cluster content"""
-    cluster_text = f"{cluster.title} {cluster.summary or ''}".lower()
+    counts = counts if counts is not None else keyword_counts(cluster)
     
     # Check for regulatory relevance
-    regulatory_keywords = ["fda", "nih", "approval", "clearance", "regulatory", "ce mark", "ema"]
-    if any(kw in cluster_text for kw in regulatory_keywords):
-        if any(kw in cluster_text for kw in ["approved", "cleared", "authorized"]):
+    if counts.get("rule:regulatory"):
+        if counts.get("rule:approved"):
             return ClinicalMaturityLevel.APPROVED_DEPLOYED
         return ClinicalMaturityLevel.REGULATORY_RELEVANT
     
     # Check for clinical validation
-    validation_keywords = ["clinical trial", "randomized", "validated", "peer-reviewed", "phase"]
-    if any(kw in cluster_text for kw in validation_keywords):
+    if counts.get("rule:validated"):
         return ClinicalMaturityLevel.CLINICALLY_VALIDATED
     
     # Default to exploratory
     return ClinicalMaturityLevel.EXPLORATORY
 
 
-def assign_topics(cluster: Cluster, topics: List[Topic]) -> List[Topic]:
+def assign_topics(cluster: Cluster, topics: List[Topic], counts: Optional[Dict[str, int]] = None) -> List[Topic]:
     """Assign topics to a cluster based on content and frontier lab status"""
-    cluster_text = f"{cluster.title} {cluster.summary or ''}".lower()
+    counts = counts if counts is not None else keyword_counts(cluster)
     topic_dict = {t.slug: t for t in topics}
     assigned = []
     
@@ -76,8 +114,7 @@ def assign_topics(cluster: Cluster, topics: List[Topic]) -> List[Topic]:
     
     # Special handling for Anthropic policy/safety content
     if "Anthropic" in frontier_labs:
-        policy_keywords = ["safety", "alignment", "policy", "governance", "regulation"]
-        if any(kw in cluster_text for kw in policy_keywords):
+        if counts.get("rule:policy"):
             if "ai-policy-governance" in topic_dict and topic_dict["ai-policy-governance"] not in assigned:
                 assigned.append(topic_dict["ai-policy-governance"])
             if "human-centered-ai" in topic_dict and topic_dict["human-centered-ai"] not in assigned:
@@ -86,9 +123,7 @@ def assign_topics(cluster: Cluster, topics: List[Topic]) -> List[Topic]:
     # Medicine tagging (high priority, lower threshold)
     medicine_topic = topic_dict.get("medicine-healthcare-ai")
     if medicine_topic:
-        medicine_keywords = TOPIC_KEYWORDS.get("medicine-healthcare-ai", [])
-        medicine_match_count = sum(1 for keyword in medicine_keywords if keyword in cluster_text)
-        if medicine_match_count >= 1:  # Lower threshold for medicine
+        if counts.get("medicine-healthcare-ai", 0) >= 1:  # Lower threshold for medicine
             if medicine_topic not in assigned:
                 assigned.append(medicine_topic)
     
@@ -101,10 +136,7 @@ def assign_topics(cluster: Cluster, topics: List[Topic]) -> List[Topic]:
         if topic_slug == "medicine-healthcare-ai":  # Already handled
             continue
             
-        keywords = TOPIC_KEYWORDS.get(topic_slug, [])
-        match_count = sum(1 for keyword in keywords if keyword in cluster_text)
-        
-        if match_count >= 2:  # At least 2 keyword matches
+        if counts.get(topic_slug, 0) >= 2:  # At least 2 keyword matches
             assigned.append(topic)
     
     # If no topics assigned, assign to general-ai
@@ -116,8 +148,8 @@ def assign_topics(cluster: Cluster, topics: List[Topic]) -> List[Topic]:
     return assigned
 
 
-def run(db: Session) -> Dict:
-    """Run tagger agent"""
+def run(db: Session, cluster_ids: Optional[List[int]] = None) -> Dict:
+    """Run tagger agent (optionally scoped to specific cluster IDs)"""
     logger.info("Starting Tagger Agent")
     
     # Get all topics
@@ -125,20 +157,24 @@ def run(db: Session) -> Dict:
     topic_dict = {t.slug: t for t in topics}
     
     # Get untagged clusters
-    clusters = db.query(Cluster).filter(
+    query = db.query(Cluster).filter(
         ~Cluster.topics.any()
-    ).limit(100).all()
+    )
+    if cluster_ids is not None:
+        query = query.filter(Cluster.id.in_(cluster_ids))
+    clusters = query.limit(100).all()
     
     tagged = 0
     
     for cluster in clusters:
-        assigned_topics = assign_topics(cluster, topics)
+        counts = keyword_counts(cluster)
+        assigned_topics = assign_topics(cluster, topics, counts)
         cluster.topics = assigned_topics
         
         # Detect and set clinical maturity level if medicine-related
         has_medicine = any(t.slug == "medicine-healthcare-ai" for t in assigned_topics)
         if has_medicine and not cluster.clinical_maturity_level:
-            cluster.clinical_maturity_level = detect_clinical_maturity(cluster)
+            cluster.clinical_maturity_level = detect_clinical_maturity(cluster, counts)
         
         tagged += 1
     
@@ -0,0 +1,63 @@
+"""
+TF-IDF cosine similarity: sparse vectorization and thresholded neighbour graphs
+"""
+from typing import List
+
+import numpy as np
+from scipy.sparse import csr_matrix, vstack
+from scipy.sparse.csgraph import connected_components
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Rows per sparse product, bounding the memory of each similarity slice
+BLOCK_SIZE = 2000
+
+
+def vectorize(texts: List[str]) -> csr_matrix:
+    """L2-normalized TF-IDF rows (word unigrams + bigrams, English stop words removed)"""
+    vectorizer = TfidfVectorizer(
+        lowercase=True,
+        stop_words='english',
+        ngram_range=(1, 2),
+        sublinear_tf=True,
+        dtype=np.float32
+    )
+    try:
+        return vectorizer.fit_transform(texts).tocsr()
+    except ValueError:
+        # Every text was empty or stop words only
+        return csr_matrix((len(texts), 1), dtype=np.float32)
+
+
+def similarity_graph(vectors: csr_matrix, threshold: float, block_size: int = BLOCK_SIZE) -> csr_matrix:
+    """Sparse adjacency of row pairs whose cosine similarity is at least threshold
+
+    Computed block by block as X[block] @ X.T, keeping only entries above the
+    threshold, so memory follows the number of similar pairs rather than n^2.
+    """
+    n = vectors.shape[0]
+    transposed = vectors.T.tocsc()
+    blocks = []
+    for start in range(0, n, block_size):
+        block = (vectors[start:start + block_size] @ transposed).tocsr()
+        block.data[block.data < threshold] = 0
+        block.eliminate_zeros()
+        blocks.append(block)
+    if not blocks:
+        return csr_matrix((0, 0), dtype=np.float32)
+    return vstack(blocks).tocsr()
+
+
+def connected_groups(graph: csr_matrix) -> List[List[int]]:
+    """Connected components as lists of row indexes, ordered by their first member"""
+    count, labels = connected_components(graph, directed=False)
+    groups: List[List[int]] = [[] for _ in range(count)]
+    for index, label in enumerate(labels):
+        groups[label].append(index)
+    return sorted((group for group in groups if group), key=lambda group: group[0])
+
+
+def tfidf_groups(texts: List[str], threshold: float) -> List[List[int]]:
+    """Group texts whose TF-IDF cosine similarity links them (transitively) at the threshold"""
+    if not texts:
+        return []
+    return connected_groups(similarity_graph(vectorize(texts), threshold))
@@ -0,0 +1,211 @@
+"""
+URL canonicalization: tracking-parameter stripping, AMP unwrapping and redirect resolution
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import unquote, unquote_plus, urlparse, urlunparse
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = 'Mozilla/5.0 (compatible; AIBriefingScout/1.0)'
+RESOLVE_TIMEOUT = 10
+MAX_CACHED_REDIRECTS = 10000
+
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_hsenc', '_hsmi', 'mkt_tok', 'ref_src', 'ref_url', 'cmpid', 'ncid',
+    'smid', 'sr_share', 'guccounter', 'guce_referrer', 'guce_referrer_sig',
+    'amp'  # ?amp / ?amp=1 AMP variants
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'hsa_')
+
+# Link shorteners and feed proxies whose URLs only redirect to the article
+REDIRECT_HOSTS = {
+    'feedproxy.google.com', 'feeds.feedburner.com', 'feedburner.google.com',
+    't.co', 'bit.ly', 'buff.ly', 'ow.ly', 'dlvr.it', 'lnkd.in', 'trib.al', 'tinyurl.com', 'rebrand.ly'
+}
+
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+
+def _is_tracking_param(param: str) -> bool:
+    name = unquote_plus(param.split('=', 1)[0]).lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def _is_google(host: str) -> bool:
+    return host == 'google.com' or host.endswith('.google.com')
+
+
+def _unwrap_amp(host: str, path: str):
+    """Map AMP cache / viewer URLs to the article's own host and path
+
+    Only the AMP cache and Google's AMP viewer wrap another site's URL in
+    their path; on any other host 'amp' path segments are the site's own.
+    """
+    # https://example-com.cdn.ampproject.org/c/s/example.com/story -> example.com/story
+    # https://www.google.com/amp/s/example.com/story -> example.com/story
+    if host.endswith('.cdn.ampproject.org') or (_is_google(host) and path.startswith('/amp/')):
+        # Drop the '', 'c'/'amp', optional 'v'/'i' and 's' (https) prefix segments
+        rest = path.split('/')[2:]
+        while rest and rest[0] in ('v', 'i', 's'):
+            rest = rest[1:]
+        if rest:
+            host, path = rest[0].lower(), '/' + '/'.join(rest[1:])
+
+    # amp.example.com -> example.com, but amp.dev is a site of its own
+    if host.startswith('amp.') and host.count('.') >= 2:
+        host = host[len('amp.'):]
+    return host, path
+
+
+def clean_url(url: Optional[str]) -> str:
+    """Tidy a URL without changing what it points to
+
+    Lowercases scheme and host and drops the fragment, default ports and
+    tracking parameters. The result is still the URL to fetch.
+    """
+    url = (url or '').strip()
+    if not url:
+        return ''
+
+    try:
+        parsed = urlparse(url)
+        scheme = parsed.scheme.lower()
+        host = (parsed.hostname or '').lower()
+        port = parsed.port
+    except ValueError:
+        return url
+    if not scheme or not host:
+        return url
+
+    netloc = host
+    if port is not None and str(port) != DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{port}"
+
+    # Filter the raw parameters so the ones we keep stay encoded exactly as given
+    query = '&'.join(p for p in parsed.query.split('&') if p and not _is_tracking_param(p))
+    return urlunparse((scheme, netloc, parsed.path, parsed.params, query, ''))
+
+
+def canonicalize_url(url: Optional[str]) -> str:
+    """Dedup key for a URL: clean_url plus folding of trivially equivalent forms
+
+    AMP cache / viewer URLs are unwrapped, and http/https, 'www.' and a
+    trailing slash are ignored, and query parameters are sorted, so every
+    spelling of an article maps to one key. Not meant to be fetched.
+    """
+    cleaned = clean_url(url)
+    parsed = urlparse(cleaned)
+    if not parsed.scheme or not parsed.netloc:
+        return cleaned
+
+    host, path = _unwrap_amp(parsed.hostname or '', parsed.path)
+    if host.startswith('www.'):
+        host = host[len('www.'):]
+    if parsed.port is not None:
+        host = f"{host}:{parsed.port}"
+    path = unquote(path).rstrip('/') or '/'
+    query = '&'.join(sorted(parsed.query.split('&'))) if parsed.query else ''
+    scheme = 'https' if parsed.scheme in ('http', 'https') else parsed.scheme
+    return urlunparse((scheme, host, path, parsed.params, query, ''))
+
+
+def is_redirect_url(url: Optional[str]) -> bool:
+    """Whether a URL is a shortener / feed-proxy link that only redirects"""
+    host = (urlparse(url or '').hostname or '').lower()
+    return host in REDIRECT_HOSTS
+
+
+class RedirectResolver:
+    """Follows shortener / feed-proxy redirects, caching the final URL
+
+    The cache is a bounded LRU shared across threads, so a link that shows
+    up in every poll of a feed is only resolved once per process. Failed
+    lookups are not cached and fall back to the original URL.
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHED_REDIRECTS, timeout: float = RESOLVE_TIMEOUT,
+                 session: Optional[requests.Session] = None):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.session.headers['User-Agent'] = USER_AGENT
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def cached(self, url: str) -> Optional[str]:
+        with self._lock:
+            if url in self._cache:
+                self._cache.move_to_end(url)
+                return self._cache[url]
+        return None
+
+    def resolve(self, url: str, deadline: Optional[float] = None) -> str:
+        """Final URL after redirects (the URL itself if it isn't a redirect link)
+
+        With a deadline (a time.monotonic() value), requests are cut to the
+        time left and none are sent once it has passed; the URL is then
+        returned unresolved unless it is cached.
+        """
+        if not is_redirect_url(url):
+            return url
+
+        resolved = self.cached(url)
+        if resolved is not None:
+            return resolved
+
+        timeout = self.timeout
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                return url
+
+        try:
+            response = self.session.head(url, allow_redirects=True, timeout=timeout)
+            if response.status_code >= 400:
+                # Some shorteners reject HEAD; a streamed GET follows redirects without the body
+                response = self.session.get(url, allow_redirects=True, timeout=timeout, stream=True)
+                response.close()
+            resolved = response.url or url
+        except Exception as e:
+            logger.warning(f"Failed to resolve redirect {url}: {e}")
+            return url
+
+        with self._lock:
+            self._cache[url] = resolved
+            self._cache.move_to_end(url)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return resolved
+
+
+_resolver: Optional[RedirectResolver] = None
+_resolver_lock = threading.Lock()
+
+
+def get_redirect_resolver() -> RedirectResolver:
+    """Process-wide resolver, so the redirect cache survives across polls"""
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = RedirectResolver()
+        return _resolver
+
+
+def resolve_entry_url(entry, resolver: Optional[RedirectResolver] = None,
+                      deadline: Optional[float] = None) -> str:
+    """Article URL for a feed entry: original link if the feed gives one, redirects followed, cleaned
+
+    Only shortener / feed-proxy links are looked up, within the deadline if
+    one is given (see RedirectResolver.resolve).
+    """
+    link = entry.get('feedburner_origlink') or entry.get('link', '')
+    if is_redirect_url(link):
+        link = (resolver or get_redirect_resolver()).resolve(link, deadline)
+    return clean_url(link)
@@ -2,7 +2,7 @@
 Writer Agent: Generate summaries and citations
 """
 import logging
-from typing import Dict
+from typing import Dict, List, Optional
 from sqlalchemy.orm import Session
 
 from .models import Cluster, Citation, RawItem
@@ -108,14 +108,17 @@ def create_citations(cluster: Cluster) -> None:
         cluster.citations.append(citation)
 
 
-def run(db: Session) -> Dict:
-    """Run writer agent"""
+def run(db: Session, cluster_ids: Optional[List[int]] = None) -> Dict:
+    """Run writer agent (optionally scoped to specific cluster IDs)"""
     logger.info("Starting Writer Agent")
     
-    # Get clusters without summaries
-    clusters = db.query(Cluster).filter(
-        (Cluster.summary.is_(None)) | (Cluster.summary == '')
-    ).limit(100).all()
+    # Get clusters without summaries, or whose items changed since they were written
+    query = db.query(Cluster).filter(
+        (Cluster.summary.is_(None)) | (Cluster.summary == '') | Cluster.needs_rewrite
+    )
+    if cluster_ids is not None:
+        query = query.filter(Cluster.id.in_(cluster_ids))
+    clusters = query.limit(100).all()
     
     written = 0
     
@@ -125,6 +128,7 @@ def run(db: Session) -> Dict:
         cluster.what_to_watch_next = generate_what_to_watch_next(cluster)
         
         create_citations(cluster)
+        cluster.needs_rewrite = False
         
         written += 1
     
@@ -0,0 +1,125 @@
+"""
+Benchmark: story grouping, exhaustive SequenceMatcher pairs vs the clustering engines
+
+Builds a synthetic corpus of articles where some stories are re-reported
+several times with small edits, then groups it with the previous all-pairs
+loop and with each clustering engine (lexical = union-find over MinHash LSH
+candidates checked with SequenceMatcher, tfidf = sparse cosine graph).
+Reports runtime, full SequenceMatcher ratios computed, and precision/recall
+of each grouping's same-story pairs against the generated ground truth.
+The exhaustive run is skipped above --max-exhaustive items.
+
+Usage (from the worker directory):
+    python benchmarks/bench_cluster.py [--sizes 1000 5000 20000] [--max-exhaustive 500] [--engines lexical tfidf]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from itertools import combinations
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from agents import cluster
+from agents.cluster import find_similar_items, group_items, ENGINES, SIMILARITY_THRESHOLD
+
+
+def make_vocabulary(rng, size=5000):
+    """Pseudo-words with a realistic spread of shared character n-grams"""
+    letters = "etaoinshrdlcumwfgypbvkjxqz"
+    weights = [26 - i for i in range(len(letters))]
+    return ["".join(rng.choices(letters, weights, k=rng.randint(3, 10))) for _ in range(size)]
+
+
+def make_corpus(n: int, duplicate_share: float = 0.3, seed: int = 7):
+    """n items; about duplicate_share of them are edited re-reports of an earlier story"""
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng)
+    items = []
+    stories = []
+    for i in range(n):
+        if stories and rng.random() < duplicate_share:
+            story = rng.randrange(len(stories))
+            title, words = stories[story]
+            words = [rng.choice(vocabulary) if rng.random() < 0.1 else w for w in words]
+        else:
+            story = len(stories)
+            title = " ".join(rng.choice(vocabulary) for _ in range(8)).capitalize()
+            words = [rng.choice(vocabulary) for _ in range(90)]
+            stories.append((title, words))
+        items.append(SimpleNamespace(id=i, title=title, content=" ".join(words), story=story))
+    return items
+
+
+def legacy_groups(items, threshold=SIMILARITY_THRESHOLD):
+    """Previous Clustering agent loop: every item against every other"""
+    groups = []
+    processed = set()
+    for item in items:
+        if item.id in processed:
+            continue
+        group = [item] + [other for other in find_similar_items(item, items, threshold) if other.id not in processed]
+        processed.update(member.id for member in group)
+        groups.append(group)
+    return groups
+
+
+def same_group_pairs(groups):
+    return {pair for group in groups for pair in combinations(sorted(item.id for item in group), 2)}
+
+
+def true_groups(items):
+    stories = {}
+    for item in items:
+        stories.setdefault(item.story, []).append(item)
+    return list(stories.values())
+
+
+def count_checks(fn, *args):
+    """Run fn, counting full SequenceMatcher.ratio() computations"""
+    calls = 0
+    original = cluster.SequenceMatcher
+
+    class CountedMatcher(original):
+        def ratio(self):
+            nonlocal calls
+            calls += 1
+            return super().ratio()
+
+    cluster.SequenceMatcher = CountedMatcher
+    try:
+        started = time.perf_counter()
+        result = fn(*args)
+        return result, time.perf_counter() - started, calls
+    finally:
+        cluster.SequenceMatcher = original
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 20000])
+    parser.add_argument('--max-exhaustive', type=int, default=500)
+    parser.add_argument('--engines', nargs='+', default=list(ENGINES), choices=list(ENGINES))
+    args = parser.parse_args()
+
+    print(f"{'items':>7}  {'path':>10}  {'seconds':>8}  {'checks':>10}  {'groups':>7}  {'precision':>9}  {'recall':>7}")
+    for size in args.sizes:
+        items = make_corpus(size)
+        truth = same_group_pairs(true_groups(items))
+
+        paths = [(engine, lambda items, engine=engine: group_items(items, engine)) for engine in args.engines]
+        if size <= args.max_exhaustive:
+            paths.insert(0, ('all-pairs', legacy_groups))
+
+        for name, grouping in paths:
+            groups, elapsed, checks = count_checks(grouping, items)
+            found = same_group_pairs(groups)
+            precision = len(found & truth) / len(found) if found else 1.0
+            recall = len(found & truth) / len(truth) if truth else 1.0
+            print(f"{size:>7}  {name:>10}  {elapsed:>8.2f}  {checks:>10,}  {len(groups):>7,}  {precision:>9.1%}  {recall:>7.1%}")
+
+
+if __name__ == '__main__':
+    main()
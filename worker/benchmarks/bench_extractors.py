@@ -0,0 +1,68 @@
+"""
+Benchmark: main-text extraction backends (throughput and parity with bs4)
+
+Runs every available extractor over a directory of saved HTML pages and
+reports pages/sec, MB/sec and how many pages produce exactly the same text
+as the reference BeautifulSoup extractor. Point --fixtures at a directory
+of real saved pages for representative numbers.
+
+Usage (from the worker directory):
+    python benchmarks/bench_extractors.py [--fixtures DIR] [--repeat 20] [--limit 10000]
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.extractors import EXTRACTORS
+
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'html')
+
+
+def load_pages(directory):
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(directory, '*.htm*'))):
+        with open(path, 'rb') as f:
+            pages[os.path.basename(path)] = f.read()
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=10000, help="text cap, as in the Cleaner")
+    args = parser.parse_args()
+
+    pages = load_pages(args.fixtures)
+    if not pages:
+        parser.error(f"no .html files in {args.fixtures}")
+    total_bytes = sum(len(content) for content in pages.values())
+
+    reference = {name: EXTRACTORS['bs4'](content, args.limit) for name, content in pages.items()}
+
+    print(f"{len(pages)} pages, {total_bytes / 1024:,.0f} KB, x{args.repeat}")
+    print(f"{'backend':>8}  {'pages/sec':>10}  {'MB/sec':>8}  {'parity':>8}")
+    for backend, extract in EXTRACTORS.items():
+        mismatched = [name for name, content in pages.items()
+                      if extract(content, args.limit) != reference[name]]
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            for content in pages.values():
+                extract(content, args.limit)
+        elapsed = time.perf_counter() - started
+
+        rate = len(pages) * args.repeat / elapsed
+        mb_rate = total_bytes * args.repeat / elapsed / (1024 * 1024)
+        parity = f"{len(pages) - len(mismatched)}/{len(pages)}"
+        print(f"{backend:>8}  {rate:>10,.0f}  {mb_rate:>8.1f}  {parity:>8}")
+        for name in mismatched:
+            print(f"{'':>10}differs: {name}")
+
+
+if __name__ == '__main__':
+    main()
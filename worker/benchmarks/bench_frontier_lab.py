@@ -0,0 +1,121 @@
+"""
+Microbenchmark: frontier-lab detection per item (legacy loops vs current detectors)
+
+Also reports how per-text cost scales with the number of patterns for the
+compiled KeywordMatcher the Tagger uses: the legacy loops grow linearly
+with the vocabulary, the compiled matcher stays roughly flat. The lab
+vocabulary is small enough that gated loops beat it.
+
+Usage (from the worker directory):
+    python benchmarks/bench_frontier_lab.py [--items 20000]
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.keywords import KeywordMatcher
+from agents.scout import (
+    FRONTIER_LABS,
+    ARXIV_LAB_PATTERNS,
+    detect_frontier_lab_from_url,
+    detect_frontier_lab_from_authors,
+)
+
+HOSTS = [
+    "www.anthropic.com", "openai.com", "ai.googleblog.com", "www.technologyreview.com",
+    "venturebeat.com", "www.theverge.com", "www.nature.com", "www.statnews.com",
+]
+NAMES = ["Alice Smith", "Bob Fairchild", "Carol Nguyen", "Dan Okafor", "Eve Zhang", "Frank Miller"]
+AFFILIATIONS = ["", "", "", " (Google Research)", " (FAIR)", " (OpenAI)"]
+
+
+def legacy_from_url(url: str):
+    """Pre-compiled-matcher implementation: substring scan over FRONTIER_LABS"""
+    domain = urlparse(url).netloc.lower()
+    for lab_domain, lab_name in FRONTIER_LABS.items():
+        if lab_domain in domain:
+            return lab_name
+    return None
+
+
+def legacy_from_authors(authors):
+    """Pre-compiled-matcher implementation: nested loop over ARXIV_LAB_PATTERNS"""
+    authors_str = ' '.join([str(a) for a in authors]).lower()
+    for lab_name, patterns in ARXIV_LAB_PATTERNS.items():
+        for pattern in patterns:
+            if pattern.lower() in authors_str:
+                return lab_name
+    return None
+
+
+def make_corpus(n: int, seed: int = 0):
+    """Synthetic URLs and author lists"""
+    rng = random.Random(seed)
+    urls = [f"https://{rng.choice(HOSTS)}/posts/{i}" for i in range(n)]
+    authors = [
+        [rng.choice(NAMES) + rng.choice(AFFILIATIONS) for _ in range(rng.randint(1, 8))]
+        for _ in range(n)
+    ]
+    return urls, authors
+
+
+def per_item_us(func, items) -> float:
+    """Best-of-5 mean cost per item in microseconds"""
+    runs = timeit.repeat(lambda: [func(item) for item in items], number=1, repeat=5)
+    return min(runs) / len(items) * 1e6
+
+
+def scaling(sizes=(15, 150, 1500, 15000), seed: int = 0):
+    """Per-text cost vs number of patterns for a ~100-word author/affiliation string"""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    text = ' '.join(rng.choice(NAMES) + rng.choice(AFFILIATIONS) for _ in range(40))
+
+    print(f"\n{'patterns':<12}{'legacy us/text':>16}{'compiled us/text':>18}")
+    for size in sizes:
+        patterns = [
+            ' '.join(''.join(rng.choice(letters) for _ in range(rng.randint(4, 9)))
+                     for _ in range(rng.randint(1, 3)))
+            for _ in range(size)
+        ]
+        matcher = KeywordMatcher({"label": patterns})
+        matcher.counts(text)  # compile outside the timed region
+
+        def legacy(t=text):
+            lowered = t.lower()
+            return sum(1 for pattern in patterns if pattern in lowered)
+
+        legacy_us = min(timeit.repeat(legacy, number=20, repeat=3)) / 20 * 1e6
+        compiled_us = min(timeit.repeat(lambda: matcher.counts(text), number=20, repeat=3)) / 20 * 1e6
+        print(f"{size:<12}{legacy_us:>16.1f}{compiled_us:>18.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--items', type=int, default=20000)
+    args = parser.parse_args()
+
+    urls, authors = make_corpus(args.items)
+
+    print(f"{'matcher':<28}{'legacy us/item':>16}{'current us/item':>18}")
+    print(f"{'url -> lab':<28}{per_item_us(legacy_from_url, urls):>16.2f}"
+          f"{per_item_us(detect_frontier_lab_from_url, urls):>18.2f}")
+    print(f"{'arXiv authors -> lab':<28}{per_item_us(legacy_from_authors, authors):>16.2f}"
+          f"{per_item_us(detect_frontier_lab_from_authors, authors):>18.2f}")
+
+    false_positives = sum(
+        1 for a in authors
+        if legacy_from_authors(a) == "Meta AI" and detect_frontier_lab_from_authors(a) != "Meta AI"
+    )
+    print(f"\nlegacy 'fair' false positives removed: {false_positives} / {len(authors)}")
+
+    scaling()
+
+
+if __name__ == '__main__':
+    main()
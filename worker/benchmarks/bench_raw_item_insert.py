@@ -0,0 +1,100 @@
+"""
+Benchmark: RawItem write throughput (ORM add() per row vs bulk executemany vs COPY)
+
+Writes synthetic rows into raw_items and reports rows/sec for each path at
+several batch sizes. Rows created by the benchmark are deleted afterwards.
+COPY is only measured on PostgreSQL.
+
+Usage (from the worker directory):
+    python benchmarks/bench_raw_item_insert.py [--database-url URL] [--sizes 1000 10000 100000]
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from agents.models import Base, RawItem, Source, SourceType
+from agents.scout import upsert_raw_items, copy_raw_items
+
+
+def make_rows(source_id: int, n: int, run_id: str):
+    """Synthetic feed-entry rows with unique URLs"""
+    now = datetime.utcnow()
+    return [
+        {
+            "source_id": source_id,
+            "title": f"Synthetic item {i}",
+            "url": f"https://bench.example.com/{run_id}/{i}",
+            "content": "Lorem ipsum dolor sit amet. " * 20,
+            "published_at": now - timedelta(minutes=i),
+            "frontier_lab": None
+        }
+        for i in range(n)
+    ]
+
+
+def legacy_orm(db, rows):
+    """Previous Scout path: one ORM object (and INSERT) per row"""
+    for row in rows:
+        db.add(RawItem(**row))
+    db.commit()
+
+
+def bulk_executemany(db, rows):
+    # Stay below COPY_THRESHOLD so this measures the VALUES path at every size
+    for start in range(0, len(rows), 5000):
+        upsert_raw_items(db, rows[start:start + 5000])
+    db.commit()
+
+
+def bulk_copy(db, rows):
+    copy_raw_items(db, rows)
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--database-url', default=os.getenv("DATABASE_URL", "sqlite://"))
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    if engine.dialect.name == 'sqlite':
+        Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    source = Source(name="Benchmark", url=f"https://bench.example.com/{uuid.uuid4()}", source_type=SourceType.RSS)
+    db.add(source)
+    db.commit()
+
+    paths = [("orm add() per row", legacy_orm), ("insert executemany", bulk_executemany)]
+    if engine.dialect.name == 'postgresql':
+        paths.append(("COPY + INSERT SELECT", bulk_copy))
+
+    print(f"{'rows':>8}  " + "".join(f"{name:>24}" for name, _ in paths) + "   (rows/sec)")
+    try:
+        for size in args.sizes:
+            rates = []
+            for _, write in paths:
+                rows = make_rows(source.id, size, uuid.uuid4().hex)
+                started = time.perf_counter()
+                write(db, rows)
+                rates.append(size / (time.perf_counter() - started))
+                db.query(RawItem).filter(RawItem.source_id == source.id).delete()
+                db.commit()
+            print(f"{size:>8}  " + "".join(f"{rate:>24,.0f}" for rate in rates))
+    finally:
+        db.delete(source)
+        db.commit()
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
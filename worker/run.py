@@ -3,8 +3,14 @@ Worker CLI entry point
 """
 import argparse
 import logging
+import signal
 import sys
 import os
+import threading
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
 
 # Add api to path for models
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'api'))
@@ -23,13 +29,33 @@ logger = logging.getLogger(__name__)
 
 # Import agents
 from agents.scout import run as scout_run
-from agents.cleaner import run as cleaner_run
+from agents.cleaner import run as cleaner_run, RETRY_BASE_SECONDS as CLEANER_RETRY_SECONDS
 from agents.cluster import run as cluster_run
 from agents.tagger import run as tagger_run
 from agents.editor import run as editor_run
 from agents.writer import run as writer_run
 from agents.people import run as people_run
-from agents.briefing import run as briefing_run
+from agents.briefing import run as briefing_run, latest_briefing_date
+from agents.maintenance import run as maintenance_run, MAINTENANCE_INTERVAL
+from agents.scout import (
+    load_rss_config,
+    load_arxiv_config,
+    ingest_feed,
+    ingest_arxiv_category,
+    make_arxiv_limiter,
+    ARXIV_SOURCE_URL,
+)
+from scheduler import PollSchedule, AdaptivePolicy, load_publish_counts
+
+# Streaming (watch) mode configuration
+WATCH_RSS_INTERVAL = int(os.getenv("WATCH_RSS_INTERVAL", "900"))
+WATCH_ARXIV_INTERVAL = int(os.getenv("WATCH_ARXIV_INTERVAL", "1800"))
+WATCH_BRIEFING_HOUR = int(os.getenv("WATCH_BRIEFING_HOUR", "6"))  # UTC
+WATCH_MIN_INTERVAL = int(os.getenv("WATCH_MIN_INTERVAL", "120"))
+WATCH_MAX_INTERVAL = int(os.getenv("WATCH_MAX_INTERVAL", "21600"))
+WATCH_LEARN_WINDOW = timedelta(days=int(os.getenv("WATCH_LEARN_WINDOW_DAYS", "14")))
+WATCH_RELEARN_SECONDS = 3600
+WATCH_BATCH_SIZE = 100  # Matches the per-run limits of the downstream agents
 
 
 def run_once():
@@ -94,14 +120,191 @@ def run_once():
         db.close()
 
 
+def run_maintenance(db) -> Dict:
+    """Merge converged clusters, retire stale ones and re-tag, re-score and re-write the survivors"""
+    result = maintenance_run(db)
+    survivors = result["merged_cluster_ids"]
+    if survivors:
+        tagger_run(db, cluster_ids=survivors)
+        editor_run(db, cluster_ids=survivors)
+        writer_run(db, cluster_ids=survivors)
+    return result
+
+
+def maintain():
+    """Run cluster maintenance once"""
+    db = next(get_db())
+    try:
+        logger.info(f"Cluster maintenance result: {run_maintenance(db)}")
+        return 0
+    except Exception as e:
+        logger.error(f"Cluster maintenance failed: {e}", exc_info=True)
+        return 1
+    finally:
+        db.close()
+
+
+def process_new_items(db, item_ids: List[int]) -> Dict:
+    """Push newly ingested items through clean -> cluster -> tag -> score -> write"""
+    clusters = 0
+    updated = 0
+    
+    for start in range(0, len(item_ids), WATCH_BATCH_SIZE):
+        batch = item_ids[start:start + WATCH_BATCH_SIZE]
+        cleaner_run(db, item_ids=batch)
+        # New clusters plus existing ones that gained items (already invalidated)
+        cluster_result = cluster_run(db, item_ids=batch)
+        cluster_ids = cluster_result["cluster_ids"]
+        tagger_run(db, cluster_ids=cluster_ids)
+        editor_run(db, cluster_ids=cluster_ids)
+        writer_run(db, cluster_ids=cluster_ids)
+        clusters += cluster_result["clusters_created"]
+        updated += cluster_result["clusters_updated"]
+    
+    return {
+        "items": len(item_ids),
+        "clusters": clusters,
+        "updated": updated
+    }
+
+
+def run_watch():
+    """Long-running mode: poll each source on its own interval and process new items incrementally"""
+    logger.info("=" * 60)
+    logger.info("Starting AI Briefing Platform Worker (watch mode)")
+    logger.info("=" * 60)
+    
+    feeds = {feed_config['url']: feed_config for feed_config in load_rss_config()}
+    arxiv_config = load_arxiv_config()
+    arxiv_limiter = make_arxiv_limiter(arxiv_config)
+    
+    # key -> (source URL, share of that source's items, default interval);
+    # arXiv categories share one Source, so each gets an equal share of its rate
+    categories = arxiv_config.get('categories', [])
+    adaptive_sources = {}
+    fixed_intervals = {}
+    for url, feed_config in feeds.items():
+        if 'poll_interval_seconds' in feed_config:
+            fixed_intervals[f"rss:{url}"] = feed_config['poll_interval_seconds']
+        else:
+            adaptive_sources[f"rss:{url}"] = (url, 1.0, WATCH_RSS_INTERVAL)
+    for category in categories:
+        if 'poll_interval_seconds' in arxiv_config:
+            fixed_intervals[f"arxiv:{category}"] = arxiv_config['poll_interval_seconds']
+        else:
+            adaptive_sources[f"arxiv:{category}"] = (ARXIV_SOURCE_URL, 1.0 / len(categories), WATCH_ARXIV_INTERVAL)
+    
+    if not adaptive_sources and not fixed_intervals:
+        logger.error("No sources configured, nothing to watch")
+        return 1
+    
+    # Periodic sweep for items whose Cleaner retry backoff has elapsed
+    fixed_intervals["cleaner:retry"] = CLEANER_RETRY_SECONDS
+    # Periodic merge/retire pass keeping the active cluster set bounded
+    fixed_intervals["clusters:maintain"] = MAINTENANCE_INTERVAL
+    
+    policy = AdaptivePolicy(WATCH_MIN_INTERVAL, WATCH_MAX_INTERVAL)
+    
+    def learn_intervals():
+        db = next(get_db())
+        try:
+            counts = load_publish_counts(db, WATCH_LEARN_WINDOW)
+        finally:
+            db.close()
+        for key, (url, share, default) in adaptive_sources.items():
+            policy.learn(key, counts.get(url, 0) * share, WATCH_LEARN_WINDOW.total_seconds(), default)
+    
+    learn_intervals()
+    last_learned = time.monotonic()
+    
+    # Stagger first polls so sources don't all fire at startup
+    schedule = PollSchedule()
+    for key, interval in fixed_intervals.items():
+        schedule.add(key, interval, delay=random.uniform(0, min(60, interval)))
+    for key in adaptive_sources:
+        schedule.add(key, policy.base[key], delay=random.uniform(0, min(60, policy.base[key])))
+    
+    stop = threading.Event()
+    
+    def handle_signal(signum, frame):
+        logger.info(f"Received signal {signum}, shutting down after the current poll")
+        stop.set()
+    
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+    
+    # Taken from the stored briefings so a restart doesn't brief twice in one day
+    db = next(get_db())
+    try:
+        last_briefing_date = latest_briefing_date(db)
+    finally:
+        db.close()
+    
+    while not stop.is_set():
+        key = schedule.pop_due()
+        if key is None:
+            stop.wait(schedule.seconds_until_due())
+            continue
+        
+        if time.monotonic() - last_learned >= WATCH_RELEARN_SECONDS:
+            try:
+                learn_intervals()
+            except Exception as e:
+                logger.error(f"Error learning polling intervals: {e}")
+            last_learned = time.monotonic()
+        
+        # Fresh session per poll so the identity map never grows across polls
+        db = next(get_db())
+        new_item_ids = []
+        try:
+            kind, name = key.split(':', 1)
+            if kind == 'cleaner':
+                logger.info(f"Cleaner retry sweep: {cleaner_run(db)}")
+            elif kind == 'clusters':
+                logger.info(f"Cluster maintenance: {run_maintenance(db)}")
+            else:
+                if kind == 'rss':
+                    report = ingest_feed(db, feeds[name])
+                else:
+                    report = ingest_arxiv_category(db, name, arxiv_limiter, arxiv_config)
+                
+                new_item_ids = report["new_item_ids"]
+                if new_item_ids:
+                    result = process_new_items(db, new_item_ids)
+                    logger.info(f"{report['name']}: {result['items']} new items -> {result['clusters']} new clusters, {result['updated']} updated")
+            
+            today = datetime.utcnow().date()
+            if last_briefing_date != today and datetime.utcnow().hour >= WATCH_BRIEFING_HOUR:
+                briefing_run(db)
+                last_briefing_date = today
+        except Exception as e:
+            logger.error(f"Error polling {key}: {e}", exc_info=True)
+            db.rollback()
+        finally:
+            db.close()
+            if key in adaptive_sources:
+                interval = policy.next_interval(key, len(new_item_ids))
+                logger.info(f"Next poll of {key} in {interval:.0f}s")
+                schedule.reschedule(key, interval)
+            else:
+                schedule.reschedule(key)
+    
+    logger.info("Watch mode stopped")
+    return 0
+
+
 def main():
     parser = argparse.ArgumentParser(description='AI Briefing Platform Worker')
-    parser.add_argument('command', choices=['once'], help='Command to run')
+    parser.add_argument('command', choices=['once', 'watch', 'maintain'], help='Command to run')
     
     args = parser.parse_args()
     
     if args.command == 'once':
         sys.exit(run_once())
+    elif args.command == 'watch':
+        sys.exit(run_watch())
+    elif args.command == 'maintain':
+        sys.exit(maintain())
     else:
         parser.print_help()
         sys.exit(1)
@@ -0,0 +1,115 @@
+"""
+Polling scheduler for the streaming worker
+"""
+import heapq
+import itertools
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+
+from agents.models import RawItem, Source
+
+
+class PollSchedule:
+    """Min-heap of sources keyed by next due time, each with its own interval
+
+    State is one heap entry per source, so memory stays constant no matter
+    how long the worker runs.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.intervals: Dict[str, float] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+
+    def add(self, key: str, interval: float, delay: float = 0.0) -> None:
+        """Register a source; it first becomes due after `delay` seconds"""
+        self.intervals[key] = interval
+        heapq.heappush(self._heap, (self.clock() + delay, next(self._seq), key))
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def seconds_until_due(self) -> Optional[float]:
+        """Seconds until the next source is due (0 if overdue, None if empty)"""
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - self.clock())
+
+    def pop_due(self) -> Optional[str]:
+        """Remove and return the next source if it is due, else None"""
+        if not self._heap or self._heap[0][0] > self.clock():
+            return None
+        return heapq.heappop(self._heap)[2]
+
+    def reschedule(self, key: str, interval: Optional[float] = None) -> None:
+        """Schedule a polled source again one interval (its own unless given) from now"""
+        if interval is not None:
+            self.intervals[key] = interval
+        heapq.heappush(self._heap, (self.clock() + self.intervals[key], next(self._seq), key))
+
+
+class AdaptivePolicy:
+    """Per-source polling intervals learned from publish history
+
+    A source's base interval is the time it takes, at its observed publish
+    rate, to accumulate `target_items` new items, clamped to
+    [min_interval, max_interval]. Polls that find nothing back off
+    multiplicatively towards max_interval; a poll with new items snaps back
+    to the base. Every interval gets +/- `jitter` so sources that share a
+    cadence don't fire in lockstep.
+    """
+
+    def __init__(self, min_interval: float, max_interval: float, backoff: float = 1.5,
+                 jitter: float = 0.1, target_items: float = 1.0, rng: Optional[random.Random] = None):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.target_items = target_items
+        self.rng = rng or random.Random()
+        self.base: Dict[str, float] = {}
+        self.current: Dict[str, float] = {}
+
+    def clamp(self, interval: float) -> float:
+        return max(self.min_interval, min(self.max_interval, interval))
+
+    def learn(self, key: str, items_in_window: float, window_seconds: float, default: float) -> float:
+        """Set a source's base interval from how many items it published in the window"""
+        if items_in_window > 0:
+            base = self.clamp(self.target_items * window_seconds / items_in_window)
+        else:
+            base = self.clamp(default)
+
+        self.base[key] = base
+        # Keep any backoff already earned; the next poll with new items resets to base
+        self.current[key] = max(self.current.get(key, base), base)
+        return base
+
+    def next_interval(self, key: str, new_items: int) -> float:
+        """Interval until the next poll of a source, given what the last poll found"""
+        base = self.base.get(key, self.max_interval)
+        if new_items:
+            current = base
+        else:
+            current = self.clamp(self.current.get(key, base) * self.backoff)
+        self.current[key] = current
+        return current * (1 + self.rng.uniform(-self.jitter, self.jitter))
+
+
+def load_publish_counts(db, window: timedelta) -> Dict[str, int]:
+    """Items published per source URL within the trailing window (one grouped query)"""
+    since = datetime.now(timezone.utc) - window
+    published = func.coalesce(RawItem.published_at, RawItem.ingested_at)
+
+    rows = db.query(Source.url, func.count(RawItem.id)).join(
+        RawItem, RawItem.source_id == Source.id
+    ).filter(
+        published >= since
+    ).group_by(Source.url).all()
+
+    return {url: count for url, count in rows}